@@ -31,9 +31,11 @@ if __name__ == '__main__':
 
 
 import sys
+import threading
 
 from benchmark     import benchmarking
-from notify.signal import Signal
+from notify.signal import Signal, ThreadSafeSignal, CompilingSignal, TopicSignal, \
+                          HAVE_FAST_EMISSION
 
 
 
@@ -43,6 +45,8 @@ if sys.version_info[0] >= 3:
 
 
 _NUM_EMISSIONS = 100000
+_NUM_THREADS   = 4
+_NUM_TOPICS    = 1000
 
 
 class EmissionBenchmark1 (benchmarking.Benchmark):
@@ -97,6 +101,249 @@ class EmissionBenchmark2 (benchmarking.Benchmark):
             signal ()
 
 
+class CompiledEmissionBenchmark1 (benchmarking.Benchmark):
+
+    def initialize (self):
+        signal = CompilingSignal ()
+
+        signal.connect (_ignoring_handler)
+        signal.connect (_ignoring_handler, 1)
+        signal.connect (_ignoring_handler, 'a', 'b')
+        signal.connect (_ignoring_handler, None, True, False)
+
+        self.__signal = signal
+
+
+    def get_description (self, scale = 1.0):
+        return ('%d emissions of a compiling signal with 4 function handlers'
+                % int (scale * _NUM_EMISSIONS))
+
+
+    def execute (self, scale = 1.0):
+        signal = self.__signal
+
+        for k in xrange (0, int (scale * _NUM_EMISSIONS)):
+            signal ()
+
+
+class CompiledEmissionBenchmark2 (benchmarking.Benchmark):
+
+    def initialize (self):
+        signal = CompilingSignal ()
+        object = _Dummy ()
+
+        signal.connect (object.ignoring_handler)
+        signal.connect (object.ignoring_handler, 1)
+        signal.connect (object.ignoring_handler, 'a', 'b')
+        signal.connect (object.ignoring_handler, None, True, False)
+
+        self.__signal = signal
+
+        # To keep it alive.
+        self.__object = object
+
+
+    def get_description (self, scale = 1.0):
+        return ('%d emissions of a compiling signal with 4 method handlers'
+                % int (scale * _NUM_EMISSIONS))
+
+
+    def execute (self, scale = 1.0):
+        signal = self.__signal
+
+        for k in xrange (0, int (scale * _NUM_EMISSIONS)):
+            signal ()
+
+
+class BatchedEmissionBenchmark1 (benchmarking.Benchmark):
+
+    def initialize (self):
+        signal = Signal ()
+
+        signal.connect (_ignoring_handler)
+        signal.connect (_ignoring_handler, 1)
+        signal.connect (_ignoring_handler, 'a', 'b')
+        signal.connect (_ignoring_handler, None, True, False)
+
+        self.__signal = signal
+
+
+    def get_description (self, scale = 1.0):
+        return ('%d emissions of a signal with 4 function handlers in one emit_many() call'
+                % int (scale * _NUM_EMISSIONS))
+
+
+    def execute (self, scale = 1.0):
+        self.__signal.emit_many ([()] * int (scale * _NUM_EMISSIONS))
+
+
+class ThreadSafeEmissionBenchmark1 (benchmarking.Benchmark):
+
+    def initialize (self):
+        signal = ThreadSafeSignal ()
+
+        signal.connect (_ignoring_handler)
+        signal.connect (_ignoring_handler, 1)
+        signal.connect (_ignoring_handler, 'a', 'b')
+        signal.connect (_ignoring_handler, None, True, False)
+
+        self.__signal = signal
+
+
+    def get_description (self, scale = 1.0):
+        return ('%d emissions of a thread-safe signal with 4 function handlers'
+                % int (scale * _NUM_EMISSIONS))
+
+
+    def execute (self, scale = 1.0):
+        signal = self.__signal
+
+        for k in xrange (0, int (scale * _NUM_EMISSIONS)):
+            signal ()
+
+
+# Compare with the previous benchmark to see how emission scales with threads.  With
+# global interpreter lock it cannot, but on free-threaded Python builds it should.
+
+class ThreadedEmissionBenchmark1 (benchmarking.Benchmark):
+
+    def initialize (self):
+        signal = ThreadSafeSignal ()
+
+        signal.connect (_ignoring_handler)
+        signal.connect (_ignoring_handler, 1)
+        signal.connect (_ignoring_handler, 'a', 'b')
+        signal.connect (_ignoring_handler, None, True, False)
+
+        self.__signal = signal
+
+
+    def get_description (self, scale = 1.0):
+        return ('%d emissions of a thread-safe signal with 4 function handlers from %d threads'
+                % (int (scale * _NUM_EMISSIONS), _NUM_THREADS))
+
+
+    def execute (self, scale = 1.0):
+        num_emissions = int (scale * _NUM_EMISSIONS) // _NUM_THREADS
+        threads       = [threading.Thread (target = self.__emit, args = (num_emissions,))
+                         for k in xrange (0, _NUM_THREADS)]
+
+        for thread in threads:
+            thread.start ()
+        for thread in threads:
+            thread.join ()
+
+
+    def __emit (self, num_emissions):
+        signal = self.__signal
+
+        for k in xrange (0, num_emissions):
+            signal ()
+
+
+
+# Emission cost of a topic signal depends on the number of matching patterns, not on the
+# number of subscriptions.
+
+class TopicEmissionBenchmark1 (benchmarking.Benchmark):
+
+    def initialize (self):
+        topics = TopicSignal ()
+
+        for k in xrange (0, _NUM_TOPICS):
+            topics.connect ('order.%d.filled' % k, _ignoring_handler)
+
+        topics.connect ('order.*.filled', _ignoring_handler)
+        topics.connect ('order.#',        _ignoring_handler)
+
+        self.__topics = topics
+
+
+    def get_description (self, scale = 1.0):
+        return ('%d emissions of a topic signal with %d subscriptions, 3 of them matching'
+                % (int (scale * _NUM_EMISSIONS), _NUM_TOPICS + 2))
+
+
+    def execute (self, scale = 1.0):
+        topics = self.__topics
+
+        for k in xrange (0, int (scale * _NUM_EMISSIONS)):
+            topics ('order.7.filled')
+
+
+if HAVE_FAST_EMISSION:
+
+    from notify.signal import _python_emit
+
+
+    class _PythonSignal (Signal):
+
+        __slots__ = ()
+
+        emit = _python_emit
+
+
+    # Otherwise benchmark loader would try to call it.
+    del _python_emit
+
+
+    # These are the same as above, only use pure Python `Signal.emit' implementation for
+    # comparison with the native one.
+
+    class PythonEmissionBenchmark1 (benchmarking.Benchmark):
+
+        def initialize (self):
+            signal = _PythonSignal ()
+
+            signal.connect (_ignoring_handler)
+            signal.connect (_ignoring_handler, 1)
+            signal.connect (_ignoring_handler, 'a', 'b')
+            signal.connect (_ignoring_handler, None, True, False)
+
+            self.__signal = signal
+
+
+        def get_description (self, scale = 1.0):
+            return ('%d emissions of a signal with 4 function handlers (pure Python)'
+                    % int (scale * _NUM_EMISSIONS))
+
+
+        def execute (self, scale = 1.0):
+            signal = self.__signal
+
+            for k in xrange (0, int (scale * _NUM_EMISSIONS)):
+                signal ()
+
+
+    class PythonEmissionBenchmark2 (benchmarking.Benchmark):
+
+        def initialize (self):
+            signal = _PythonSignal ()
+            object = _Dummy ()
+
+            signal.connect (object.ignoring_handler)
+            signal.connect (object.ignoring_handler, 1)
+            signal.connect (object.ignoring_handler, 'a', 'b')
+            signal.connect (object.ignoring_handler, None, True, False)
+
+            self.__signal = signal
+
+            # To keep it alive.
+            self.__object = object
+
+
+        def get_description (self, scale = 1.0):
+            return ('%d emissions of a signal with 4 method handlers (pure Python)'
+                    % int (scale * _NUM_EMISSIONS))
+
+
+        def execute (self, scale = 1.0):
+            signal = self.__signal
+
+            for k in xrange (0, int (scale * _NUM_EMISSIONS)):
+                signal ()
+
+
 
 try:
     import pygtk
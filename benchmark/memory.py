@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2007, 2008 Paul Pogonyshev.                          #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    sys.path.insert (0, os.path.join (sys.path[0], os.pardir))
+
+
+
+import gc
+import sys
+
+from types         import FunctionType, ModuleType
+
+from benchmark     import benchmarking
+from notify.signal import Signal, SignalFactory
+
+
+
+if sys.version_info[0] >= 3:
+    xrange = range
+
+
+
+_NUM_OBJECTS = 10000
+_NUM_SIGNALS = 20
+
+_SIGNAL_NAMES = tuple (['signal%d' % k for k in xrange (0, _NUM_SIGNALS)])
+
+
+# Descriptions of these benchmarks include memory taken by one object, as the point is
+# memory use, not time.  Note that this class must not be a `Benchmark' itself, else it
+# would be loaded as one.
+
+class _MemoryBenchmark (object):
+
+    def get_description (self, scale = 1.0):
+        # Measure many objects at once, so that state they share is spread over them.
+        objects = [self.create_object () for k in xrange (0, 100)]
+
+        return ('creating %d objects with %d %s each, 2 of them with a handler '
+                '(%d bytes per object)'
+                % (int (scale * _NUM_OBJECTS), _NUM_SIGNALS, self.signal_kind,
+                   (self.measure_size (objects) - sys.getsizeof (objects)) // len (objects)))
+
+
+    def execute (self, scale = 1.0):
+        create_object = self.create_object
+        self.__objects = [create_object () for k in xrange (0, int (scale * _NUM_OBJECTS))]
+
+
+    def finalize (self):
+        del self.__objects
+
+
+    def measure_size (self, object):
+        # Sum sizes of everything reachable from `object', except for shared objects:
+        # functions, classes, modules and strings (signal names are shared constants.)
+        seen  = {}
+        queue = [object]
+        size  = 0
+
+        while queue:
+            object = queue.pop ()
+            if id (object) in seen or isinstance (object, (FunctionType, ModuleType, type, str)):
+                continue
+
+            seen[id (object)] = True
+            size += sys.getsizeof (object)
+            queue.extend (gc.get_referents (object))
+
+        return size
+
+
+class SignalMemoryBenchmark1 (_MemoryBenchmark, benchmarking.Benchmark):
+
+    signal_kind = 'separate signals'
+
+    def create_object (self):
+        object = _SignalsObject ()
+
+        object.signals['signal0'].connect (_ignoring_handler)
+        object.signals['signal1'].connect (_ignoring_handler)
+
+        return object
+
+
+class SignalMemoryBenchmark2 (_MemoryBenchmark, benchmarking.Benchmark):
+
+    signal_kind = 'factory signals'
+
+    def create_object (self):
+        object = _FactoryObject ()
+
+        object.signals['signal0'].connect (_ignoring_handler)
+        object.signals['signal1'].connect (_ignoring_handler)
+
+        return object
+
+
+
+class _SignalsObject (object):
+
+    def __init__(self):
+        self.signals = dict ([(name, Signal ()) for name in _SIGNAL_NAMES])
+
+
+class _FactoryObject (object):
+
+    def __init__(self):
+        self.signals = SignalFactory (_SIGNAL_NAMES)
+
+
+
+def _ignoring_handler (*arguments):
+    pass
+
+
+
+if __name__ == '__main__':
+    benchmarking.main ()
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -34,7 +34,7 @@ eventually.
 """
 
 __docformat__ = 'epytext en'
-__all__       = ('connecting', 'connecting_safely', 'blocking')
+__all__       = ('connecting', 'connecting_safely', 'blocking', 'deferred')
 
 
 from contextlib import contextmanager
@@ -161,6 +161,46 @@ def blocking (self, handler, *arguments, **keywords):
         yield self
 
 
+@contextmanager
+def deferred (self):
+    """
+    deferred(self)
+
+    Create a context manager that L{flushes <flush>} the signal upon exit, delivering all
+    emissions queued inside the C{with} block (and any still pending from before.)  The
+    managers can be nested, in which case only the outmost one flushes.
+
+    Example usage:
+       >>> signal = DeferredSignal (policy = DeferredSignal.DELIVER_LAST)
+       ... signal.connect (redraw)
+       ...
+       ... with signal.deferred ():
+       ...     for item in changed_items:
+       ...         signal (item)
+
+    Here C{redraw} is called only once, with the last item.
+
+    @note:
+    This method is available only in Python 2.5 or newer.
+
+    @note:
+    To enable C{with} statement in Python 2.5 you need to add this line at the top of your
+    module:
+        >>> from __future__ import with_statement
+
+    @see:  C{L{flush}}
+    """
+
+    self._DeferredSignal__deferral_level += 1
+
+    try:
+        yield self
+    finally:
+        self._DeferredSignal__deferral_level -= 1
+        if self._DeferredSignal__deferral_level == 0:
+            self.flush ()
+
+
 
 # Local variables:
 # mode: python
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2007, 2008 Paul Pogonyshev.                          #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+"""
+Internal module used to implement asynchronous features of C{L{AbstractValueObject}}
+class.  I{Don’t import} this module directly: it is implementation detail.
+"""
+
+__docformat__ = 'epytext en'
+__all__       = ('wait_for',)
+
+
+import asyncio
+
+
+
+def wait_for (self, predicate, loop = None):
+    """
+    wait_for(self, predicate, loop = None)
+
+    Create an C{asyncio} future that is resolved with the value of C{self} as soon as
+    C{predicate} returns true for it.  If the current value already satisfies the
+    predicate, the returned future is resolved immediately.  Otherwise a temporary
+    handler is connected to L{‘changed’ signal <changed>}; it checks each new value and
+    is disconnected again once the future is resolved or cancelled.  If C{predicate}
+    raises, the exception is set on the future.
+
+    Example usage:
+       >>> await connection_state.wait_for (lambda state: state == 'connected')
+
+    @note:
+    This method is available only in Python 3.5 or newer.
+
+    @param predicate: callable accepting one argument, the value.
+    @param loop:      event loop the future belongs to; if omitted, the current event
+                      loop.
+
+    @rtype:           C{asyncio.Future}
+    """
+
+    if loop is None:
+        loop = asyncio.get_event_loop ()
+
+    future = loop.create_future ()
+
+    try:
+        value = self.get ()
+        if predicate (value):
+            future.set_result (value)
+            return future
+    except Exception as exception:
+        future.set_exception (exception)
+        return future
+
+    # Keep a strong reference: signals of some objects (e.g. conditions) are otherwise
+    # only weakly referenced.
+    signal = self.changed
+
+    def check (new_value):
+        if future.done ():
+            return
+
+        try:
+            if not predicate (new_value):
+                return
+        except Exception as exception:
+            future.set_exception (exception)
+        else:
+            future.set_result (new_value)
+
+        signal.disconnect (check)
+
+    def forget (future):
+        if future.cancelled ():
+            signal.disconnect (check)
+
+    signal.connect (check)
+    future.add_done_callback (forget)
+
+    return future
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2007, 2008 Paul Pogonyshev.                          #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+"""
+Internal module used to implement asynchronous features of C{L{AbstractSignal}} and
+C{L{AsyncSignal}} classes.  I{Don’t import} this module directly: it is implementation
+detail.
+"""
+
+__docformat__ = 'epytext en'
+__all__       = ('next_emission', 'emit', 'emit_many')
+
+
+import asyncio
+import sys
+
+from inspect     import isawaitable
+
+from notify.bind import WeakBinding
+
+# Note that `notify.signal' imports this module while it is itself being initialized, so
+# everything from there is looked up only when the functions below are called.
+import notify.signal
+
+
+
+def next_emission (self, loop = None):
+    """
+    next_emission(self, loop = None)
+
+    Create an C{asyncio} future that is resolved with the tuple of positional arguments
+    of the next emission of the signal.  Keyword arguments of the emission, if any, are
+    not reported.  To achieve this, a temporary handler is connected to the signal; it is
+    disconnected again as soon as the future is resolved or cancelled.
+
+    Example usage:
+       >>> arguments = await signal.next_emission ()
+
+    Note that the temporary handler returns C{None}, which is seen by the signal’s
+    accumulator, if there is one.
+
+    @note:
+    This method is available only in Python 3.5 or newer.
+
+    @param loop: event loop the future belongs to; if omitted, the current event loop.
+
+    @rtype:      C{asyncio.Future}
+    """
+
+    if loop is None:
+        loop = asyncio.get_event_loop ()
+
+    future = loop.create_future ()
+
+    def resolve (*arguments, **keywords):
+        if not future.done ():
+            future.set_result (arguments)
+            self.disconnect (resolve)
+
+    def forget (future):
+        if future.cancelled ():
+            self.disconnect (resolve)
+
+    self.connect (resolve)
+    future.add_done_callback (forget)
+
+    return future
+
+
+
+async def emit (self, *arguments, **keywords):
+    """
+    emit(self, *arguments, **keywords)
+
+    Emit the signal: call all its non-blocked handlers with C{arguments} and C{keywords}
+    and await those which return an awaitable.  This method is a coroutine, so the
+    emission only happens when its result is awaited.  Values returned by handlers (after
+    awaiting, if needed) are passed to the accumulator in handler connection order,
+    regardless of concurrency.
+
+    @rtype:   C{object}
+    @returns: Accumulated value of handler results or C{None}.
+    """
+
+    # NOTE: Apart from awaiting, this is `ThreadSafeSignal.emit' with per-task emission
+    #       level.
+
+    handlers    = self._handlers
+    accumulator = self._Signal__accumulator
+
+    if accumulator is not None:
+        value = accumulator.get_initial_value ()
+
+    if handlers is not None:
+        signal_module         = notify.signal
+        emission_levels       = self._AsyncSignal__emission_levels
+        task                  = signal_module._get_current_task ()
+        saved_emission_level  = emission_levels.get (task, 0)
+        emission_levels[task] = abs (saved_emission_level) + 1
+
+        try:
+            if self._AsyncSignal__concurrency == 1:
+                for handler in handlers:
+                    if emission_levels[task] < 0:
+                        break
+
+                    if not _is_callable_now (self, handler):
+                        continue
+
+                    try:
+                        handler_value = handler (*arguments, **keywords)
+                        if isawaitable (handler_value):
+                            handler_value = await handler_value
+                    except asyncio.CancelledError:
+                        raise
+                    except:
+                        signal_module._report_handler_exception (self, sys.exc_info () [1],
+                                                                 handler)
+                    else:
+                        if accumulator is not None:
+                            value = accumulator.accumulate_value (value, handler_value)
+                            if not accumulator.should_continue (value):
+                                break
+
+            else:
+                results = []
+
+                for handler in handlers:
+                    if emission_levels[task] < 0:
+                        break
+
+                    if not _is_callable_now (self, handler):
+                        continue
+
+                    try:
+                        handler_value = handler (*arguments, **keywords)
+                    except asyncio.CancelledError:
+                        raise
+                    except:
+                        signal_module._report_handler_exception (self, sys.exc_info () [1],
+                                                                 handler)
+                    else:
+                        results.append ([handler, handler_value])
+
+                awaited = [result for result in results if isawaitable (result[1])]
+
+                if awaited:
+                    if self._AsyncSignal__concurrency is not None:
+                        semaphore = asyncio.Semaphore (self._AsyncSignal__concurrency)
+                    else:
+                        semaphore = None
+
+                    awaited_values = await asyncio.gather (*[_await_handler (self,
+                                                                             handler,
+                                                                             handler_value,
+                                                                             semaphore)
+                                                             for handler, handler_value
+                                                             in awaited])
+
+                    for index in range (len (awaited)):
+                        awaited[index][1] = awaited_values[index]
+
+                if accumulator is not None:
+                    for handler, handler_value in results:
+                        if handler_value is _FAILED:
+                            continue
+
+                        value = accumulator.accumulate_value (value, handler_value)
+                        if not accumulator.should_continue (value):
+                            break
+        finally:
+            if saved_emission_level == 0:
+                del emission_levels[task]
+            else:
+                emission_levels[task] = saved_emission_level
+
+    if accumulator is None:
+        return None
+    else:
+        return accumulator.post_process_value (value)
+
+
+async def emit_many (self, argument_sets):
+    """
+    emit_many(self, argument_sets)
+
+    Emit the signal once for each tuple of positional arguments in C{argument_sets}, one
+    emission after another.  This method is a coroutine.
+
+    @rtype:   C{list}
+    @returns: Accumulated value of each emission, in order.
+    """
+
+    values = []
+    for arguments in argument_sets:
+        values.append (await self.emit (*arguments))
+
+    return values
+
+
+
+def _is_callable_now (signal, handler):
+    blocked_handlers = signal._blocked_handlers
+    if blocked_handlers and notify.signal._is_blocked (blocked_handlers, handler):
+        return False
+
+    # A handler can only be dead here if its object has been garbage-collected during
+    # this very emission.
+    return handler or not isinstance (handler, WeakBinding)
+
+
+async def _await_handler (signal, handler, awaitable, semaphore):
+    try:
+        if semaphore is None:
+            return await awaitable
+        else:
+            async with semaphore:
+                return await awaitable
+    except asyncio.CancelledError:
+        raise
+    except:
+        notify.signal._report_handler_exception (signal, sys.exc_info () [1], handler)
+        return _FAILED
+
+
+_FAILED = object ()
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -0,0 +1,1102 @@
+/*--------------------------------------------------------------------*\
+ * This file is part of Py-notify.                                    *
+ *                                                                    *
+ * Copyright (C) 2007, 2008 Paul Pogonyshev.                          *
+ *                                                                    *
+ * This library is free software; you can redistribute it and/or      *
+ * modify it under the terms of the GNU Lesser General Public License *
+ * as published by the Free Software Foundation; either version 2.1   *
+ * of the License, or (at your option) any later version.             *
+ *                                                                    *
+ * This library is distributed in the hope that it will be useful,    *
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of     *
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  *
+ * Lesser General Public License for more details.                    *
+ *                                                                    *
+ * You should have received a copy of the GNU Lesser General Public   *
+ * License along with this library; if not, write to the Free         *
+ * Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        *
+ * Boston, MA 02110-1301 USA                                          *
+\*--------------------------------------------------------------------*/
+
+
+#include "_compatibility.h"
+#include <structmember.h>
+
+
+/* `Py_hash_t' only appeared in 3.2. */
+#if PY_VERSION_HEX >= 0x03020000
+typedef Py_hash_t  HashValue;
+#  define HashValue_AsObject(value) PyLong_FromSsize_t (value)
+#else
+typedef long       HashValue;
+#  define HashValue_AsObject(value) PyInt_FromLong (value)
+#endif
+
+
+/* Starting with 3.9 wrapped callables are invoked through vectorcall protocol, so that
+ * no merged argument tuple is created.  Up to this many arguments are passed from the C
+ * stack, more need a temporary heap array.
+ */
+#if PY_VERSION_HEX >= 0x03090000
+#  define USE_VECTORCALL        1
+#  define SMALL_STACK_SIZE      8
+#endif
+
+
+
+/*- Type forward declarations --------------------------------------*/
+
+/* How binding accessors (`_get_object' and friends) are resolved for an instance.  If
+ * any of them is overriden in a subclass, the native implementation cannot read slots
+ * directly and falls back to the Python one.
+ */
+typedef
+enum
+{
+  PYTHON_ACCESSORS,
+  PLAIN_ACCESSORS,
+  WEAK_ACCESSORS
+}
+Accessors;
+
+/* Result of comparing a binding with another object. */
+typedef
+enum
+{
+  COMPARISON_ERROR        = -1,
+  NOT_EQUAL               =  0,
+  EQUAL                   =  1,
+  NOT_COMPARABLE,
+  NEEDS_PYTHON_COMPARISON
+}
+Comparison;
+
+typedef
+struct
+{
+  PyTypeObject *       binding_type;
+  PyTypeObject *       weak_binding_type;
+
+  /* Accessor methods, as defined in `Binding' and `WeakBinding' classes. */
+  PyObject *           binding_get_object;
+  PyObject *           binding_get_function;
+  PyObject *           binding_get_class;
+  PyObject *           binding_get_arguments;
+  PyObject *           binding_get_keywords;
+  PyObject *           weak_binding_get_object;
+
+  /* Pure Python implementations, see `_python_*' variables in `notify/bind.py'. */
+  PyObject *           python_call;
+  PyObject *           python_weak_call;
+  PyObject *           python_eq;
+  PyObject *           python_ne;
+  PyObject *           python_hash;
+  PyObject *           python_weak_hash;
+
+  /* Offsets of `Binding' and `WeakBinding' slots, as reported by member descriptors. */
+  Py_ssize_t           object_offset;
+  Py_ssize_t           function_offset;
+  Py_ssize_t           class_offset;
+  Py_ssize_t           arguments_offset;
+  Py_ssize_t           keywords_offset;
+  Py_ssize_t           hash_offset;
+
+  PyObject *           get_object_name;
+  PyObject *           get_function_name;
+  PyObject *           get_class_name;
+  PyObject *           get_arguments_name;
+  PyObject *           get_keywords_name;
+  PyObject *           call_after_garbage_collecting_name;
+}
+BindModuleState;
+
+
+
+/*- Functions forward declarations ---------------------------------*/
+
+static PyObject *   Binding_call                (PyObject *self,
+                                                 PyObject *arguments, PyObject *keywords);
+static PyObject *   Binding_eq                  (PyObject *self, PyObject *other);
+static PyObject *   Binding_ne                  (PyObject *self, PyObject *other);
+static PyObject *   Binding_hash                (PyObject *self, PyObject *unused);
+
+static PyObject *   WeakBinding_call            (PyObject *self,
+                                                 PyObject *arguments, PyObject *keywords);
+static PyObject *   WeakBinding_hash            (PyObject *self, PyObject *unused);
+
+static int          bind_module_initialize_state (PyObject *self);
+static int          bind_module_traverse         (PyObject *self, visitproc visit, void *arg);
+static int          bind_module_clear            (PyObject *self);
+
+
+
+/*- Documentation --------------------------------------------------*/
+
+#define MODULE_DOC "Internal helper module for C{L{notify.bind}}.  Do not use directly."
+
+
+#define BINDING_CALL_DOC "\
+__call__(self, *arguments, **keywords) \
+\n\
+Native implementation of C{L{Binding.__call__ <notify.bind.Binding.__call__>}}.  It is \
+semantically identical to the Python implementation, it is only faster."
+
+#define BINDING_EQ_DOC "\
+__eq__(self, other) \
+\n\
+Native implementation of C{L{Binding.__eq__ <notify.bind.Binding.__eq__>}}."
+
+#define BINDING_NE_DOC "\
+__ne__(self, other) \
+\n\
+Native implementation of C{L{Binding.__ne__ <notify.bind.Binding.__ne__>}}."
+
+#define BINDING_HASH_DOC "\
+__hash__(self) \
+\n\
+Native implementation of C{L{Binding.__hash__ <notify.bind.Binding.__hash__>}}."
+
+#define WEAK_BINDING_CALL_DOC "\
+__call__(self, *arguments, **keywords) \
+\n\
+Native implementation of C{L{WeakBinding.__call__ <notify.bind.WeakBinding.__call__>}}.  It \
+is semantically identical to the Python implementation, it is only faster."
+
+#define WEAK_BINDING_HASH_DOC "\
+__hash__(self) \
+\n\
+Native implementation of C{L{WeakBinding.__hash__ <notify.bind.WeakBinding.__hash__>}}."
+
+
+
+/*- Static variables -----------------------------------------------*/
+
+static PyMethodDef  Binding_call_method
+  = { "__call__", (PyCFunction) Binding_call, METH_VARARGS | METH_KEYWORDS,
+      BINDING_CALL_DOC };
+
+static PyMethodDef  Binding_eq_method
+  = { "__eq__", (PyCFunction) Binding_eq, METH_O, BINDING_EQ_DOC };
+
+static PyMethodDef  Binding_ne_method
+  = { "__ne__", (PyCFunction) Binding_ne, METH_O, BINDING_NE_DOC };
+
+static PyMethodDef  Binding_hash_method
+  = { "__hash__", (PyCFunction) Binding_hash, METH_NOARGS, BINDING_HASH_DOC };
+
+static PyMethodDef  WeakBinding_call_method
+  = { "__call__", (PyCFunction) WeakBinding_call, METH_VARARGS | METH_KEYWORDS,
+      WEAK_BINDING_CALL_DOC };
+
+static PyMethodDef  WeakBinding_hash_method
+  = { "__hash__", (PyCFunction) WeakBinding_hash, METH_NOARGS, WEAK_BINDING_HASH_DOC };
+
+
+static Compatibility_ModuleDef  bind_module
+  = { Compatibility_ModuleDef_HEAD_INIT,
+      "notify._bind",
+      MODULE_DOC,
+      sizeof (BindModuleState),
+      NULL,
+      NULL,
+      bind_module_traverse,
+      bind_module_clear,
+      NULL };
+
+#define BIND_MODULE_STATE(module)                                       \
+  Compatibility_ModuleState (bind_module, module, BindModuleState)
+#define BIND_MODULE_STATE_FROM_DEF()                                    \
+  Compatibility_ModuleStateFromDef (bind_module, BindModuleState)
+
+#if Compatibility_2_x_MODULE_STATE
+static BindModuleState __2_x_state__bind_module;
+#endif
+
+
+/* Direct access to (Python-level) slots of a `Binding' instance. */
+#define SLOT(object, offset)  (*(PyObject **) ((char *) (object) + (offset)))
+
+
+
+/*- Helper functions -----------------------------------------------*/
+
+static PyObject *
+get_slot (PyObject *self, Py_ssize_t offset, const char *name)
+{
+  PyObject *value = SLOT (self, offset);
+
+  if (!value)
+    PyErr_SetString (PyExc_AttributeError, name);
+
+  return value;
+}
+
+
+/* Accessors are looked up in the type only: instance attributes cannot shadow them,
+ * since `Binding' and its standard subclasses have no `__dict__'.  Lookups normally hit
+ * the type attribute cache, so this is cheap.
+ */
+static Accessors
+get_accessors (BindModuleState *state, PyObject *self)
+{
+  PyTypeObject *type = Py_TYPE (self);
+  PyObject     *get_object;
+
+  if (_PyType_Lookup (type, state->get_function_name)     != state->binding_get_function
+      || _PyType_Lookup (type, state->get_class_name)     != state->binding_get_class
+      || _PyType_Lookup (type, state->get_arguments_name) != state->binding_get_arguments
+      || _PyType_Lookup (type, state->get_keywords_name)  != state->binding_get_keywords)
+    return PYTHON_ACCESSORS;
+
+  get_object = _PyType_Lookup (type, state->get_object_name);
+
+  if (get_object == state->binding_get_object)
+    return PLAIN_ACCESSORS;
+  if (get_object == state->weak_binding_get_object)
+    return WEAK_ACCESSORS;
+
+  return PYTHON_ACCESSORS;
+}
+
+
+/* Return a new reference to what `_get_object' would return or NULL on failure.  Mirrors
+ * `WeakBinding._get_object' in `notify/bind.py' for weak accessors.
+ */
+static PyObject *
+get_object (BindModuleState *state, PyObject *self, Accessors accessors)
+{
+  PyObject *object = get_slot (self, state->object_offset, "_object");
+
+  if (!object)
+    return NULL;
+
+  if (accessors == WEAK_ACCESSORS && object != Py_None)
+    {
+      if (!PyWeakref_CheckRef (object))
+        return PyObject_CallObject (object, NULL);
+
+      object = PyWeakref_GET_OBJECT (object);
+    }
+
+  Py_INCREF (object);
+  return object;
+}
+
+
+static PyObject *
+call_python_implementation (PyObject *implementation, PyObject *self,
+                            PyObject *arguments, PyObject *keywords)
+{
+  Py_ssize_t  num_arguments = PyTuple_GET_SIZE (arguments);
+  PyObject   *all_arguments = PyTuple_New (num_arguments + 1);
+  PyObject   *result;
+  Py_ssize_t  k;
+
+  if (!all_arguments)
+    return NULL;
+
+  Py_INCREF (self);
+  PyTuple_SET_ITEM (all_arguments, 0, self);
+
+  for (k = 0; k < num_arguments; k++)
+    {
+      PyObject *argument = PyTuple_GET_ITEM (arguments, k);
+
+      Py_INCREF (argument);
+      PyTuple_SET_ITEM (all_arguments, k + 1, argument);
+    }
+
+  result = PyObject_Call (implementation, all_arguments, keywords);
+  Py_DECREF (all_arguments);
+
+  return result;
+}
+
+
+/* Mirrors `Binding.__call__' in `notify/bind.py', but reads slots directly.  Must only be
+ * called if `accessors' is not `PYTHON_ACCESSORS'.
+ */
+static PyObject *
+call_binding (BindModuleState *state, PyObject *self, Accessors accessors,
+              PyObject *arguments, PyObject *keywords)
+{
+  PyObject   *function;
+  PyObject   *_class;
+  PyObject   *fixed_arguments;
+  PyObject   *fixed_keywords;
+  PyObject   *object          = NULL;
+  PyObject   *all_keywords    = NULL;
+  PyObject   *result          = NULL;
+  Py_ssize_t  num_fixed_arguments;
+  Py_ssize_t  num_arguments;
+  Py_ssize_t  num_objects;
+  Py_ssize_t  k;
+
+  if (!(function           = get_slot (self, state->function_offset,  "_function"))
+      || !(_class          = get_slot (self, state->class_offset,     "_class"))
+      || !(fixed_arguments = get_slot (self, state->arguments_offset, "_arguments"))
+      || !(fixed_keywords  = get_slot (self, state->keywords_offset,  "_keywords")))
+    return NULL;
+
+  if (!PyTuple_Check (fixed_arguments) || !PyDict_Check (fixed_keywords))
+    {
+      PyErr_SetString (PyExc_TypeError, "binding arguments must be a tuple and a dictionary");
+      return NULL;
+    }
+
+  /* The function might in principle reassign slots of `self' while it is running. */
+  Py_INCREF (function);
+  Py_INCREF (fixed_arguments);
+
+  if (keywords && PyDict_Size (keywords) > 0)
+    {
+      if (PyDict_Size (fixed_keywords) > 0)
+        {
+          all_keywords = PyDict_Copy (fixed_keywords);
+          if (!all_keywords || PyDict_Update (all_keywords, keywords) == -1)
+            goto done;
+        }
+      else
+        {
+          all_keywords = keywords;
+          Py_INCREF (all_keywords);
+        }
+    }
+  else if (PyDict_Size (fixed_keywords) > 0)
+    {
+      /* Copy, as `**keywords' would: a native callable is free to modify the dict. */
+      all_keywords = PyDict_Copy (fixed_keywords);
+      if (!all_keywords)
+        goto done;
+    }
+
+  if (_class != Py_None)
+    {
+      object = get_object (state, self, accessors);
+      if (!object)
+        goto done;
+    }
+
+  num_objects         = (object ? 1 : 0);
+  num_fixed_arguments = PyTuple_GET_SIZE (fixed_arguments);
+  num_arguments       = PyTuple_GET_SIZE (arguments);
+
+#if USE_VECTORCALL
+
+  {
+    PyObject  *small_stack[SMALL_STACK_SIZE];
+    PyObject **stack     = small_stack;
+    Py_ssize_t num_total = num_objects + num_fixed_arguments + num_arguments;
+
+    if (num_total > SMALL_STACK_SIZE)
+      {
+        stack = PyMem_Malloc (num_total * sizeof (PyObject *));
+        if (!stack)
+          {
+            PyErr_NoMemory ();
+            goto done;
+          }
+      }
+
+    if (object)
+      stack[0] = object;
+
+    for (k = 0; k < num_fixed_arguments; k++)
+      stack[num_objects + k] = PyTuple_GET_ITEM (fixed_arguments, k);
+
+    for (k = 0; k < num_arguments; k++)
+      stack[num_objects + num_fixed_arguments + k] = PyTuple_GET_ITEM (arguments, k);
+
+    result = PyObject_VectorcallDict (function, stack, num_total, all_keywords);
+
+    if (stack != small_stack)
+      PyMem_Free (stack);
+  }
+
+#else  /* !USE_VECTORCALL */
+
+  if (!object && num_fixed_arguments == 0)
+    result = PyObject_Call (function, arguments, all_keywords);
+  else
+    {
+      PyObject *all_arguments = PyTuple_New (num_objects + num_fixed_arguments
+                                             + num_arguments);
+
+      if (!all_arguments)
+        goto done;
+
+      if (object)
+        {
+          Py_INCREF (object);
+          PyTuple_SET_ITEM (all_arguments, 0, object);
+        }
+
+      for (k = 0; k < num_fixed_arguments; k++)
+        {
+          PyObject *argument = PyTuple_GET_ITEM (fixed_arguments, k);
+
+          Py_INCREF (argument);
+          PyTuple_SET_ITEM (all_arguments, num_objects + k, argument);
+        }
+
+      for (k = 0; k < num_arguments; k++)
+        {
+          PyObject *argument = PyTuple_GET_ITEM (arguments, k);
+
+          Py_INCREF (argument);
+          PyTuple_SET_ITEM (all_arguments, num_objects + num_fixed_arguments + k, argument);
+        }
+
+      result = PyObject_Call (function, all_arguments, all_keywords);
+      Py_DECREF (all_arguments);
+    }
+
+#endif  /* !USE_VECTORCALL */
+
+ done:
+  Py_XDECREF (object);
+  Py_XDECREF (all_keywords);
+  Py_DECREF (fixed_arguments);
+  Py_DECREF (function);
+
+  return result;
+}
+
+
+/* Mirrors `Binding.__eq__' in `notify/bind.py'. */
+static Comparison
+compare_binding (BindModuleState *state, PyObject *self, PyObject *other)
+{
+  Accessors  accessors;
+  PyObject  *function;
+  PyObject  *_class;
+  PyObject  *arguments;
+  PyObject  *keywords;
+  PyObject  *object;
+  int        same_method;
+  int        is_empty;
+
+  if (self == other)
+    return EQUAL;
+
+  accessors = get_accessors (state, self);
+  if (accessors == PYTHON_ACCESSORS)
+    return NEEDS_PYTHON_COMPARISON;
+
+  if (!(function     = get_slot (self, state->function_offset,  "_function"))
+      || !(_class    = get_slot (self, state->class_offset,     "_class"))
+      || !(arguments = get_slot (self, state->arguments_offset, "_arguments"))
+      || !(keywords  = get_slot (self, state->keywords_offset,  "_keywords")))
+    return COMPARISON_ERROR;
+
+  if (PyMethod_Check (other))
+    {
+      PyObject *other_object = PyMethod_GET_SELF (other);
+
+      if (!other_object)
+        other_object = Py_None;
+
+      if (!(object = get_object (state, self, accessors)))
+        return COMPARISON_ERROR;
+
+      same_method = (object == other_object && function == PyMethod_GET_FUNCTION (other));
+#if PY_MAJOR_VERSION < 3
+      same_method = (same_method && _class == PyMethod_GET_CLASS (other));
+#endif
+
+      Py_DECREF (object);
+
+      if (!same_method)
+        return NOT_EQUAL;
+
+      if ((is_empty = PyObject_Not (arguments)) != 1)
+        return is_empty;
+
+      return PyObject_Not (keywords);
+    }
+
+  else if (PyObject_TypeCheck (other, state->binding_type))
+    {
+      Accessors  other_accessors = get_accessors (state, other);
+      PyObject  *other_function;
+      PyObject  *other_class;
+      PyObject  *other_arguments;
+      PyObject  *other_keywords;
+      PyObject  *other_object;
+      int        equal;
+
+      if (other_accessors == PYTHON_ACCESSORS)
+        return NEEDS_PYTHON_COMPARISON;
+
+      if (!(other_function     = get_slot (other, state->function_offset,  "_function"))
+          || !(other_class     = get_slot (other, state->class_offset,     "_class"))
+          || !(other_arguments = get_slot (other, state->arguments_offset, "_arguments"))
+          || !(other_keywords  = get_slot (other, state->keywords_offset,  "_keywords")))
+        return COMPARISON_ERROR;
+
+      if (!(object = get_object (state, self, accessors)))
+        return COMPARISON_ERROR;
+
+      if (!(other_object = get_object (state, other, other_accessors)))
+        {
+          Py_DECREF (object);
+          return COMPARISON_ERROR;
+        }
+
+      same_method = (object == other_object && function == other_function);
+#if PY_MAJOR_VERSION < 3
+      same_method = (same_method && _class == other_class);
+#endif
+
+      Py_DECREF (object);
+      Py_DECREF (other_object);
+
+      if (!same_method)
+        return NOT_EQUAL;
+
+      if ((equal = PyObject_RichCompareBool (arguments, other_arguments, Py_EQ)) != 1)
+        return equal;
+
+      return PyObject_RichCompareBool (keywords, other_keywords, Py_EQ);
+    }
+
+  else if (PyFunction_Check (other))
+    {
+      if (function != other || _class != Py_None)
+        return NOT_EQUAL;
+
+      if (!(object = get_object (state, self, accessors)))
+        return COMPARISON_ERROR;
+
+      same_method = (object == Py_None);
+      Py_DECREF (object);
+
+      if (!same_method)
+        return NOT_EQUAL;
+
+      if ((is_empty = PyObject_Not (arguments)) != 1)
+        return is_empty;
+
+      return PyObject_Not (keywords);
+    }
+
+  return NOT_COMPARABLE;
+}
+
+
+/* Mirrors `Binding.__hash__' in `notify/bind.py'.  Must only be called if `accessors' is
+ * not `PYTHON_ACCESSORS'.
+ */
+static PyObject *
+hash_binding (BindModuleState *state, PyObject *self, Accessors accessors)
+{
+  PyObject  *function;
+  PyObject  *_class;
+  PyObject  *arguments;
+  PyObject  *keywords;
+  PyObject  *object;
+  HashValue  hash;
+  HashValue  part_hash;
+  int        is_true;
+
+  if (!(function     = get_slot (self, state->function_offset,  "_function"))
+      || !(_class    = get_slot (self, state->class_offset,     "_class"))
+      || !(arguments = get_slot (self, state->arguments_offset, "_arguments"))
+      || !(keywords  = get_slot (self, state->keywords_offset,  "_keywords")))
+    return NULL;
+
+  if (!(object = get_object (state, self, accessors)))
+    return NULL;
+
+  if (_class != Py_None || object != Py_None)
+    {
+      PyObject *method;
+
+#if PY_MAJOR_VERSION >= 3
+      /* `types.MethodType' refuses to bind `None', let Python code raise the error. */
+      if (object == Py_None)
+        {
+          Py_DECREF (object);
+          return PyObject_CallFunctionObjArgs (state->python_hash, self, NULL);
+        }
+
+      method = PyMethod_New (function, object);
+#else
+      method = PyMethod_New (function, object, _class);
+#endif
+
+      Py_DECREF (object);
+
+      if (!method)
+        return NULL;
+
+      hash = PyObject_Hash (method);
+      Py_DECREF (method);
+    }
+  else
+    {
+      Py_DECREF (object);
+      hash = PyObject_Hash (function);
+    }
+
+  if (hash == -1)
+    return NULL;
+
+  if ((is_true = PyObject_IsTrue (arguments)) != 0)
+    {
+      if (is_true == -1 || (part_hash = PyObject_Hash (arguments)) == -1)
+        return NULL;
+
+      hash ^= part_hash;
+    }
+
+  if ((is_true = PyObject_IsTrue (keywords)) != 0)
+    {
+      if (is_true == -1 || (part_hash = PyObject_Hash (keywords)) == -1)
+        return NULL;
+
+      hash ^= part_hash;
+    }
+
+  return HashValue_AsObject (hash);
+}
+
+
+
+/*- Binding methods ------------------------------------------------*/
+
+static PyObject *
+Binding_call (PyObject *self, PyObject *arguments, PyObject *keywords)
+{
+  BindModuleState *state     = BIND_MODULE_STATE_FROM_DEF ();
+  Accessors        accessors = get_accessors (state, self);
+
+  if (accessors == PYTHON_ACCESSORS)
+    return call_python_implementation (state->python_call, self, arguments, keywords);
+
+  return call_binding (state, self, accessors, arguments, keywords);
+}
+
+
+static PyObject *
+Binding_eq (PyObject *self, PyObject *other)
+{
+  BindModuleState *state  = BIND_MODULE_STATE_FROM_DEF ();
+  PyObject        *result;
+
+  switch (compare_binding (state, self, other))
+    {
+    case COMPARISON_ERROR:
+      return NULL;
+
+    case NOT_EQUAL:
+      result = Py_False;
+      break;
+
+    case EQUAL:
+      result = Py_True;
+      break;
+
+    case NOT_COMPARABLE:
+      result = Py_NotImplemented;
+      break;
+
+    default:
+      return PyObject_CallFunctionObjArgs (state->python_eq, self, other, NULL);
+    }
+
+  Py_INCREF (result);
+  return result;
+}
+
+
+static PyObject *
+Binding_ne (PyObject *self, PyObject *other)
+{
+  BindModuleState *state  = BIND_MODULE_STATE_FROM_DEF ();
+  PyObject        *result;
+
+  switch (compare_binding (state, self, other))
+    {
+    case COMPARISON_ERROR:
+      return NULL;
+
+    case NOT_EQUAL:
+      result = Py_True;
+      break;
+
+    case EQUAL:
+      result = Py_False;
+      break;
+
+    case NOT_COMPARABLE:
+      result = Py_NotImplemented;
+      break;
+
+    default:
+      return PyObject_CallFunctionObjArgs (state->python_ne, self, other, NULL);
+    }
+
+  Py_INCREF (result);
+  return result;
+}
+
+
+static PyObject *
+Binding_hash (PyObject *self, PyObject *unused)
+{
+  BindModuleState *state     = BIND_MODULE_STATE_FROM_DEF ();
+  Accessors        accessors = get_accessors (state, self);
+
+  if (accessors == PYTHON_ACCESSORS)
+    return PyObject_CallFunctionObjArgs (state->python_hash, self, NULL);
+
+  return hash_binding (state, self, accessors);
+}
+
+
+
+/*- WeakBinding methods --------------------------------------------*/
+
+static PyObject *
+WeakBinding_call (PyObject *self, PyObject *arguments, PyObject *keywords)
+{
+  BindModuleState *state     = BIND_MODULE_STATE_FROM_DEF ();
+  PyObject        *reference = get_slot (self, state->object_offset, "_object");
+  Accessors        accessors;
+
+  if (!reference)
+    return NULL;
+
+  /* Bindings without a callback keep the reference after the object dies. */
+  if (reference == Py_None
+      || (PyWeakref_CheckRef (reference) && PyWeakref_GET_OBJECT (reference) == Py_None))
+    return PyObject_CallMethodObjArgs (self, state->call_after_garbage_collecting_name,
+                                       NULL);
+
+  accessors = get_accessors (state, self);
+  if (accessors == PYTHON_ACCESSORS)
+    return call_python_implementation (state->python_weak_call, self, arguments, keywords);
+
+  return call_binding (state, self, accessors, arguments, keywords);
+}
+
+
+static PyObject *
+WeakBinding_hash (PyObject *self, PyObject *unused)
+{
+  BindModuleState *state = BIND_MODULE_STATE_FROM_DEF ();
+  PyObject        *hash  = get_slot (self, state->hash_offset, "_WeakBinding__hash");
+  Accessors        accessors;
+  int              is_alive;
+
+  if (!hash)
+    return NULL;
+
+  if (hash != Py_None)
+    {
+      Py_INCREF (hash);
+      return hash;
+    }
+
+  accessors = get_accessors (state, self);
+  if (accessors == PYTHON_ACCESSORS)
+    return PyObject_CallFunctionObjArgs (state->python_weak_hash, self, NULL);
+
+  if ((is_alive = PyObject_IsTrue (self)) != 1)
+    {
+      if (is_alive == 0)
+        PyErr_Format (PyExc_TypeError,
+                      "%s's object had been garbage-collected before first call to __hash__()",
+                      Py_TYPE (self)->tp_name);
+
+      return NULL;
+    }
+
+  hash = hash_binding (state, self, accessors);
+
+  if (hash)
+    {
+      PyObject *old_hash = SLOT (self, state->hash_offset);
+
+      Py_INCREF (hash);
+      SLOT (self, state->hash_offset) = hash;
+      Py_XDECREF (old_hash);
+    }
+
+  return hash;
+}
+
+
+
+/*- Module functions -----------------------------------------------*/
+
+static int
+get_slot_offset (PyTypeObject *type, const char *name, Py_ssize_t *offset)
+{
+  PyObject *descriptor = PyDict_GetItemString (type->tp_dict, name);
+
+  if (!descriptor
+      || Py_TYPE (descriptor) != &PyMemberDescr_Type
+      || ((PyMemberDescrObject *) descriptor)->d_member->type != T_OBJECT_EX)
+    {
+      PyErr_Format (PyExc_RuntimeError,
+                    "'%s' must be a slot of class %s for the extension to work",
+                    name, type->tp_name);
+      return -1;
+    }
+
+  *offset = ((PyMemberDescrObject *) descriptor)->d_member->offset;
+  return 0;
+}
+
+
+/* Return a new reference to `name' in `dictionary' or NULL with an exception set. */
+static PyObject *
+get_required_item (PyObject *dictionary, const char *name)
+{
+  PyObject *value = PyDict_GetItemString (dictionary, name);
+
+  if (!value)
+    {
+      PyErr_Format (PyExc_RuntimeError, "cannot find required '%s'", name);
+      return NULL;
+    }
+
+  Py_INCREF (value);
+  return value;
+}
+
+
+static int
+bind_module_initialize_state (PyObject *self)
+{
+  BindModuleState *state            = BIND_MODULE_STATE (self);
+  PyObject        *bind_module      = NULL;
+  PyObject        *bind_module_dict = NULL;
+  PyObject        *binding_dict;
+  PyObject        *weak_binding_dict;
+
+  bind_module = PyImport_ImportModule ("notify.bind");
+  if (!bind_module)
+    goto error;
+
+  bind_module_dict = PyModule_GetDict (bind_module);
+  if (!bind_module_dict)
+    goto error;
+
+  state->binding_type = (PyTypeObject *) PyDict_GetItemString (bind_module_dict, "Binding");
+  if (!state->binding_type || !PyType_Check (state->binding_type))
+    goto error;
+
+  Py_INCREF (state->binding_type);
+
+  state->weak_binding_type
+    = (PyTypeObject *) PyDict_GetItemString (bind_module_dict, "WeakBinding");
+  if (!state->weak_binding_type || !PyType_Check (state->weak_binding_type))
+    goto error;
+
+  Py_INCREF (state->weak_binding_type);
+
+  binding_dict      = state->binding_type->tp_dict;
+  weak_binding_dict = state->weak_binding_type->tp_dict;
+
+  if (!(state->binding_get_object
+          = get_required_item (binding_dict, "_get_object"))
+      || !(state->binding_get_function
+             = get_required_item (binding_dict, "_get_function"))
+      || !(state->binding_get_class
+             = get_required_item (binding_dict, "_get_class"))
+      || !(state->binding_get_arguments
+             = get_required_item (binding_dict, "_get_arguments"))
+      || !(state->binding_get_keywords
+             = get_required_item (binding_dict, "_get_keywords"))
+      || !(state->weak_binding_get_object
+             = get_required_item (weak_binding_dict, "_get_object")))
+    goto error;
+
+  if (!(state->python_call
+          = get_required_item (bind_module_dict, "_python_call"))
+      || !(state->python_weak_call
+             = get_required_item (bind_module_dict, "_python_weak_call"))
+      || !(state->python_eq
+             = get_required_item (bind_module_dict, "_python_eq"))
+      || !(state->python_ne
+             = get_required_item (bind_module_dict, "_python_ne"))
+      || !(state->python_hash
+             = get_required_item (bind_module_dict, "_python_hash"))
+      || !(state->python_weak_hash
+             = get_required_item (bind_module_dict, "_python_weak_hash")))
+    goto error;
+
+  if (get_slot_offset (state->binding_type, "_object",
+                       &state->object_offset) == -1
+      || get_slot_offset (state->binding_type, "_function",
+                          &state->function_offset) == -1
+      || get_slot_offset (state->binding_type, "_class",
+                          &state->class_offset) == -1
+      || get_slot_offset (state->binding_type, "_arguments",
+                          &state->arguments_offset) == -1
+      || get_slot_offset (state->binding_type, "_keywords",
+                          &state->keywords_offset) == -1
+      || get_slot_offset (state->weak_binding_type, "_WeakBinding__hash",
+                          &state->hash_offset) == -1)
+    goto error;
+
+  if (!(state->get_object_name
+          = Compatibility_InternFromString ("_get_object"))
+      || !(state->get_function_name
+             = Compatibility_InternFromString ("_get_function"))
+      || !(state->get_class_name
+             = Compatibility_InternFromString ("_get_class"))
+      || !(state->get_arguments_name
+             = Compatibility_InternFromString ("_get_arguments"))
+      || !(state->get_keywords_name
+             = Compatibility_InternFromString ("_get_keywords"))
+      || !(state->call_after_garbage_collecting_name
+             = Compatibility_InternFromString ("_call_after_garbage_collecting")))
+    goto error;
+
+  Py_DECREF (bind_module);
+
+  return 0;
+
+ error:
+  if (!PyErr_Occurred ())
+    PyErr_SetString (PyExc_RuntimeError, "cannot find required Py-notify classes");
+
+  Py_XDECREF (bind_module);
+  bind_module_clear (self);
+
+  return -1;
+}
+
+static int
+bind_module_traverse (PyObject *self, visitproc visit, void *arg)
+{
+  BindModuleState *state = BIND_MODULE_STATE (self);
+
+  Compatibility_VISIT (state->binding_type);
+  Compatibility_VISIT (state->weak_binding_type);
+  Compatibility_VISIT (state->binding_get_object);
+  Compatibility_VISIT (state->binding_get_function);
+  Compatibility_VISIT (state->binding_get_class);
+  Compatibility_VISIT (state->binding_get_arguments);
+  Compatibility_VISIT (state->binding_get_keywords);
+  Compatibility_VISIT (state->weak_binding_get_object);
+  Compatibility_VISIT (state->python_call);
+  Compatibility_VISIT (state->python_weak_call);
+  Compatibility_VISIT (state->python_eq);
+  Compatibility_VISIT (state->python_ne);
+  Compatibility_VISIT (state->python_hash);
+  Compatibility_VISIT (state->python_weak_hash);
+
+  return 0;
+}
+
+static int
+bind_module_clear (PyObject *self)
+{
+  BindModuleState *state = BIND_MODULE_STATE (self);
+
+  Compatibility_CLEAR (state->binding_type);
+  Compatibility_CLEAR (state->weak_binding_type);
+  Compatibility_CLEAR (state->binding_get_object);
+  Compatibility_CLEAR (state->binding_get_function);
+  Compatibility_CLEAR (state->binding_get_class);
+  Compatibility_CLEAR (state->binding_get_arguments);
+  Compatibility_CLEAR (state->binding_get_keywords);
+  Compatibility_CLEAR (state->weak_binding_get_object);
+  Compatibility_CLEAR (state->python_call);
+  Compatibility_CLEAR (state->python_weak_call);
+  Compatibility_CLEAR (state->python_eq);
+  Compatibility_CLEAR (state->python_ne);
+  Compatibility_CLEAR (state->python_hash);
+  Compatibility_CLEAR (state->python_weak_hash);
+
+  Compatibility_CLEAR (state->get_object_name);
+  Compatibility_CLEAR (state->get_function_name);
+  Compatibility_CLEAR (state->get_class_name);
+  Compatibility_CLEAR (state->get_arguments_name);
+  Compatibility_CLEAR (state->get_keywords_name);
+  Compatibility_CLEAR (state->call_after_garbage_collecting_name);
+
+  return 0;
+}
+
+
+/* Create an unbound method of `type' and store it in `dictionary' under `name'. */
+static int
+add_method (PyObject *dictionary, PyTypeObject *type, const char *name,
+            PyMethodDef *definition)
+{
+  PyObject *method = PyDescr_NewMethod (type, definition);
+  int       result;
+
+  if (!method)
+    return -1;
+
+  result = PyDict_SetItemString (dictionary, name, method);
+  Py_DECREF (method);
+
+  return result;
+}
+
+
+
+/*- Module initialization ------------------------------------------*/
+
+Compatibility_MODINIT_FUNC
+Compatibility_MODINIT_FUNC_NAME (_bind) (void)
+{
+  PyObject        *module = NULL;
+  PyObject        *dictionary;
+  BindModuleState *state;
+
+  module = Compatibility_ModuleCreate (&bind_module);
+  if (!module)
+    goto error;
+
+  state = BIND_MODULE_STATE (module);
+  memset (state, 0, sizeof (BindModuleState));
+
+  if (!Compatibility_ModulePostCreate (module, &bind_module))
+    goto error;
+
+  if (bind_module_initialize_state (module) == -1)
+    goto error;
+
+  dictionary = PyModule_GetDict (module);
+  if (!dictionary)
+    goto error;
+
+  if (add_method (dictionary, state->binding_type, "call", &Binding_call_method) == -1
+      || add_method (dictionary, state->binding_type, "eq", &Binding_eq_method) == -1
+      || add_method (dictionary, state->binding_type, "ne", &Binding_ne_method) == -1
+      || add_method (dictionary, state->binding_type, "hash", &Binding_hash_method) == -1
+      || add_method (dictionary, state->weak_binding_type, "weak_call",
+                     &WeakBinding_call_method) == -1
+      || add_method (dictionary, state->weak_binding_type, "weak_hash",
+                     &WeakBinding_hash_method) == -1)
+    goto error;
+
+  goto do_return;
+
+ error:
+  Compatibility_CLEAR (module);
+
+ do_return:
+  Compatibility_ModuleReturn (module);
+}
+
+
+/*
+ * Local variables:
+ * coding: utf-8
+ * mode: c
+ * c-basic-offset: 2
+ * indent-tabs-mode: nil
+ * fill-column: 90
+ * End:
+ */
@@ -20,144 +20,7 @@
 \*--------------------------------------------------------------------*/
 
 
-#include <Python.h>
-
-
-/* See Python documentation for why it prevents rare and very obscure bug.  Need to
- * backport for older Python versions.
- */
-#ifdef Py_CLEAR
-#  define Compatibility_CLEAR(object) Py_CLEAR (object)
-#else
-#  define Compatibility_CLEAR(object)                   \
-     do                                                 \
-       {                                                \
-         if (object)                                    \
-           {                                            \
-             PyObject *temp = (PyObject *) (object);    \
-             (object) = NULL;                           \
-             Py_DECREF (temp);                          \
-           }                                            \
-       }                                                \
-     while (0)
-#endif
-
-/* Py_VISIT is not available in 2.3. */
-#ifdef Py_VISIT
-#  define Compatibility_VISIT(object) Py_VISIT (object)
-#else
-#  define Compatibility_VISIT(object)                           \
-     do                                                         \
-       {                                                        \
-         if (object)                                            \
-           {                                                    \
-             int result = visit ((PyObject *) (object), arg);   \
-             if (result)                                        \
-               return result;                                   \
-           }                                                    \
-       }                                                        \
-     while (0)
-#endif
-
-
-/* Needed for Py3k, not defined earlier. */
-#ifdef PyVarObject_HEAD_INIT
-#  define Compatibility_VarObject_HEAD_INIT(ob_size) PyVarObject_HEAD_INIT (0, ob_size)
-#else
-#  define Compatibility_VarObject_HEAD_INIT(ob_size) PyObject_HEAD_INIT (0) ob_size,
-#endif
-
-
-/* Another difference between 2.x and 3.x. */
-#if defined (PY_MAJOR_VERSION) && PY_MAJOR_VERSION >= 3
-#  define Compatibility_Type_Type(type) (type).ob_base.ob_base.ob_type
-#else
-#  define Compatibility_Type_Type(type) (type).ob_type
-#endif
-
-
-#ifdef Py_TPFLAGS_HAVE_VERSION_TAG
-#  define Compatibility_TPFLAGS_HAVE_VERSION_TAG Py_TPFLAGS_HAVE_VERSION_TAG
-#else
-#  define Compatibility_TPFLAGS_HAVE_VERSION_TAG 0
-#endif
-
-
-/* Working around more changes in Py3k: module initialization. */
-#ifdef PyMODINIT_FUNC
-#  define Compatibility_MODINIT_FUNC PyMODINIT_FUNC
-#else
-#  ifdef DL_EXPORT
-#    define Compatibility_MODINIT_FUNC DL_EXPORT (void)
-#  else
-#    define Compatibility_MODINIT_FUNC void
-#  endif
-#endif
-
-
-#ifdef PyModuleDef_HEAD_INIT
-
-#  define Compatibility_ModuleDef                 PyModuleDef
-#  define Compatibility_ModuleDef_HEAD_INIT       PyModuleDef_HEAD_INIT
-#  define Compatibility_MODINIT_FUNC_NAME(module) PyInit_##module
-
-#  define Compatibility_ModuleCreate(definition)  PyModule_Create (definition)
-#  define Compatibility_ModulePostCreate(module, definition)     \
-     (PyModule_AddStringConstant ((module), "__docformat__",     \
-                                  "epytext en") == 0)
-
-#  define Compatibility_ModuleReturn(module)      return (module)
-
-#  define Compatibility_ModuleState(def, module, type)           \
-     ((type *) PyModule_GetState (module))
-#  define Compatibility_ModuleStateFromDef(def, type)            \
-     ((type *) PyModule_GetState (PyState_FindModule (&def)))
-
-#else  /* !defined PyMODINIT_FUNC */
-
-typedef
-struct
-{
-  const int      dummy;
-  const char    *m_name;
-  const char    *m_doc;
-  int            m_size;
-  PyMethodDef   *m_methods;
-  inquiry        m_reload;
-  traverseproc   m_traverse;
-  inquiry        m_clear;
-  freefunc       m_free;
-}
-Compatibility_ModuleDef;
-
-#  define Compatibility_ModuleDef_HEAD_INIT       0
-#  define Compatibility_MODINIT_FUNC_NAME(module) init##module
-
-#  define Compatibility_ModuleCreate(definition)                        \
-     Py_InitModule ((char *) (definition)->m_name, NULL)
-#  define Compatibility_ModulePostCreate(module, definition)            \
-     (PyModule_AddStringConstant ((module), "__doc__",                  \
-                                  (char *) (definition)->m_doc) == 0    \
-      && PyModule_AddStringConstant ((module), "__docformat__",         \
-                                     "epytext en") == 0)
-
-#  define Compatibility_ModuleReturn(module)      return
-
-#  define Compatibility_ModuleState(def, module, type)                  \
-     (&__2_x_state__##def)
-#  define Compatibility_ModuleStateFromDef(def, type)                   \
-     (&__2_x_state__##def)
-#  define Compatibility_2_x_MODULE_STATE          1
-
-
-#endif  /* !defined PyMODINIT_FUNC */
-
-
-/* Also compatibility, but let's avoid long name in this case. */
-#if defined (PY_MAJOR_VERSION) && PY_MAJOR_VERSION >= 3
-#  define PyInt_AsLong   PyLong_AsLong
-#  define PyInt_FromLong PyLong_FromLong
-#endif
+#include "_compatibility.h"
 
 
 
@@ -0,0 +1,1166 @@
+/*--------------------------------------------------------------------*\
+ * This file is part of Py-notify.                                    *
+ *                                                                    *
+ * Copyright (C) 2007, 2008 Paul Pogonyshev.                          *
+ *                                                                    *
+ * This library is free software; you can redistribute it and/or      *
+ * modify it under the terms of the GNU Lesser General Public License *
+ * as published by the Free Software Foundation; either version 2.1   *
+ * of the License, or (at your option) any later version.             *
+ *                                                                    *
+ * This library is distributed in the hope that it will be useful,    *
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of     *
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  *
+ * Lesser General Public License for more details.                    *
+ *                                                                    *
+ * You should have received a copy of the GNU Lesser General Public   *
+ * License along with this library; if not, write to the Free         *
+ * Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        *
+ * Boston, MA 02110-1301 USA                                          *
+\*--------------------------------------------------------------------*/
+
+
+#include "_compatibility.h"
+#include <structmember.h>
+
+
+/* Exception state manipulation.  We need to make the exception raised by a handler
+ * `current' while reporting it, exactly as an `except:' clause in Python code would.
+ */
+#if PY_VERSION_HEX >= 0x03030000
+
+#  define Compatibility_GetExcInfo(type, value, traceback)      \
+     PyErr_GetExcInfo ((type), (value), (traceback))
+#  define Compatibility_SetExcInfo(type, value, traceback)      \
+     PyErr_SetExcInfo ((type), (value), (traceback))
+
+#else
+
+static void
+Compatibility_GetExcInfo (PyObject **type, PyObject **value, PyObject **traceback)
+{
+  PyThreadState *thread_state = PyThreadState_GET ();
+
+  *type      = thread_state->exc_type;
+  *value     = thread_state->exc_value;
+  *traceback = thread_state->exc_traceback;
+
+  Py_XINCREF (*type);
+  Py_XINCREF (*value);
+  Py_XINCREF (*traceback);
+}
+
+static void
+Compatibility_SetExcInfo (PyObject *type, PyObject *value, PyObject *traceback)
+{
+  PyThreadState *thread_state   = PyThreadState_GET ();
+  PyObject      *old_type       = thread_state->exc_type;
+  PyObject      *old_value      = thread_state->exc_value;
+  PyObject      *old_traceback  = thread_state->exc_traceback;
+
+  thread_state->exc_type        = type;
+  thread_state->exc_value       = value;
+  thread_state->exc_traceback   = traceback;
+
+  Py_XDECREF (old_type);
+  Py_XDECREF (old_value);
+  Py_XDECREF (old_traceback);
+}
+
+#endif
+
+
+
+/*- Type forward declarations --------------------------------------*/
+
+/* How handler values are accumulated.  Standard accumulators are recognized by exact type
+ * and handled inline; everything else goes through the generic method-based protocol.
+ * Must match `_*_ACCUMULATION' constants in `notify/signal.py'.
+ */
+typedef
+enum
+{
+  GENERIC_ACCUMULATION,
+  ANY_ACCEPTS_ACCUMULATION,
+  ALL_ACCEPT_ACCUMULATION,
+  LAST_VALUE_ACCUMULATION,
+  VALUE_LIST_ACCUMULATION
+}
+Accumulation;
+
+typedef
+struct
+{
+  PyTypeObject *       signal_type;
+  PyObject *           abstract_signal_type;
+  PyTypeObject *       weak_binding_type;
+  PyObject *           unhashable_blocked_key;
+  PyObject *           report_handler_exception;
+
+  /* Standard accumulator types, see `Accumulation'. */
+  PyObject *           any_accepts_accumulator_type;
+  PyObject *           all_accept_accumulator_type;
+  PyObject *           last_value_accumulator_type;
+  PyObject *           value_list_accumulator_type;
+
+  /* Offsets of `Signal' slots, as reported by their member descriptors. */
+  Py_ssize_t           handlers_offset;
+  Py_ssize_t           blocked_handlers_offset;
+  Py_ssize_t           accumulator_offset;
+  Py_ssize_t           emission_level_offset;
+
+  PyObject *           get_initial_value_name;
+  PyObject *           accumulate_value_name;
+  PyObject *           should_continue_name;
+  PyObject *           post_process_value_name;
+  PyObject *           collect_garbage_name;
+}
+SignalModuleState;
+
+
+
+/*- Functions forward declarations ---------------------------------*/
+
+static PyObject *   Signal_emit                     (PyObject *self,
+                                                     PyObject *arguments, PyObject *keywords);
+static PyObject *   Signal_emit_many                (PyObject *self, PyObject *argument_sets);
+
+static int          is_handler_blocked              (SignalModuleState *state,
+                                                     PyObject *blocked_handlers,
+                                                     PyObject *handler);
+
+static int          signal_module_initialize_state  (PyObject *self);
+static int          signal_module_traverse          (PyObject *self, visitproc visit, void *arg);
+static int          signal_module_clear             (PyObject *self);
+
+
+
+/*- Documentation --------------------------------------------------*/
+
+#define MODULE_DOC "Internal helper module for C{L{notify.signal}}.  Do not use directly."
+
+
+#define SIGNAL_EMIT_DOC "\
+emit(self, *arguments, **keywords) \
+\n\
+Native implementation of C{L{Signal.emit <notify.signal.Signal.emit>}}.  It is semantically \
+identical to the Python implementation, it is only faster."
+
+#define SIGNAL_EMIT_MANY_DOC "\
+emit_many(self, argument_sets) \
+\n\
+Native implementation of C{L{Signal.emit_many <notify.signal.Signal.emit_many>}}."
+
+
+
+/*- Static variables -----------------------------------------------*/
+
+static PyMethodDef  Signal_emit_method
+  = { "emit", (PyCFunction) Signal_emit, METH_VARARGS | METH_KEYWORDS, SIGNAL_EMIT_DOC };
+
+static PyMethodDef  Signal_emit_many_method
+  = { "emit_many", (PyCFunction) Signal_emit_many, METH_O, SIGNAL_EMIT_MANY_DOC };
+
+
+static Compatibility_ModuleDef  signal_module
+  = { Compatibility_ModuleDef_HEAD_INIT,
+      "notify._signal",
+      MODULE_DOC,
+      sizeof (SignalModuleState),
+      NULL,
+      NULL,
+      signal_module_traverse,
+      signal_module_clear,
+      NULL };
+
+#define SIGNAL_MODULE_STATE(module)                                     \
+  Compatibility_ModuleState (signal_module, module, SignalModuleState)
+#define SIGNAL_MODULE_STATE_FROM_DEF()                                  \
+  Compatibility_ModuleStateFromDef (signal_module, SignalModuleState)
+
+#if Compatibility_2_x_MODULE_STATE
+static SignalModuleState __2_x_state__signal_module;
+#endif
+
+
+/* Direct access to (Python-level) slots of a `Signal' instance. */
+#define SLOT(object, offset)  (*(PyObject **) ((char *) (object) + (offset)))
+
+
+
+/*- Helper functions -----------------------------------------------*/
+
+static PyObject *
+get_slot (PyObject *self, Py_ssize_t offset, const char *name)
+{
+  PyObject *value = SLOT (self, offset);
+
+  if (!value)
+    PyErr_SetString (PyExc_AttributeError, name);
+
+  return value;
+}
+
+
+static int
+set_emission_level (SignalModuleState *state, PyObject *self, long emission_level)
+{
+  PyObject *new_value = PyInt_FromLong (emission_level);
+  PyObject *old_value;
+
+  if (!new_value)
+    return -1;
+
+  old_value                                  = SLOT (self, state->emission_level_offset);
+  SLOT (self, state->emission_level_offset)  = new_value;
+  Py_XDECREF (old_value);
+
+  return 0;
+}
+
+
+static Accumulation
+get_accumulation (SignalModuleState *state, PyObject *accumulator)
+{
+  PyObject *type = (PyObject *) Py_TYPE (accumulator);
+
+  if (type == state->any_accepts_accumulator_type)
+    return ANY_ACCEPTS_ACCUMULATION;
+  if (type == state->all_accept_accumulator_type)
+    return ALL_ACCEPT_ACCUMULATION;
+  if (type == state->last_value_accumulator_type)
+    return LAST_VALUE_ACCUMULATION;
+  if (type == state->value_list_accumulator_type)
+    return VALUE_LIST_ACCUMULATION;
+
+  return GENERIC_ACCUMULATION;
+}
+
+
+/* Return a new reference to the initial accumulated value or NULL on failure. */
+static PyObject *
+get_initial_value (SignalModuleState *state, PyObject *accumulator,
+                   Accumulation accumulation)
+{
+  PyObject *value;
+
+  switch (accumulation)
+    {
+    case ANY_ACCEPTS_ACCUMULATION:
+      value = Py_False;
+      break;
+
+    case ALL_ACCEPT_ACCUMULATION:
+      value = Py_True;
+      break;
+
+    case LAST_VALUE_ACCUMULATION:
+      value = Py_None;
+      break;
+
+    case VALUE_LIST_ACCUMULATION:
+      return PyList_New (0);
+
+    default:
+      return PyObject_CallMethodObjArgs (accumulator, state->get_initial_value_name, NULL);
+    }
+
+  Py_INCREF (value);
+  return value;
+}
+
+
+/* Return a new reference to the final emission result or NULL on failure. */
+static PyObject *
+post_process_value (SignalModuleState *state, PyObject *accumulator,
+                    Accumulation accumulation, PyObject *value)
+{
+  if (accumulation == GENERIC_ACCUMULATION)
+    return PyObject_CallMethodObjArgs (accumulator, state->post_process_value_name,
+                                       value, NULL);
+
+  Py_INCREF (value);
+  return value;
+}
+
+
+/* Call `_report_handler_exception' for the currently set exception, which must have been
+ * raised by `handler'.  Returns 0 if the exception handler returned normally
+ * (the exception is then cleared) or -1 if it raised anything.
+ */
+static int
+call_exception_handler (SignalModuleState *state, PyObject *self, PyObject *handler)
+{
+  PyObject *type;
+  PyObject *value;
+  PyObject *traceback;
+  PyObject *saved_type;
+  PyObject *saved_value;
+  PyObject *saved_traceback;
+  PyObject *result;
+
+  PyErr_Fetch (&type, &value, &traceback);
+  PyErr_NormalizeException (&type, &value, &traceback);
+
+  if (!value)
+    {
+      value = Py_None;
+      Py_INCREF (value);
+    }
+
+  Py_INCREF (value);
+
+  Compatibility_GetExcInfo (&saved_type, &saved_value, &saved_traceback);
+  Compatibility_SetExcInfo (type, value, traceback);
+
+  result = PyObject_CallFunctionObjArgs (state->report_handler_exception,
+                                         self, value, handler, NULL);
+
+  Compatibility_SetExcInfo (saved_type, saved_value, saved_traceback);
+  Py_DECREF (value);
+
+  if (!result)
+    return -1;
+
+  Py_DECREF (result);
+  return 0;
+}
+
+
+/* Call `handler' with `arguments' and `keywords'.  If it raises, pass the exception to
+ * the exception handler, else pass the returned value to the `accumulator' (unless that
+ * is None), updating `*value'.  Returns 1 if emission should go on, 0 if accumulator
+ * stops it or -1 on failure.
+ */
+static int
+invoke_handler (SignalModuleState *state, PyObject *self, PyObject *handler,
+                PyObject *arguments, PyObject *keywords,
+                PyObject *accumulator, Accumulation accumulation, PyObject **value)
+{
+  PyObject *result = PyObject_Call (handler, arguments, keywords);
+  PyObject *new_value;
+  PyObject *should_continue;
+  int       continue_emission;
+
+  if (!result)
+    return (call_exception_handler (state, self, handler) == -1 ? -1 : 1);
+
+  if (accumulator == Py_None)
+    {
+      Py_DECREF (result);
+      return 1;
+    }
+
+  switch (accumulation)
+    {
+    case VALUE_LIST_ACCUMULATION:
+      continue_emission = (PyList_Append (*value, result) == -1 ? -1 : 1);
+      Py_DECREF (result);
+      return continue_emission;
+
+    case GENERIC_ACCUMULATION:
+      break;
+
+    default:
+      Py_DECREF (*value);
+      *value = result;
+
+      if (accumulation == LAST_VALUE_ACCUMULATION)
+        return 1;
+
+      continue_emission = PyObject_IsTrue (result);
+      if (continue_emission == -1)
+        return -1;
+
+      /* `ANY_ACCEPTS' stops at the first true value, `ALL_ACCEPT' at the first false. */
+      return (accumulation == ANY_ACCEPTS_ACCUMULATION ? !continue_emission
+              : continue_emission);
+    }
+
+  new_value = PyObject_CallMethodObjArgs (accumulator, state->accumulate_value_name,
+                                          *value, result, NULL);
+  Py_DECREF (result);
+
+  if (!new_value)
+    return -1;
+
+  Py_DECREF (*value);
+  *value = new_value;
+
+  should_continue = PyObject_CallMethodObjArgs (accumulator, state->should_continue_name,
+                                                *value, NULL);
+  if (!should_continue)
+    return -1;
+
+  continue_emission = PyObject_IsTrue (should_continue);
+  Py_DECREF (should_continue);
+
+  return continue_emission;
+}
+
+
+/* The `finally' part of the Python implementation: restore emission level and collect
+ * garbage if needed.  Any currently set exception is preserved, unless collecting
+ * garbage raises, in which case that exception wins, just as in Python.  Returns -1 only
+ * in the latter case.
+ */
+static int
+finish_emission (SignalModuleState *state, PyObject *self,
+                 long saved_emission_level, int might_have_garbage)
+{
+  PyObject *error_type;
+  PyObject *error_value;
+  PyObject *error_traceback;
+
+  PyErr_Fetch (&error_type, &error_value, &error_traceback);
+
+  if (set_emission_level (state, self, saved_emission_level) == -1)
+    PyErr_Clear ();
+
+  if (might_have_garbage && saved_emission_level == 0)
+    {
+      PyObject *collect_result
+        = PyObject_CallMethodObjArgs (self, state->collect_garbage_name, NULL);
+
+      if (!collect_result)
+        {
+          Py_XDECREF (error_type);
+          Py_XDECREF (error_value);
+          Py_XDECREF (error_traceback);
+
+          return -1;
+        }
+
+      Py_DECREF (collect_result);
+    }
+
+  PyErr_Restore (error_type, error_value, error_traceback);
+  return 0;
+}
+
+
+
+/* Return a new reference to the next handler to process, or NULL when there are no more
+ * or on error.  A lone handler, stored inline in `_handlers', is passed as `*pending' and
+ * returned first.  If handlers are connected during its call, `_handlers' becomes a list
+ * starting with that handler (or its placeholder), so iteration continues with the rest
+ * of that list.  See implementation notes in `Signal' class.
+ */
+static PyObject *
+next_handler (SignalModuleState *state, PyObject *self,
+              PyObject **pending, PyObject **iterator)
+{
+  PyObject *handlers;
+  PyObject *skipped;
+
+  if (*pending)
+    {
+      PyObject *handler = *pending;
+
+      *pending = NULL;
+      Py_INCREF (handler);
+      return handler;
+    }
+
+  if (*iterator)
+    return PyIter_Next (*iterator);
+
+  handlers = SLOT (self, state->handlers_offset);
+  if (!handlers || !PyList_CheckExact (handlers))
+    return NULL;
+
+  *iterator = PyObject_GetIter (handlers);
+  if (!*iterator)
+    return NULL;
+
+  skipped = PyIter_Next (*iterator);
+  if (!skipped)
+    return NULL;
+
+  Py_DECREF (skipped);
+  return PyIter_Next (*iterator);
+}
+
+
+/*- Signal methods -------------------------------------------------*/
+
+/* NOTE: If, for some reason, you change this, don't forget to adjust `Signal.emit' in
+ *       `notify/signal.py' accordingly.  Both implementations must stay semantically
+ *       identical.
+ */
+static PyObject *
+Signal_emit (PyObject *self, PyObject *arguments, PyObject *keywords)
+{
+  SignalModuleState *state              = SIGNAL_MODULE_STATE_FROM_DEF ();
+  PyObject          *accumulator;
+  Accumulation       accumulation       = GENERIC_ACCUMULATION;
+  PyObject          *handlers;
+  PyObject          *value              = NULL;
+  PyObject          *iterator           = NULL;
+  PyObject          *pending            = NULL;
+  PyObject          *handler            = NULL;
+  PyObject          *result;
+  long               saved_emission_level;
+  int                lone_handler       = 0;
+  int                might_have_garbage = 0;
+  int                failed             = 0;
+
+  accumulator = get_slot (self, state->accumulator_offset, "_Signal__accumulator");
+  if (!accumulator)
+    return NULL;
+
+  handlers = get_slot (self, state->handlers_offset, "_handlers");
+  if (!handlers)
+    return NULL;
+
+  /* Neither can be replaced during emission, but the references are only borrowed. */
+  Py_INCREF (accumulator);
+  Py_INCREF (handlers);
+
+  if (accumulator != Py_None)
+    {
+      accumulation = get_accumulation (state, accumulator);
+      value        = get_initial_value (state, accumulator, accumulation);
+      if (!value)
+        goto error;
+    }
+
+  if (handlers != Py_None)
+    {
+      PyObject *emission_level = get_slot (self, state->emission_level_offset,
+                                           "_Signal__emission_level");
+      if (!emission_level)
+        goto error;
+
+      saved_emission_level = PyInt_AsLong (emission_level);
+      if (saved_emission_level == -1 && PyErr_Occurred ())
+        goto error;
+
+      if (set_emission_level (state, self, labs (saved_emission_level) + 1) == -1)
+        goto error;
+
+      lone_handler = (!PyList_CheckExact (handlers) && !PyTuple_CheckExact (handlers));
+
+      if (lone_handler)
+        pending = handlers;
+      else
+        {
+          iterator = PyObject_GetIter (handlers);
+          if (!iterator)
+            failed = 1;
+        }
+
+      while (!failed
+             && (handler = next_handler (state, self, &pending, &iterator)) != NULL)
+        {
+          PyObject *blocked_handlers;
+          int       is_blocked;
+          int       continue_emission;
+
+          /* Disconnected while in emission handlers are temporary set to None. */
+          if (handler == Py_None)
+            {
+              might_have_garbage = 1;
+              Compatibility_CLEAR (handler);
+              continue;
+            }
+
+          if (PyInt_AsLong (SLOT (self, state->emission_level_offset)) < 0)
+            {
+              might_have_garbage = 1;
+              break;
+            }
+
+          /* We need to refetch blocked handlers before processing each handler,
+           * because they may change during emission.
+           */
+          blocked_handlers = get_slot (self, state->blocked_handlers_offset,
+                                       "_blocked_handlers");
+          if (!blocked_handlers)
+            {
+              failed = 1;
+              break;
+            }
+
+          Py_INCREF (blocked_handlers);
+          is_blocked = is_handler_blocked (state, blocked_handlers, handler);
+          Py_DECREF (blocked_handlers);
+
+          if (is_blocked)
+            {
+              if (is_blocked == -1)
+                failed = 1;
+
+              Compatibility_CLEAR (handler);
+              continue;
+            }
+
+          if (PyObject_TypeCheck (handler, state->weak_binding_type))
+            {
+              int is_alive = PyObject_IsTrue (handler);
+
+              if (is_alive != 1)
+                {
+                  /* Handler will be removed in collect_garbage(), don't bother now. */
+                  if (is_alive == -1)
+                    failed = 1;
+                  else
+                    might_have_garbage = 1;
+
+                  Compatibility_CLEAR (handler);
+                  continue;
+                }
+            }
+
+          continue_emission = invoke_handler (state, self, handler, arguments, keywords,
+                                              accumulator, accumulation, &value);
+          Compatibility_CLEAR (handler);
+
+          if (continue_emission != 1)
+            {
+              if (continue_emission == -1)
+                failed = 1;
+              else
+                might_have_garbage = 1;
+
+              break;
+            }
+        }
+
+      Compatibility_CLEAR (handler);
+      Compatibility_CLEAR (iterator);
+
+      if (PyErr_Occurred ())
+        failed = 1;
+
+      /* A lone handler becomes a list only if handlers change during emission. */
+      if (lone_handler && SLOT (self, state->handlers_offset)
+          && PyList_CheckExact (SLOT (self, state->handlers_offset)))
+        might_have_garbage = 1;
+
+      if (finish_emission (state, self, saved_emission_level, might_have_garbage) == -1
+          || failed)
+        goto error;
+    }
+
+  Py_DECREF (handlers);
+
+  if (accumulator == Py_None)
+    {
+      Py_DECREF (accumulator);
+      Py_INCREF (Py_None);
+      return Py_None;
+    }
+  else
+    {
+      result = post_process_value (state, accumulator, accumulation, value);
+      Py_DECREF (accumulator);
+      Py_DECREF (value);
+
+      return result;
+    }
+
+ error:
+  Py_XDECREF (value);
+  Py_DECREF (handlers);
+  Py_DECREF (accumulator);
+
+  return NULL;
+}
+
+
+/* NOTE: If, for some reason, you change this, don't forget to adjust `Signal.emit_many'
+ *       in `notify/signal.py' accordingly.
+ */
+static PyObject *
+Signal_emit_many (PyObject *self, PyObject *argument_sets)
+{
+  SignalModuleState *state                = SIGNAL_MODULE_STATE_FROM_DEF ();
+  PyObject          *accumulator;
+  Accumulation       accumulation         = GENERIC_ACCUMULATION;
+  PyObject          *handlers;
+  PyObject          *blocked_handlers;
+  PyObject          *emission_level_object;
+  PyObject          *active_handlers      = NULL;
+  PyObject          *results              = NULL;
+  PyObject          *iterator             = NULL;
+  PyObject          *argument_set;
+  long               saved_emission_level;
+  long               emission_level;
+  int                might_have_garbage   = 0;
+  int                failed               = 0;
+
+  accumulator = get_slot (self, state->accumulator_offset, "_Signal__accumulator");
+  if (!accumulator)
+    return NULL;
+
+  handlers = get_slot (self, state->handlers_offset, "_handlers");
+  if (!handlers)
+    return NULL;
+
+  blocked_handlers = get_slot (self, state->blocked_handlers_offset, "_blocked_handlers");
+  if (!blocked_handlers)
+    return NULL;
+
+  emission_level_object = get_slot (self, state->emission_level_offset,
+                                    "_Signal__emission_level");
+  if (!emission_level_object)
+    return NULL;
+
+  saved_emission_level = PyInt_AsLong (emission_level_object);
+  if (saved_emission_level == -1 && PyErr_Occurred ())
+    return NULL;
+
+  emission_level = labs (saved_emission_level) + 1;
+
+  if (accumulator != Py_None)
+    accumulation = get_accumulation (state, accumulator);
+
+  Py_INCREF (accumulator);
+  Py_INCREF (blocked_handlers);
+
+  active_handlers = PyList_New (0);
+  if (!active_handlers)
+    goto error;
+
+  if (handlers != Py_None)
+    {
+      PyObject *handler;
+
+      if (PyList_CheckExact (handlers) || PyTuple_CheckExact (handlers))
+        iterator = PyObject_GetIter (handlers);
+      else
+        {
+          /* A lone handler stored inline. */
+          PyObject *lone_handler = PyTuple_Pack (1, handlers);
+          if (!lone_handler)
+            goto error;
+
+          iterator = PyObject_GetIter (lone_handler);
+          Py_DECREF (lone_handler);
+        }
+
+      if (!iterator)
+        goto error;
+
+      while ((handler = PyIter_Next (iterator)) != NULL)
+        {
+          int skip = 0;
+
+          if (handler == Py_None)
+            skip = 1;
+          else if (PyObject_TypeCheck (handler, state->weak_binding_type))
+            {
+              int is_alive = PyObject_IsTrue (handler);
+              skip         = (is_alive == -1 ? -1 : !is_alive);
+            }
+
+          if (skip == 1)
+            might_have_garbage = 1;
+          else if (skip == 0)
+            skip = is_handler_blocked (state, blocked_handlers, handler);
+
+          if (skip == -1 || (!skip && PyList_Append (active_handlers, handler) == -1))
+            {
+              Py_DECREF (handler);
+              goto error;
+            }
+
+          Py_DECREF (handler);
+        }
+
+      Compatibility_CLEAR (iterator);
+
+      if (PyErr_Occurred ())
+        goto error;
+    }
+
+  results = PyList_New (0);
+  if (!results)
+    goto error;
+
+  iterator = PyObject_GetIter (argument_sets);
+  if (!iterator)
+    goto error;
+
+  while (!failed && (argument_set = PyIter_Next (iterator)) != NULL)
+    {
+      PyObject   *arguments = PySequence_Tuple (argument_set);
+      PyObject   *value     = NULL;
+      PyObject   *result    = NULL;
+      Py_ssize_t  k;
+
+      Py_DECREF (argument_set);
+
+      if (!arguments)
+        {
+          failed = 1;
+          break;
+        }
+
+      if (set_emission_level (state, self, emission_level) == -1)
+        failed = 1;
+      else if (accumulator != Py_None)
+        {
+          value = get_initial_value (state, accumulator, accumulation);
+          if (!value)
+            failed = 1;
+        }
+
+      for (k = 0; !failed && k < PyList_GET_SIZE (active_handlers); k++)
+        {
+          PyObject *handler = PyList_GET_ITEM (active_handlers, k);
+          int       continue_emission;
+
+          if (PyInt_AsLong (SLOT (self, state->emission_level_offset)) < 0)
+            break;
+
+          /* A handler can only be dead here if its object has been garbage-collected
+           * during this very call.
+           */
+          if (PyObject_TypeCheck (handler, state->weak_binding_type))
+            {
+              int is_alive = PyObject_IsTrue (handler);
+
+              if (is_alive != 1)
+                {
+                  if (is_alive == -1)
+                    failed = 1;
+                  else
+                    might_have_garbage = 1;
+
+                  continue;
+                }
+            }
+
+          continue_emission = invoke_handler (state, self, handler, arguments, NULL,
+                                              accumulator, accumulation, &value);
+
+          if (continue_emission != 1)
+            {
+              if (continue_emission == -1)
+                failed = 1;
+
+              break;
+            }
+        }
+
+      Py_DECREF (arguments);
+
+      if (!failed)
+        {
+          if (accumulator == Py_None)
+            {
+              result = Py_None;
+              Py_INCREF (result);
+            }
+          else
+            result = post_process_value (state, accumulator, accumulation, value);
+
+          if (!result || PyList_Append (results, result) == -1)
+            failed = 1;
+
+          Py_XDECREF (result);
+        }
+
+      Py_XDECREF (value);
+    }
+
+  Compatibility_CLEAR (iterator);
+
+  if (PyErr_Occurred ())
+    failed = 1;
+
+  if (finish_emission (state, self, saved_emission_level, might_have_garbage) == -1
+      || failed)
+    goto error;
+
+  Py_DECREF (active_handlers);
+  Py_DECREF (blocked_handlers);
+  Py_DECREF (accumulator);
+
+  return results;
+
+ error:
+  Py_XDECREF (iterator);
+  Py_XDECREF (results);
+  Py_XDECREF (active_handlers);
+  Py_DECREF (blocked_handlers);
+  Py_DECREF (accumulator);
+
+  return NULL;
+}
+
+
+
+/*- Module functions -----------------------------------------------*/
+
+/* Mirrors `_is_blocked' in `notify/signal.py'. */
+static int
+is_handler_blocked (SignalModuleState *state, PyObject *blocked_handlers, PyObject *handler)
+{
+  PyObject *unhashable_handlers;
+  int       is_blocked;
+
+  if (!PyDict_Check (blocked_handlers))
+    return PySequence_Contains (blocked_handlers, handler);
+
+  is_blocked = PyDict_Contains (blocked_handlers, handler);
+  if (is_blocked != -1 || !PyErr_ExceptionMatches (PyExc_TypeError))
+    return is_blocked;
+
+  PyErr_Clear ();
+
+  unhashable_handlers = PyDict_GetItem (blocked_handlers, state->unhashable_blocked_key);
+  if (!unhashable_handlers)
+    return 0;
+
+  Py_INCREF (unhashable_handlers);
+  is_blocked = PySequence_Contains (unhashable_handlers, handler);
+  Py_DECREF (unhashable_handlers);
+
+  return is_blocked;
+}
+
+
+static int
+get_slot_offset (PyTypeObject *type, const char *name, Py_ssize_t *offset)
+{
+  PyObject *descriptor = PyDict_GetItemString (type->tp_dict, name);
+
+  if (!descriptor
+      || Py_TYPE (descriptor) != &PyMemberDescr_Type
+      || ((PyMemberDescrObject *) descriptor)->d_member->type != T_OBJECT_EX)
+    {
+      PyErr_Format (PyExc_RuntimeError,
+                    "'%s' must be a slot of class Signal for the extension to work", name);
+      return -1;
+    }
+
+  *offset = ((PyMemberDescrObject *) descriptor)->d_member->offset;
+  return 0;
+}
+
+
+static int
+signal_module_initialize_state (PyObject *self)
+{
+  SignalModuleState *state            = SIGNAL_MODULE_STATE (self);
+  PyObject          *main_module      = NULL;
+  PyObject          *main_module_dict = NULL;
+  PyObject          *bind_module      = NULL;
+  PyObject          *bind_module_dict = NULL;
+
+  main_module = PyImport_ImportModule ("notify.signal");
+  if (!main_module)
+    goto error;
+
+  main_module_dict = PyModule_GetDict (main_module);
+  if (!main_module_dict)
+    goto error;
+
+  bind_module = PyImport_ImportModule ("notify.bind");
+  if (!bind_module)
+    goto error;
+
+  bind_module_dict = PyModule_GetDict (bind_module);
+  if (!bind_module_dict)
+    goto error;
+
+  state->signal_type = (PyTypeObject *) PyDict_GetItemString (main_module_dict, "Signal");
+  if (!state->signal_type || !PyType_Check (state->signal_type))
+    goto error;
+
+  Py_INCREF (state->signal_type);
+
+  state->abstract_signal_type = PyDict_GetItemString (main_module_dict, "AbstractSignal");
+  if (!state->abstract_signal_type)
+    goto error;
+
+  Py_INCREF (state->abstract_signal_type);
+
+  state->unhashable_blocked_key = PyDict_GetItemString (main_module_dict,
+                                                        "_UNHASHABLE_BLOCKED");
+  if (!state->unhashable_blocked_key)
+    goto error;
+
+  Py_INCREF (state->unhashable_blocked_key);
+
+  state->report_handler_exception = PyDict_GetItemString (main_module_dict,
+                                                          "_report_handler_exception");
+  if (!state->report_handler_exception)
+    goto error;
+
+  Py_INCREF (state->report_handler_exception);
+
+  state->weak_binding_type
+    = (PyTypeObject *) PyDict_GetItemString (bind_module_dict, "WeakBinding");
+  if (!state->weak_binding_type || !PyType_Check (state->weak_binding_type))
+    goto error;
+
+  Py_INCREF (state->weak_binding_type);
+
+  if (get_slot_offset (state->signal_type, "_handlers",
+                       &state->handlers_offset) == -1
+      || get_slot_offset (state->signal_type, "_blocked_handlers",
+                          &state->blocked_handlers_offset) == -1
+      || get_slot_offset (state->signal_type, "_Signal__accumulator",
+                          &state->accumulator_offset) == -1
+      || get_slot_offset (state->signal_type, "_Signal__emission_level",
+                          &state->emission_level_offset) == -1)
+    goto error;
+
+  if (!(state->get_initial_value_name
+          = Compatibility_InternFromString ("get_initial_value"))
+      || !(state->accumulate_value_name
+             = Compatibility_InternFromString ("accumulate_value"))
+      || !(state->should_continue_name
+             = Compatibility_InternFromString ("should_continue"))
+      || !(state->post_process_value_name
+             = Compatibility_InternFromString ("post_process_value"))
+      || !(state->collect_garbage_name
+             = Compatibility_InternFromString ("collect_garbage")))
+    goto error;
+
+  if (!(state->any_accepts_accumulator_type
+          = PyObject_GetAttrString (state->abstract_signal_type, "AnyAcceptsAccumulator"))
+      || !(state->all_accept_accumulator_type
+             = PyObject_GetAttrString (state->abstract_signal_type, "AllAcceptAccumulator"))
+      || !(state->last_value_accumulator_type
+             = PyObject_GetAttrString (state->abstract_signal_type, "LastValueAccumulator"))
+      || !(state->value_list_accumulator_type
+             = PyObject_GetAttrString (state->abstract_signal_type, "ValueListAccumulator")))
+    goto error;
+
+  Py_DECREF (main_module);
+  Py_DECREF (bind_module);
+
+  return 0;
+
+ error:
+  if (!PyErr_Occurred ())
+    PyErr_SetString (PyExc_RuntimeError, "cannot find required Py-notify classes");
+
+  Py_XDECREF (main_module);
+  Py_XDECREF (bind_module);
+  signal_module_clear (self);
+
+  return -1;
+}
+
+static int
+signal_module_traverse (PyObject *self, visitproc visit, void *arg)
+{
+  SignalModuleState *state = SIGNAL_MODULE_STATE (self);
+
+  Compatibility_VISIT (state->signal_type);
+  Compatibility_VISIT (state->abstract_signal_type);
+  Compatibility_VISIT (state->unhashable_blocked_key);
+  Compatibility_VISIT (state->report_handler_exception);
+  Compatibility_VISIT (state->weak_binding_type);
+  Compatibility_VISIT (state->any_accepts_accumulator_type);
+  Compatibility_VISIT (state->all_accept_accumulator_type);
+  Compatibility_VISIT (state->last_value_accumulator_type);
+  Compatibility_VISIT (state->value_list_accumulator_type);
+
+  return 0;
+}
+
+static int
+signal_module_clear (PyObject *self)
+{
+  SignalModuleState *state = SIGNAL_MODULE_STATE (self);
+
+  Compatibility_CLEAR (state->signal_type);
+  Compatibility_CLEAR (state->abstract_signal_type);
+  Compatibility_CLEAR (state->unhashable_blocked_key);
+  Compatibility_CLEAR (state->report_handler_exception);
+  Compatibility_CLEAR (state->weak_binding_type);
+  Compatibility_CLEAR (state->any_accepts_accumulator_type);
+  Compatibility_CLEAR (state->all_accept_accumulator_type);
+  Compatibility_CLEAR (state->last_value_accumulator_type);
+  Compatibility_CLEAR (state->value_list_accumulator_type);
+
+  Compatibility_CLEAR (state->get_initial_value_name);
+  Compatibility_CLEAR (state->accumulate_value_name);
+  Compatibility_CLEAR (state->should_continue_name);
+  Compatibility_CLEAR (state->post_process_value_name);
+  Compatibility_CLEAR (state->collect_garbage_name);
+
+  return 0;
+}
+
+
+
+/*- Module initialization ------------------------------------------*/
+
+Compatibility_MODINIT_FUNC
+Compatibility_MODINIT_FUNC_NAME (_signal) (void)
+{
+  PyObject          *module = NULL;
+  PyObject          *dictionary;
+  PyObject          *emit;
+  PyObject          *emit_many;
+  SignalModuleState *state;
+
+  module = Compatibility_ModuleCreate (&signal_module);
+  if (!module)
+    goto error;
+
+  state = SIGNAL_MODULE_STATE (module);
+  memset (state, 0, sizeof (SignalModuleState));
+
+  if (!Compatibility_ModulePostCreate (module, &signal_module))
+    goto error;
+
+  if (signal_module_initialize_state (module) == -1)
+    goto error;
+
+  dictionary = PyModule_GetDict (module);
+  if (!dictionary)
+    goto error;
+
+  /* This creates an unbound method of `Signal' class, ready to be installed into it. */
+  emit = PyDescr_NewMethod (state->signal_type, &Signal_emit_method);
+  if (!emit)
+    goto error;
+
+  if (PyDict_SetItemString (dictionary, "emit", emit) == -1)
+    {
+      Py_DECREF (emit);
+      goto error;
+    }
+
+  Py_DECREF (emit);
+
+  emit_many = PyDescr_NewMethod (state->signal_type, &Signal_emit_many_method);
+  if (!emit_many)
+    goto error;
+
+  if (PyDict_SetItemString (dictionary, "emit_many", emit_many) == -1)
+    {
+      Py_DECREF (emit_many);
+      goto error;
+    }
+
+  Py_DECREF (emit_many);
+
+  goto do_return;
+
+ error:
+  Compatibility_CLEAR (module);
+
+ do_return:
+  Compatibility_ModuleReturn (module);
+}
+
+
+/*
+ * Local variables:
+ * coding: utf-8
+ * mode: c
+ * c-basic-offset: 2
+ * indent-tabs-mode: nil
+ * fill-column: 90
+ * End:
+ */
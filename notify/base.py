@@ -45,6 +45,10 @@ except ImportError:
     # Ignore, related features will not be provided.
     pass
 
+if sys.version_info[:2] >= (3, 5):
+    # Asynchronous features need `async def' syntax, not just the module.
+    import asyncio
+
 
 
 #-- Base class for conditions and variables --------------------------
@@ -56,7 +60,7 @@ class AbstractValueObject (object):
     C{L{AbstractVariable <variable.AbstractVariable>}} implementing common functionality.
 
     @group Basic:
-    get, set, mutable, changed
+    get, set, mutable, changed, wait_for
 
     @group Storing Using Handlers:
     store, store_safe, storing, storing_safely
@@ -76,7 +80,7 @@ class AbstractValueObject (object):
     __get_changed_signal, __to_string, __flags, __signal
 
     @sort:
-    get, set, mutable, changed,
+    get, set, mutable, changed, wait_for,
     store, store_safe, storing, storing_safely,
     synchronize, synchronize_safe, desynchronize, desynchronize_fully, synchronizing,
     synchronizing_safely,
@@ -560,6 +564,15 @@ class AbstractValueObject (object):
         del _2_5
 
 
+    if 'asyncio' in globals ():
+        from notify._3_5 import base as _3_5
+
+        wait_for            = _3_5.wait_for
+        wait_for.__module__ = __module__
+
+        del _3_5
+
+
     def _value_changed (self, new_value):
         """
         Method that must be called every time object’s value changes.  Note that this
@@ -63,10 +63,12 @@ possible with lambdas and is not an advantage of bindings, just a feature.
 __docformat__ = 'epytext en'
 __all__       = ('Binding', 'WeakBinding', 'RaisingWeakBinding',
                  'BindingCompatibleTypes',
-                 'CannotWeakReferenceError', 'GarbageCollectedError')
+                 'CannotWeakReferenceError', 'GarbageCollectedError',
+                 'HAVE_FAST_BINDINGS')
 
 
 import sys
+import threading
 from types        import FunctionType, MethodType
 import weakref
 
@@ -152,7 +154,7 @@ class Binding (object):
         self._keywords  = keywords
 
 
-    def wrap (cls, callable_object, arguments = (), keywords = None):
+    def wrap (cls, callable_object, arguments = (), keywords = None, intern = False):
         """
         Return a callable with semantics of the binding class this method is called for.
         I{If necessary} (e.g. if C{arguments} tuple is not empty), this method creates a
@@ -164,6 +166,18 @@ class Binding (object):
         This is the preferred method of creating bindings.  It is generally more memory-
         and call-time-efficient since in some cases no new objects are created at all.
 
+        If C{intern} is true, the binding (if one is needed at all) is looked up in a
+        table of interned bindings first, and created and added there only if not found.
+        While an interned binding is alive, the same instance is returned for any equal
+        combination of object, function, arguments and keywords, so equal handlers
+        connected to different signals share memory.  Interned bindings also compute
+        their hash only once and compare equal to themselves without looking at their
+        contents, which makes disconnecting and blocking them cheaper.  Otherwise, they
+        compare just like normal bindings.
+        Note that, since arguments are compared for equality, an interned binding created
+        with C{(1,)} arguments may be returned when C{(1.0,)} is requested.  If arguments
+        or keywords are not hashable, a normal binding is returned instead.
+
         @param  callable_object: the callable object that will be invoked by this binding
                                  from C{L{__call__}} method.
         @type   callable_object: callable
@@ -172,6 +186,9 @@ class Binding (object):
                                  will be prepended to call arguments.
         @type   arguments:       iterable
 
+        @param  intern:          whether to return an interned binding.
+        @type   intern:          C{bool}
+
         @rtype:            callable
 
         @raises TypeError: if C{callable_object} is not callable or C{arguments} is not
@@ -179,7 +196,10 @@ class Binding (object):
         """
 
         if arguments or keywords:
-            return cls (callable_object, arguments, keywords)
+            if intern:
+                return _intern (cls, callable_object, arguments, keywords, None)
+
+            return _create_binding (cls, callable_object, arguments, keywords, None)
         else:
             if not is_callable (callable_object):
                 raise TypeError ("'callable_object' must be callable")
@@ -261,7 +281,8 @@ class Binding (object):
         """
 
         # NOTE: If, for some reason, you change this, don't forget to adjust
-        #       `WeakBinding.__call__' accordingly.
+        #       `WeakBinding.__call__', `_call_*' functions below and `call_binding'
+        #       in `notify/_bind.c' accordingly.
         if keywords:
             fixed_keywords = self._get_keywords ()
             if fixed_keywords:
@@ -343,7 +364,10 @@ class Binding (object):
         keywords  = self._get_keywords  ()
 
         if _class is not None or object is not None:
-            _hash = hash (MethodType (self._get_function (), object, _class))
+            if _PY3K:
+                _hash = hash (MethodType (self._get_function (), object))
+            else:
+                _hash = hash (MethodType (self._get_function (), object, _class))
         else:
             _hash = hash (self._get_function ())
 
@@ -511,7 +535,8 @@ itself uses the variable several times in calls to C{isinstance} function.
 # Implementation note: self._object can contain a real WeakReference, a _NONE_REFERENCE or
 # None.  _NONE_REFERENCE is stored if the binding is created without an object at all
 # (i.e. not for a method, or for a static method.)  None indicates that the binding was
-# created with an object, but it has been garbage-collected.
+# created with an object, but it has been garbage-collected.  Only bindings with a
+# callback are notified of that, others keep the dead reference.
 
 class WeakBinding (Binding):
 
@@ -533,7 +558,7 @@ class WeakBinding (Binding):
     @see:  RaisingWeakBinding
     """
 
-    __slots__ = ('__callback', '__hash')
+    __slots__ = ('__callback', '__hash', '__weakref__')
 
 
     def __init__(self, callable_object, arguments = (), callback = None, keywords = None):
@@ -574,8 +599,12 @@ class WeakBinding (Binding):
                 raise TypeError ("'callback' must be callable")
 
             try:
-                self.__callback = callback
-                self._object    = weakref.ref (self._object, self.__object_garbage_collected)
+                if callback is not None:
+                    self.__callback = callback
+                    self._object    = _get_shared_reference (self._object, self)
+                else:
+                    # Such references are shared by Python itself, at least by CPython.
+                    self._object    = weakref.ref (self._object)
             except:
                 raise CannotWeakReferenceError (self._object)
         else:
@@ -584,22 +613,26 @@ class WeakBinding (Binding):
         self.__hash = None
 
 
-    def wrap (cls, callable_object, arguments = (), callback = None, keywords = None):
-        # Inherit documentation somehow?
-        if arguments or keywords:
-            return cls (callable_object, arguments, callback, keywords)
-
-        if (isinstance (callable_object, BindingCompatibleTypes)
-            and not isinstance (callable_object, WeakBinding)):
+    def wrap (cls, callable_object, arguments = (), callback = None, keywords = None,
+              intern = False):
+        # Inherit documentation somehow?  Interned weak bindings are shared only if
+        # `callback' is equal too.
+        if not (arguments or keywords):
+            if (not isinstance (callable_object, BindingCompatibleTypes)
+                or isinstance (callable_object, WeakBinding)):
+                return callable_object
 
             if _PY3K:
-                if callable_object.__self__ is not None:
-                    return cls (callable_object, arguments, callback, keywords)
+                if callable_object.__self__ is None:
+                    return callable_object
             else:
-                if callable_object.im_self is not None:
-                    return cls (callable_object, arguments, callback, keywords)
+                if callable_object.im_self is None:
+                    return callable_object
+
+        if intern:
+            return _intern (cls, callable_object, arguments, keywords, callback)
 
-        return callable_object
+        return _create_binding (cls, callable_object, arguments, keywords, callback)
 
 
     wrap = classmethod (wrap)
@@ -627,13 +660,32 @@ class WeakBinding (Binding):
         """
 
         reference = self._object
+        if reference is None:
+            return self._call_after_garbage_collecting ()
 
-        if reference is not None:
-            # FIXME: Resurrect 0.2 optimization of inlining super method once that is more
-            #        stable.  It is an _important_ optimization.
-            return super (WeakBinding, self).__call__(*arguments, **keywords)
+        # Inlined `Binding.__call__', since this is what every handler of a `CleanSignal'
+        # goes through.  Keep the two in sync.
+        if keywords:
+            fixed_keywords = self._get_keywords ()
+            if fixed_keywords:
+                all_keywords = dict (fixed_keywords)
+                all_keywords.update (keywords)
+            else:
+                all_keywords = keywords
         else:
-            return self._call_after_garbage_collecting ()
+            all_keywords = self._get_keywords ()
+
+        if self._get_class () is not None:
+            object = self._get_object ()
+            if object is None and reference is not _NONE_REFERENCE:
+                return self._call_after_garbage_collecting ()
+
+            return self._get_function () (object,
+                                          *(self._get_arguments () + arguments),
+                                          **all_keywords)
+        else:
+            return self._get_function () (*(self._get_arguments () + arguments),
+                                          **all_keywords)
 
 
     def _call_after_garbage_collecting (self):
@@ -682,7 +734,9 @@ class WeakBinding (Binding):
         @rtype: C{bool}
         """
 
-        return self._object is not None
+        reference = self._object
+        return (reference is not None
+                and (reference is _NONE_REFERENCE or reference () is not None))
 
     if _PY3K:
         __bool__ = __nonzero__
@@ -693,6 +747,86 @@ _NONE_REFERENCE = DummyReference (None)
 
 
 
+#-- Shared object references -----------------------------------------
+
+# Weak bindings without a callback simply use `weakref.ref (object)', which CPython
+# shares between all such users, and find out about death of the object when they need
+# it.  Bindings with a callback must be notified, so they share a single weak reference
+# with a callback per object instead.  Entries of `_shared_references' are keyed by object
+# identifier and have the form [reference, pruning limit, weak references to
+# bindings...].  When the object dies, the reference callback notifies all bindings still
+# alive in one pass.  References to bindings that died earlier are pruned whenever their
+# number doubles, so entries of long-living objects don't grow without bound.
+#
+# Only built-in types are used on purpose: an object gets no Py-notify instances for
+# the entry, whatever its lifetime.
+
+def _get_shared_reference (object, binding):
+    key = id (object)
+
+    _shared_references_lock.acquire ()
+    try:
+        entry = _shared_references.get (key)
+
+        # An identifier can be reused if callback of the previous object with the same
+        # identifier has not run yet (e.g. during cyclic garbage collection).
+        if entry is None or entry[0] () is not object:
+            entry    = [None, _MIN_PRUNING_LIMIT]
+            entry[0] = weakref.ref (object, _create_reference_callback (key, entry))
+
+            _shared_references[key] = entry
+
+        elif len (entry) - 2 >= entry[1]:
+            entry[2:] = [reference for reference in entry[2:] if reference () is not None]
+            entry[1]  = max (_MIN_PRUNING_LIMIT, 2 * (len (entry) - 2))
+
+        entry.append (weakref.ref (binding))
+
+        return entry[0]
+
+    finally:
+        _shared_references_lock.release ()
+
+
+# Must not be nested in `_get_shared_reference', else the callback would keep the object
+# alive.
+def _create_reference_callback (key, entry):
+    # Module globals are looked up now: they may already be gone if the object dies at
+    # interpreter shutdown.
+    shared_references = _shared_references
+    lock              = _shared_references_lock
+    system            = sys
+
+    def object_garbage_collected (reference):
+        lock.acquire ()
+        try:
+            if shared_references.get (key) is entry:
+                del shared_references[key]
+
+            binding_references = entry[2:]
+            del entry[2:]
+        finally:
+            lock.release ()
+
+        for binding_reference in binding_references:
+            binding = binding_reference ()
+            if binding is not None:
+                try:
+                    binding._WeakBinding__object_garbage_collected (reference)
+                except:
+                    # Like an exception in a standalone weak reference callback, this must
+                    # not prevent notification of other bindings.
+                    system.excepthook (*system.exc_info ())
+
+    return object_garbage_collected
+
+
+_MIN_PRUNING_LIMIT       = 8
+_shared_references       = {}
+_shared_references_lock  = threading.RLock ()
+
+
+
 class RaisingWeakBinding (WeakBinding):
 
     """
@@ -710,6 +844,265 @@ class RaisingWeakBinding (WeakBinding):
 
 
 
+#-- Shape-specialized bindings ---------------------------------------
+
+# Without the native implementation, `Binding.__call__' has to find out on each call
+# whether there is an object to pass and whether there are fixed arguments or keywords.
+# Instead, `wrap' creates bindings of (invisible) subclasses with a `__call__' that
+# handles exactly one of the combinations.  Only the standard classes are specialized,
+# since subclasses might override accessors or `__call__' itself.
+#
+# This is only done when the native extension is not available, e.g. on PyPy: native
+# `__call__' handles all combinations faster than any of the below, and specialized
+# subclasses would only shadow it.  Tests force `_specialize_bindings' on to cover this
+# code even when the extension is built.
+#
+# NOTE: Keep these in sync with `Binding.__call__' and `WeakBinding.__call__'.
+
+def _call_function_with_arguments (self, *arguments, **keywords):
+    return self._function (*(self._arguments + arguments), **keywords)
+
+def _call_function_with_keywords (self, *arguments, **keywords):
+    if keywords:
+        all_keywords = dict (self._keywords)
+        all_keywords.update (keywords)
+    else:
+        all_keywords = self._keywords
+
+    return self._function (*(self._arguments + arguments), **all_keywords)
+
+
+def _call_method (self, *arguments, **keywords):
+    return self._function (self._object, *arguments, **keywords)
+
+def _call_method_with_arguments (self, *arguments, **keywords):
+    return self._function (self._object, *(self._arguments + arguments), **keywords)
+
+def _call_method_with_keywords (self, *arguments, **keywords):
+    if keywords:
+        all_keywords = dict (self._keywords)
+        all_keywords.update (keywords)
+    else:
+        all_keywords = self._keywords
+
+    return self._function (self._object, *(self._arguments + arguments), **all_keywords)
+
+
+def _call_weak_method (self, *arguments, **keywords):
+    reference = self._object
+    if reference is None:
+        return self._call_after_garbage_collecting ()
+
+    # Bindings created without an object (e.g. of unbound methods) pass None to function.
+    object = reference ()
+    if object is None and reference is not _NONE_REFERENCE:
+        return self._call_after_garbage_collecting ()
+
+    return self._function (object, *arguments, **keywords)
+
+def _call_weak_method_with_arguments (self, *arguments, **keywords):
+    reference = self._object
+    if reference is None:
+        return self._call_after_garbage_collecting ()
+
+    # Bindings created without an object (e.g. of unbound methods) pass None to function.
+    object = reference ()
+    if object is None and reference is not _NONE_REFERENCE:
+        return self._call_after_garbage_collecting ()
+
+    return self._function (object, *(self._arguments + arguments), **keywords)
+
+def _call_weak_method_with_keywords (self, *arguments, **keywords):
+    reference = self._object
+    if reference is None:
+        return self._call_after_garbage_collecting ()
+
+    # Bindings created without an object (e.g. of unbound methods) pass None to function.
+    object = reference ()
+    if object is None and reference is not _NONE_REFERENCE:
+        return self._call_after_garbage_collecting ()
+
+    if keywords:
+        all_keywords = dict (self._keywords)
+        all_keywords.update (keywords)
+    else:
+        all_keywords = self._keywords
+
+    return self._function (object, *(self._arguments + arguments), **all_keywords)
+
+
+def _get_specialized_call (cls, callable_object, arguments, keywords):
+    # Mirrors `Binding.__init__': there is an object to pass iff `_class' is not None.
+    if isinstance (callable_object, BindingCompatibleTypes):
+        if _PY3K:
+            has_object = True
+        else:
+            has_object = (callable_object.im_class is not None)
+    else:
+        has_object = False
+
+    if not has_object:
+        # Functions without arguments and keywords are not wrapped at all.
+        if keywords:
+            return _call_function_with_keywords
+        elif arguments:
+            return _call_function_with_arguments
+        else:
+            return None
+
+    if issubclass (cls, WeakBinding):
+        if keywords:
+            return _call_weak_method_with_keywords
+        elif arguments:
+            return _call_weak_method_with_arguments
+        else:
+            return _call_weak_method
+    else:
+        if keywords:
+            return _call_method_with_keywords
+        elif arguments:
+            return _call_method_with_arguments
+        else:
+            return _call_method
+
+
+def _get_specialized_class (cls, call):
+    specialized_class = _specialized_classes.get ((cls, call))
+
+    if specialized_class is None:
+        # Same name, so that binding representation is not affected.
+        specialized_class = type (cls.__name__, (cls,),
+                                  { '__slots__': (),
+                                    '__call__':  call,
+                                    '__module__': cls.__module__ })
+        _specialized_classes[(cls, call)] = specialized_class
+
+    return specialized_class
+
+
+def _create_binding (cls, callable_object, arguments, keywords, callback, interned = False):
+    binding_class = cls
+
+    if _specialize_bindings and cls in _SPECIALIZED_BASE_CLASSES:
+        call = _get_specialized_call (cls, callable_object, arguments, keywords)
+        if call is not None:
+            binding_class = _get_specialized_class (cls, call)
+
+    if interned:
+        binding_class = _get_interned_class (binding_class)
+
+    if issubclass (cls, WeakBinding):
+        return binding_class (callable_object, arguments, callback, keywords)
+    else:
+        return binding_class (callable_object, arguments, keywords)
+
+
+_SPECIALIZED_BASE_CLASSES = { Binding: True, WeakBinding: True, RaisingWeakBinding: True }
+_specialized_classes      = {}
+
+
+
+#-- Interned bindings ------------------------------------------------
+
+class _InternedBinding (object):
+
+    # Mixed into classes created by `_get_interned_class', before the binding class
+    # itself.  The hash is computed by `_intern' and stored in a slot of the created
+    # class.  Comparing with itself, the common case when a signal looks for a handler,
+    # is done by identity; anything else is compared as usual.  Weak bindings that
+    # differ only in callback are not shared, yet must stay equal.
+
+    __slots__ = ()
+
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+
+        return super (_InternedBinding, self).__eq__(other)
+
+    def __ne__(self, other):
+        if self is other:
+            return False
+
+        return super (_InternedBinding, self).__ne__(other)
+
+
+    def __hash__(self):
+        return self.__hash
+
+
+
+def _get_interned_class (cls):
+    interned_class = _interned_classes.get (cls)
+
+    if interned_class is None:
+        slots = ('_InternedBinding__hash',)
+        if not cls.__weakrefoffset__:
+            slots += ('__weakref__',)
+
+        interned_class = type (cls.__name__, (_InternedBinding, cls),
+                               { '__slots__': slots, '__module__': cls.__module__ })
+        _interned_classes[cls] = interned_class
+
+    return interned_class
+
+
+def _intern (cls, callable_object, arguments, keywords, callback):
+    if isinstance (callable_object, BindingCompatibleTypes):
+        if _PY3K:
+            object   = callable_object.__self__
+            function = callable_object.__func__
+            _class   = None
+        else:
+            object   = callable_object.im_self
+            function = callable_object.im_func
+            _class   = callable_object.im_class
+    else:
+        object   = None
+        function = callable_object
+        _class   = None
+
+    # Objects are keyed by identity, so that the table doesn't keep them alive.  An
+    # identifier might have been reused after death of a weakly bound object, hence the
+    # check below.
+    if keywords:
+        keywords = frozendict (keywords)
+    else:
+        keywords = frozendict.EMPTY
+
+    key = (cls, id (object), function, _class, tuple (arguments), keywords, callback)
+
+    try:
+        hash (key)
+    except TypeError:
+        # Something in the key is unhashable, the binding cannot be interned then.
+        return _create_binding (cls, callable_object, arguments, keywords, callback)
+
+    _intern_lock.acquire ()
+    try:
+        binding = _interned_bindings.get (key)
+        if binding is not None and binding._get_object () is object:
+            return binding
+
+        binding = _create_binding (cls, callable_object, arguments, keywords, callback,
+                                   True)
+
+        binding._InternedBinding__hash = cls.__hash__(binding)
+        _interned_bindings[key]        = binding
+
+        return binding
+
+    finally:
+        _intern_lock.release ()
+
+
+_interned_classes  = {}
+_interned_bindings = weakref.WeakValueDictionary ()
+_intern_lock       = threading.Lock ()
+
+
+
 #-- Exception types for weak bindings --------------------------------
 
 class CannotWeakReferenceError (TypeError):
@@ -734,6 +1127,42 @@ class GarbageCollectedError (RuntimeError):
 
 
 
+#-- Native implementation --------------------------------------------
+
+# The extension is optional.  If it is not available (not built, or not CPython at all),
+# pure Python methods defined above are used.  They are kept around anyway: the native
+# methods fall back to them for subclasses that override any of `_get_object' and other
+# accessors, and benchmarks use them for comparison.
+
+_python_call      = Binding.__dict__['__call__']
+_python_eq        = Binding.__dict__['__eq__']
+_python_ne        = Binding.__dict__['__ne__']
+_python_hash      = Binding.__dict__['__hash__']
+_python_weak_call = WeakBinding.__dict__['__call__']
+_python_weak_hash = WeakBinding.__dict__['__hash__']
+
+try:
+    from notify import _bind
+except ImportError:
+    _bind = None
+
+if _bind is not None:
+    Binding.__call__     = _bind.call
+    Binding.__eq__       = _bind.eq
+    Binding.__ne__       = _bind.ne
+    Binding.__hash__     = _bind.hash
+    WeakBinding.__call__ = _bind.weak_call
+    WeakBinding.__hash__ = _bind.weak_hash
+    HAVE_FAST_BINDINGS   = True
+else:
+    HAVE_FAST_BINDINGS   = False
+
+_specialize_bindings = not HAVE_FAST_BINDINGS
+
+del _bind
+
+
+
 # Local variables:
 # mode: python
 # python-indent: 4
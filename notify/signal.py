@@ -102,15 +102,27 @@ G{classtree AbstractSignal}
 """
 
 __docformat__ = 'epytext en'
-__all__       = ('AbstractSignal', 'Signal', 'CleanSignal')
+__all__       = ('AbstractSignal', 'Signal', 'CleanSignal', 'SnapshotSignal', 'PrioritySignal',
+                 'ThreadSafeSignal', 'AsyncSignal', 'ParallelSignal', 'DeferredSignal',
+                 'BreadthFirstSignal', 'CompilingSignal', 'SignalFactory', 'TopicSignal',
+                 'DeliveryQueue', 'HandlerProfile', 'EmissionRecord', 'HandlerExceptions',
+                 'HAVE_FAST_EMISSION',
+                 'track_connections', 'disconnect_object',
+                 'enable_profiling', 'disable_profiling',
+                 'enable_tracing', 'disable_tracing', 'get_trace', 'clear_trace', 'dump_trace')
 
 
+import bisect
 import sys
+import time
 import weakref
 
+from itertools    import islice
+
 from notify.bind  import Binding, WeakBinding
 from notify.gc    import AbstractGCProtector
-from notify.utils import is_callable, raise_not_implemented_exception, DummyReference
+from notify.utils import execute, is_callable, raise_not_implemented_exception, \
+                         DummyReference
 
 try:
     import contextlib
@@ -118,6 +130,36 @@ except ImportError:
     # Ignore, related features will not be provided.
     pass
 
+if sys.version_info[:2] >= (3, 5):
+    # Asynchronous features need `async def' syntax, not just the module.
+    import asyncio
+
+    try:
+        _current_task = asyncio.current_task
+    except AttributeError:
+        # Python 3.6 or earlier.
+        _current_task = asyncio.Task.current_task
+
+try:
+    import concurrent.futures
+except ImportError:
+    # Ignore, `ParallelSignal' will only work with explicitly specified executors.
+    pass
+
+try:
+    import threading
+except ImportError:
+    # Python built without thread support.
+    import dummy_threading as threading
+
+try:
+    from thread import get_ident as _get_thread_id
+except ImportError:
+    try:
+        from _thread import get_ident as _get_thread_id
+    except ImportError:
+        from dummy_thread import get_ident as _get_thread_id
+
 
 
 #-- Signal interface classes -----------------------------------------
@@ -128,14 +170,15 @@ class AbstractSignal (object):
     Abstract interface all signal classes must implement.
 
     @group Connecting Handlers:
-    is_connected, connect, connect_safe, do_connect, do_connect_safe, disconnect,
-    disconnect_all, connecting, connecting_safely
+    is_connected, connect, connect_safe, connect_queued, do_connect, do_connect_safe,
+    disconnect, disconnect_all, connecting, connecting_safely
 
     @group Blocking Handlers:
     is_blocked, block, unblock, blocking
 
     @group Emission:
-    __call__, emit, stop_emission, emission_level, emission_stopped
+    __call__, emit, emit_many, emit_collecting_exceptions, next_emission, stop_emission,
+    emission_level, emission_stopped
 
     @group Handler List Maintenance:
     has_handlers, __nonzero__, count_handlers, collect_garbage
@@ -147,10 +190,11 @@ class AbstractSignal (object):
     _get_emission_level, _is_emission_stopped, __to_string
 
     @sort:
-    is_connected, connect, connect_safe, do_connect, do_connect_safe, disconnect,
-    disconnect_all, connecting, connecting_safely,
+    is_connected, connect, connect_safe, connect_queued, do_connect, do_connect_safe,
+    disconnect, disconnect_all, connecting, connecting_safely,
     is_blocked, block, unblock, blocking,
-    __call__, emit, stop_emission, emission_level, emission_stopped,
+    __call__, emit, emit_many, emit_collecting_exceptions, next_emission, stop_emission,
+    emission_level, emission_stopped,
     has_handlers, __nonzero__, count_handlers, collect_garbage,
     _wrap_handler, _additional_description
     """
@@ -418,7 +462,10 @@ class AbstractSignal (object):
         C{L{do_connect}} and/or C{L{_wrap_handler}} instead.
         """
 
-        self.do_connect (self._wrap_handler (handler, *arguments, **keywords))
+        handler = self._wrap_handler (handler, *arguments, **keywords)
+        self.do_connect (handler)
+        if _object_connections:
+            _register_connection (self, handler, (handler,))
 
     def connect_safe (self, handler, *arguments, **keywords):
         """
@@ -433,12 +480,44 @@ class AbstractSignal (object):
         """
 
         if not self.is_connected (handler, *arguments, **keywords):
-            self.do_connect (self._wrap_handler (handler, *arguments, **keywords))
+            handler = self._wrap_handler (handler, *arguments, **keywords)
+            self.do_connect (handler)
+            if _object_connections:
+                _register_connection (self, handler, (handler,))
             return True
         else:
             return False
 
 
+    def connect_queued (self, queue, handler, *arguments, **keywords):
+        """
+        Connect C{handler} with C{arguments} to the signal, so that upon emission it is not
+        called right away, but the call is instead put into C{queue}.  The handler is
+        later called from L{DeliveryQueue.deliver}, normally in another thread, or by the
+        queue’s executor.  Otherwise, the handler is just like one connected with
+        C{L{connect}}: it compares equal to the same handler connected normally, it can be
+        blocked or disconnected and is disconnected automatically if its object is
+        garbage-collected.
+
+        Since the handler is not called during emission, the signal’s accumulator always
+        receives C{None} from it.  Handler exceptions are still passed to
+        C{L{exception_handler}}, only at delivery time.
+
+        @param  queue: queue to put handler calls into.
+        @type   queue: C{L{DeliveryQueue}}
+
+        @raises TypeError: if C{queue} is not a C{DeliveryQueue}.
+        """
+
+        if not isinstance (queue, DeliveryQueue):
+            raise TypeError ("'queue' must be a DeliveryQueue")
+
+        handler = _QueuedBinding (self, queue, handler, arguments, keywords)
+        self.do_connect (handler)
+        if _object_connections:
+            _register_connection (self, handler, (handler,))
+
+
     def _wrap_handler (self, handler, *arguments, **keywords):
         """
         Wrap C{handler} with C{arguments} into a single internally-used object.  It is
@@ -593,6 +672,17 @@ class AbstractSignal (object):
         del _2_5
 
 
+    if 'asyncio' in globals ():
+        # See above.
+
+        from notify._3_5 import signal as _3_5
+
+        next_emission            = _3_5.next_emission
+        next_emission.__module__ = __module__
+
+        del _3_5
+
+
     def emit (self, *arguments, **keywords):
         """
         Invoke non-blocked handlers connected to C{self}, passing C{arguments} to them.
@@ -625,6 +715,62 @@ class AbstractSignal (object):
         return self.emit (*arguments, **keywords)
 
 
+    def emit_many (self, argument_sets):
+        """
+        Emit the signal once for each tuple of arguments in C{argument_sets} and return
+        the list of results of these emissions.  This is equivalent to::
+
+            [signal.emit (*arguments) for arguments in argument_sets]
+
+        but subclasses may implement it more efficiently.  In particular, they may look
+        at the list of handlers and their blocked state only once per call, so handlers
+        connected, disconnected, blocked or unblocked in the middle of C{emit_many} might
+        only be affected starting with the next call.  C{L{stop_emission}} stops only the
+        emission for current argument tuple, not the remaining ones.
+
+        @param  argument_sets: iterable of argument tuples.
+
+        @rtype:   C{list}
+        @returns: List of values returned by C{L{emit}} for each argument tuple, in
+                  order.
+        """
+
+        return [self.emit (*arguments) for arguments in argument_sets]
+
+
+    def emit_collecting_exceptions (self, *arguments, **keywords):
+        """
+        Emit the signal like C{L{emit}} does, but instead of passing exceptions raised by
+        handlers to C{L{exception_handler}}, collect them and, after the emission, raise
+        a single C{L{HandlerExceptions}} with all of them.  Handlers still all run, as
+        usual, unless one raises C{SystemExit} or C{KeyboardInterrupt}: such exceptions
+        are processed by C{exception_handler} as always.  If no handler raises, the
+        result of C{emit} is returned.
+
+        Only exceptions from handlers of this signal, raised in this thread are collected:
+        exceptions in handlers of other signals emitted during this emission are reported
+        normally.
+
+        @rtype:   C{object}
+        @returns: Value returned by C{emit}.
+
+        @raises HandlerExceptions: if any handler raises an exception.
+        """
+
+        failures = []
+
+        _start_collecting_exceptions (self, failures)
+        try:
+            result = self.emit (*arguments, **keywords)
+        finally:
+            _stop_collecting_exceptions ()
+
+        if failures:
+            raise HandlerExceptions (self, failures)
+
+        return result
+
+
     def _get_emission_level (self):
         """
         Internal getter for the C{L{emission_level}} property.  Outside code should use
@@ -817,6 +963,126 @@ class AbstractSignal (object):
     reraising_exception_handler = staticmethod (reraising_exception_handler)
 
 
+    class AggregatingExceptionHandler (object):
+
+        """
+        Handler for exceptions occured in signal handlers that doesn’t flood the output
+        when a handler fails repeatedly.  Exceptions are grouped by handler and exception
+        type.  The first exception in each group is passed to C{sys.excepthook}, just as
+        with C{L{default_exception_handler}}, but subsequent ones during the same period
+        of C{interval} seconds are only counted.  When an exception occurs after the
+        period ends, a summary of counted exceptions is written and a new period starts.
+        C{SystemExit}, C{KeyboardInterrupt} and exceptions not derived from C{Exception}
+        are reraised.
+
+        Since the handler doesn’t run any timers, a pending summary is only written when
+        another exception occurs or when C{L{flush}} is called.  You may want to call the
+        latter before your program exits.
+
+        Usage example:
+
+            >>> AbstractSignal.exception_handler = \\
+            ...     AbstractSignal.AggregatingExceptionHandler (interval = 60)
+
+        Note that handlers failing in the current period are referenced until the period
+        ends.
+
+        @see:  exception_handler
+        """
+
+        __slots__ = ('__interval', '__stream', '__occurrences', '__period_start')
+
+
+        def __init__(self, interval = 60.0, stream = None):
+            """
+            Create a new exception handler.
+
+            @param interval:    length of periods, in seconds.
+            @type  interval:    C{float}
+
+            @param stream:      stream to write summaries to, or C{None} to write to
+                                C{sys.stderr}.
+
+            @raises ValueError: if C{interval} is negative.
+            """
+
+            if interval < 0:
+                raise ValueError ('interval must not be negative')
+
+            self.__interval     = interval
+            self.__stream       = stream
+            self.__occurrences  = {}
+            self.__period_start = _timer ()
+
+
+        interval = property (lambda self: self.__interval,
+                             doc = ("""
+                             Length of periods, in seconds.
+
+                             @type: float
+                             """))
+
+
+        def __call__(self, signal, exception, handler):
+            if (not isinstance (exception, Exception)
+                or isinstance (exception, (SystemExit, KeyboardInterrupt))):
+                raise exception
+
+            if _timer () - self.__period_start >= self.__interval:
+                self.flush ()
+
+            occurrences = self.__occurrences
+            key         = (handler, exception.__class__)
+
+            try:
+                occurrence = occurrences.get (key)
+            except TypeError:
+                # Unhashable handler.
+                key        = (id (handler), exception.__class__)
+                occurrence = occurrences.get (key)
+
+            if occurrence is None:
+                occurrences[key] = [handler, exception.__class__, 1]
+                sys.excepthook (*sys.exc_info ())
+            else:
+                occurrence[2] += 1
+
+
+        def get_occurrences (self):
+            """
+            Get numbers of exceptions in the current period, as tuples of handler,
+            exception class and number of exceptions (including the first one, which was
+            not suppressed.)
+
+            @rtype: list
+            """
+
+            return [tuple (occurrence) for occurrence in self.__occurrences.values ()]
+
+
+        def flush (self):
+            """
+            Write the summary of exceptions suppressed in the current period, if any, and
+            start a new period.
+            """
+
+            occurrences         = list (self.__occurrences.values ())
+            elapsed_time        = _timer () - self.__period_start
+            self.__occurrences  = {}
+            self.__period_start = _timer ()
+
+            stream = self.__stream
+            if stream is None:
+                stream = sys.stderr
+
+            for handler, exception_class, num_occurrences in occurrences:
+                if num_occurrences > 1:
+                    stream.write (('Signal handler %r raised %s %d more time(s) in the last '
+                                   '%.1f seconds\n')
+                                  % (handler, exception_class.__name__, num_occurrences - 1,
+                                     elapsed_time))
+
+
     exception_handler           = default_exception_handler
     """
     Handler for exceptions occured in signal handlers.  When a signal handler doesn’t
@@ -920,7 +1186,8 @@ class Signal (AbstractSignal):
     interested in C{L{CleanSignal}}.
     """
 
-    __slots__ = ('_handlers', '_blocked_handlers', '__accumulator', '__emission_level')
+    __slots__ = ('_handlers', '_blocked_handlers', '_handler_index',
+                 '__accumulator', '__emission_level')
 
 
     def __init__(self, accumulator = None):
@@ -943,6 +1210,7 @@ class Signal (AbstractSignal):
 
         self._handlers         = None
         self._blocked_handlers = _EMPTY_TUPLE
+        self._handler_index    = None
         self.__accumulator     = accumulator
         self.__emission_level  = 0
 
@@ -958,10 +1226,7 @@ class Signal (AbstractSignal):
 
 
     def has_handlers (self):
-        if self._handlers is None:
-            return False
-
-        for handler in self._handlers:
+        for handler in _as_handler_sequence (self._handlers):
             if handler is not None and (not isinstance (handler, WeakBinding) or handler):
                 return True
 
@@ -970,10 +1235,9 @@ class Signal (AbstractSignal):
     def count_handlers (self):
         num_handlers = 0
 
-        if self._handlers is not None:
-            for handler in self._handlers:
-                if handler is not None and (not isinstance (handler, WeakBinding) or handler):
-                    num_handlers += 1
+        for handler in _as_handler_sequence (self._handlers):
+            if handler is not None and (not isinstance (handler, WeakBinding) or handler):
+                num_handlers += 1
 
         return num_handlers
 
@@ -983,33 +1247,77 @@ class Signal (AbstractSignal):
             if arguments or keywords:
                 handler = Binding (handler, arguments, keywords)
 
-            return handler in self._handlers
+            return self.__is_connected (handler)
 
         else:
             return False
 
+    def __is_connected (self, handler):
+        index = self._handler_index
+        if index is None:
+            return handler in _as_handler_sequence (self._handlers)
+
+        try:
+            return handler in index
+        except TypeError:
+            # Unhashable handlers are never connected while the index exists.
+            return False
+
 
     def is_blocked (self, handler, *arguments, **keywords):
         if self._blocked_handlers is not _EMPTY_TUPLE and is_callable (handler):
             if arguments or keywords:
                 handler = Binding (handler, arguments, keywords)
 
-            return handler in self._blocked_handlers
+            return _is_blocked (self._blocked_handlers, handler)
 
         else:
             return False
 
 
     def do_connect (self, handler):
-        if self._handlers is not None:
-            self._handlers.append (handler)
-        else:
-            self._handlers = [handler]
+        handlers = self._handlers
 
+        if handlers is None:
+            self._handlers = handler
+            return
 
+        if type (handlers) is list:
+            handlers.append (handler)
+        else:
+            self._handlers = [handlers, handler]
+
+        index = self._handler_index
+        if index is not None:
+            try:
+                index.setdefault (handler, []).append (len (self._handlers) - 1)
+                index.num_handlers += 1
+            except TypeError:
+                self.__drop_handler_index ()
+
+        elif len (self._handlers) == _HANDLER_INDEX_THRESHOLD:
+            self._rebuild_handler_index ()
+
+
+    # Implementation note: `_handlers' is None if there are no handlers at all, the
+    # handler itself if there is exactly one and a list otherwise.  Most signals never
+    # have more than one handler, so this saves allocating a list for each.  The list is
+    # not turned back into a lone handler when only one handler remains.  Emission
+    # relies on that: if handlers are connected while a lone handler is being called,
+    # the list starts with that handler (or its placeholder, see below) and emission
+    # continues with the rest of list.
+    #
     # Implementation note: we set disconnected (or garbage-collected) handlers to None,
     # instead of removing them right away.  This is done to prevent spoiling
     # disconnections made when emission is in effect.
+    #
+    # Signals with many handlers additionally keep `_handler_index', mapping handlers to
+    # lists of their positions in `_handlers' (ascending.)  Equal handlers share one key.
+    # While the index exists, disconnected handlers are always set to None, so that
+    # positions of the rest don't change.  Handlers are compacted once at least half of
+    # `_handlers' is such placeholders, so disconnection stays O(1) on average.  The
+    # index is dropped as soon as an unhashable handler is connected; it is also not
+    # maintained for signals with few handlers, where it would only waste memory.
 
 
     def disconnect (self, handler, *arguments, **keywords):
@@ -1020,6 +1328,12 @@ class Signal (AbstractSignal):
         if arguments or keywords:
             handler = Binding (handler, arguments, keywords)
 
+        if type (handlers) is not list:
+            return self.__disconnect_lone (handler)
+
+        if self._handler_index is not None:
+            return self.__disconnect_indexed (handler, False)
+
         # Note: we must disconnect _last_ of equal connected handlers, in order to make
         # connect()/disconnect() a no-op.  We use a custom loop because of that (and since
         # reversed() only appeared in 2.4.)
@@ -1038,11 +1352,7 @@ class Signal (AbstractSignal):
                     and handler not in handlers[:index]):
                     # This is the last handler, need to make sure it is not listed in
                     # `_blocked_handlers'.
-                    self._blocked_handlers = [_handler for _handler in self._blocked_handlers
-                                              if _handler != handler]
-
-                    if not self._blocked_handlers:
-                        self._blocked_handlers = _EMPTY_TUPLE
+                    self._blocked_handlers = _forget_blocked (self._blocked_handlers, handler)
 
                 if not handlers:
                     self._handlers = None
@@ -1061,6 +1371,12 @@ class Signal (AbstractSignal):
         if arguments or keywords:
             handler = Binding (handler, arguments, keywords)
 
+        if type (self._handlers) is not list:
+            return self.__disconnect_lone (handler)
+
+        if self._handler_index is not None:
+            return self.__disconnect_indexed (handler, True)
+
         if self.__emission_level == 0:
             old_length     = len (self._handlers)
             self._handlers = [_handler for _handler in self._handlers if _handler != handler]
@@ -1078,16 +1394,102 @@ class Signal (AbstractSignal):
                     any_removed           = True
 
         if any_removed and self._blocked_handlers is not _EMPTY_TUPLE:
-            self._blocked_handlers = [_handler for _handler in self._blocked_handlers
-                                      if _handler != handler]
-
-            if not self._blocked_handlers:
-                self._blocked_handlers = _EMPTY_TUPLE
+            self._blocked_handlers = _forget_blocked (self._blocked_handlers, handler)
 
         return any_removed
 
 
-    # Note: we rely on the way remove() works to fulfill our blocking obligations.
+    def __disconnect_lone (self, handler):
+        if self._handlers != handler:
+            return False
+
+        if self.__emission_level == 0:
+            self._handlers = None
+        else:
+            # Handlers connected during emission will be appended after the placeholder.
+            self._handlers = [None]
+
+        if self._blocked_handlers is not _EMPTY_TUPLE:
+            self._blocked_handlers = _forget_blocked (self._blocked_handlers, handler)
+
+        return True
+
+
+    def __disconnect_indexed (self, handler, all_equal):
+        handlers = self._handlers
+        index    = self._handler_index
+
+        try:
+            positions = index.get (handler)
+        except TypeError:
+            return False
+
+        if positions is None:
+            return False
+
+        # As in the non-indexed case, the _last_ of equal handlers is disconnected.
+        if all_equal:
+            for position in positions:
+                handlers[position] = None
+
+            index.num_handlers -= len (positions)
+            del positions[:]
+        else:
+            handlers[positions.pop ()] = None
+            index.num_handlers -= 1
+
+        if not positions:
+            del index[handler]
+
+            if self._blocked_handlers is not _EMPTY_TUPLE:
+                self._blocked_handlers = _forget_blocked (self._blocked_handlers, handler)
+
+        if self.__emission_level == 0:
+            if index.num_handlers == 0:
+                self._handlers      = None
+                self._handler_index = None
+            elif 2 * index.num_handlers <= len (handlers):
+                self._handlers = [_handler for _handler in handlers if _handler is not None]
+                self._rebuild_handler_index ()
+
+        return True
+
+
+    def _rebuild_handler_index (self):
+        # Build `_handler_index' anew for current `_handlers' if there are enough of them.
+        # Disconnected handler placeholders must not be present when not in emission.
+        handlers = self._handlers
+        if type (handlers) is not list or len (handlers) < _HANDLER_INDEX_THRESHOLD:
+            self._handler_index = None
+            return
+
+        index = _HandlerIndex ()
+
+        try:
+            for position, handler in enumerate (handlers):
+                if handler is not None:
+                    index.setdefault (handler, []).append (position)
+                    index.num_handlers += 1
+        except TypeError:
+            self.__drop_handler_index ()
+        else:
+            self._handler_index = index
+
+    def __drop_handler_index (self):
+        self._handler_index = None
+
+        # Non-indexed code removes disconnected handlers immediately when not in emission,
+        # so we need to do that now.
+        if self.__emission_level == 0 and None in self._handlers:
+            self._handlers = [handler for handler in self._handlers if handler is not None]
+
+
+    # Implementation note: `_blocked_handlers' is either `_EMPTY_TUPLE' or a non-empty
+    # dictionary mapping blocked handlers to the number of times they are blocked.  This
+    # way checking if a handler is blocked during emission takes constant time, no matter
+    # how many handlers are blocked.  Unhashable handlers (e.g. bindings with a list among
+    # arguments) cannot be dictionary keys, so they are instead listed, as many times as
+    # they are blocked, under `_UNHASHABLE_BLOCKED' key.
 
 
     def block (self, handler, *arguments, **keywords):
@@ -1095,12 +1497,11 @@ class Signal (AbstractSignal):
             if arguments or keywords:
                 handler = Binding (handler, arguments, keywords)
 
-            if handler in self._handlers:
-                if self._blocked_handlers is not _EMPTY_TUPLE:
-                    self._blocked_handlers.append (handler)
-                else:
-                    self._blocked_handlers = [handler]
+            if self.__is_connected (handler):
+                if self._blocked_handlers is _EMPTY_TUPLE:
+                    self._blocked_handlers = {}
 
+                _add_block (self._blocked_handlers, handler)
                 return True
 
         return False
@@ -1113,28 +1514,39 @@ class Signal (AbstractSignal):
         if arguments or keywords:
             handler = Binding (handler, arguments, keywords)
 
-        try:
-            self._blocked_handlers.remove (handler)
-
-            if not self._blocked_handlers:
-                self._blocked_handlers = _EMPTY_TUPLE
+        if not _remove_block (self._blocked_handlers, handler):
+            return False
 
-            return True
+        if not self._blocked_handlers:
+            self._blocked_handlers = _EMPTY_TUPLE
 
-        except ValueError:
-            # It is not blocked to begin with.
-            return False
+        return True
 
 
     def emit (self, *arguments, **keywords):
+        # NOTE: If, for some reason, you change this, don't forget to adjust `Signal_emit'
+        #       in `notify/_signal.c' accordingly.  If the extension is available, this
+        #       method is replaced with the native implementation at the end of module.
+
         # Speed optimization.
         handlers    = self._handlers
         accumulator = self.__accumulator
 
         if accumulator is not None:
-            value = accumulator.get_initial_value ()
+            # Standard accumulators are handled inline, without calling their methods.
+            accumulation = _ACCUMULATIONS.get (type (accumulator), _GENERIC_ACCUMULATION)
+            if accumulation == _GENERIC_ACCUMULATION:
+                value = accumulator.get_initial_value ()
+            elif accumulation == _VALUE_LIST_ACCUMULATION:
+                value = []
+            else:
+                value = _INITIAL_VALUES[accumulation]
 
         if handlers is not None:
+            lone_handler = (type (handlers) is not list)
+            if lone_handler:
+                handlers = _iterate_from_lone_handler (self, handlers)
+
             try:
                 saved_emission_level  = self.__emission_level
                 self.__emission_level = abs (saved_emission_level) + 1
@@ -1150,9 +1562,10 @@ class Signal (AbstractSignal):
                         might_have_garbage = True
                         break
 
-                    # We need to refetch that blocked handlers list before processing each
-                    # handler, because it may change during emission.
-                    if handler in self._blocked_handlers:
+                    # We need to refetch blocked handlers before processing each handler,
+                    # because they may change during emission.
+                    blocked_handlers = self._blocked_handlers
+                    if blocked_handlers and _is_blocked (blocked_handlers, handler):
                         continue
 
                     # This somewhat illogical transposition of terms is for speed
@@ -1169,26 +1582,113 @@ class Signal (AbstractSignal):
                         try:
                             handler (*arguments, **keywords)
                         except:
-                            AbstractSignal.exception_handler (self, sys.exc_info () [1], handler)
+                            _report_handler_exception (self, sys.exc_info () [1], handler)
                     else:
                         try:
                             handler_value = handler (*arguments, **keywords)
                         except:
-                            AbstractSignal.exception_handler (self, sys.exc_info () [1], handler)
+                            _report_handler_exception (self, sys.exc_info () [1], handler)
                         else:
-                            value = accumulator.accumulate_value (value, handler_value)
-                            if not accumulator.should_continue (value):
-                                might_have_garbage = True
-                                break
+                            if accumulation == _GENERIC_ACCUMULATION:
+                                value = accumulator.accumulate_value (value, handler_value)
+                                if not accumulator.should_continue (value):
+                                    might_have_garbage = True
+                                    break
+                            elif accumulation == _VALUE_LIST_ACCUMULATION:
+                                value.append (handler_value)
+                            else:
+                                value = handler_value
+                                if accumulation == _ANY_ACCEPTS_ACCUMULATION:
+                                    if value:
+                                        might_have_garbage = True
+                                        break
+                                elif accumulation == _ALL_ACCEPT_ACCUMULATION:
+                                    if not value:
+                                        might_have_garbage = True
+                                        break
             finally:
                 self.__emission_level = saved_emission_level
-                if might_have_garbage and saved_emission_level == 0:
-                    self.collect_garbage ()
+                if saved_emission_level == 0:
+                    # A lone handler is turned into a list only when the handlers change
+                    # during emission, and then the list may contain placeholders.
+                    if might_have_garbage or (lone_handler and type (self._handlers) is list):
+                        self.collect_garbage ()
 
         if accumulator is None:
             return None
-        else:
+        elif accumulation == _GENERIC_ACCUMULATION:
             return accumulator.post_process_value (value)
+        else:
+            return value
+
+
+    def emit_many (self, argument_sets):
+        # NOTE: If, for some reason, you change this, don't forget to adjust
+        #       `Signal_emit_many' in `notify/_signal.c' accordingly.
+
+        # Unlike emit(), this method doesn't look at the handler list after starting.
+        # Placeholders, blocked and garbage-collected handlers are filtered out once, and
+        # then remaining handlers are invoked for each argument tuple in turn.
+
+        handlers    = _as_handler_sequence (self._handlers)
+        accumulator = self.__accumulator
+        results     = []
+
+        blocked_handlers   = self._blocked_handlers
+        active_handlers    = []
+        might_have_garbage = False
+
+        for handler in handlers:
+            if handler is None or (not handler and isinstance (handler, WeakBinding)):
+                might_have_garbage = True
+            elif not (blocked_handlers and _is_blocked (blocked_handlers, handler)):
+                active_handlers.append (handler)
+
+        saved_emission_level = self.__emission_level
+        emission_level       = abs (saved_emission_level) + 1
+
+        try:
+            for arguments in argument_sets:
+                self.__emission_level = emission_level
+
+                if accumulator is not None:
+                    value = accumulator.get_initial_value ()
+
+                for handler in active_handlers:
+                    if self.__emission_level < 0:
+                        break
+
+                    # A handler can only be dead here if its object has been
+                    # garbage-collected during this very call.
+                    if not handler and isinstance (handler, WeakBinding):
+                        might_have_garbage = True
+                        continue
+
+                    if accumulator is None:
+                        try:
+                            handler (*arguments)
+                        except:
+                            _report_handler_exception (self, sys.exc_info () [1], handler)
+                    else:
+                        try:
+                            handler_value = handler (*arguments)
+                        except:
+                            _report_handler_exception (self, sys.exc_info () [1], handler)
+                        else:
+                            value = accumulator.accumulate_value (value, handler_value)
+                            if not accumulator.should_continue (value):
+                                break
+
+                if accumulator is None:
+                    results.append (None)
+                else:
+                    results.append (accumulator.post_process_value (value))
+        finally:
+            self.__emission_level = saved_emission_level
+            if might_have_garbage and saved_emission_level == 0:
+                self.collect_garbage ()
+
+        return results
 
 
     def _get_emission_level (self):
@@ -1212,11 +1712,79 @@ class Signal (AbstractSignal):
 
         # Don't remove disconnected or garbage-collected handlers if in nested emission,
         # it will spoil emit() calls completely.
-        if self._handlers is not None and self.__emission_level == 0:
-            self._handlers = ([handler for handler in self._handlers
-                               if handler is not None and (not isinstance (handler, WeakBinding)
-                                                           or handler)]
-                              or None)
+        handlers = self._handlers
+        if handlers is not None and self.__emission_level == 0:
+            if type (handlers) is list:
+                self._handlers = ([handler for handler in handlers
+                                   if handler is not None and (not isinstance (handler,
+                                                                               WeakBinding)
+                                                               or handler)]
+                                  or None)
+                self._rebuild_handler_index ()
+
+            elif isinstance (handlers, WeakBinding) and not handlers:
+                self._handlers = None
+
+
+    def enable_profiling (self):
+        """
+        Start profiling handlers of this signal.  While profiling is enabled, emissions of
+        the signal record, for each handler, the number of calls and raised exceptions, as
+        well as total and maximum time spent in it; see C{L{profile_stats}}.  To profile
+        all signals at once, use module-level C{L{enable_profiling}} function instead.
+
+        Profiling works by switching the signal to a subclass of its class with
+        instrumented emission methods, so other signals are not affected at all.  Note
+        that profiling emission is implemented in Python, so it is slower than normal
+        emission in any case.
+
+        @raises TypeError: if the signal’s class has its own emission loop (e.g.
+                           C{L{ThreadSafeSignal}} or C{L{DeferredSignal}}), which
+                           cannot be profiled.
+        """
+
+        if not isinstance (self, _ProfiledSignal):
+            self.__class__ = _get_profiled_class (self.__class__)
+
+    def disable_profiling (self):
+        """
+        Stop profiling handlers of this signal, as started with C{L{enable_profiling}}.
+        Gathered statistics are retained until C{L{clear_profile_stats}} is called.
+        """
+
+        if isinstance (self, _ProfiledSignal):
+            self.__class__ = self.__class__.__bases__[1]
+
+
+    def profile_stats (self):
+        """
+        Get statistics gathered by profiling this signal so far, one C{L{HandlerProfile}}
+        per handler, in the order handlers were first called.  Handlers are told apart by
+        identity: a function connected several times without arguments is stored as the
+        same object and so shares one profile, while each connection of a method or a
+        handler with arguments gets a separate binding and is profiled separately.
+
+        @rtype: C{list}
+        """
+
+        profiles = _profiles.get (self)
+        if profiles is None:
+            return []
+
+        profiles = [(profile._order, profile) for profile in profiles.values ()]
+        profiles.sort ()
+
+        return [profile for order, profile in profiles]
+
+    def clear_profile_stats (self):
+        """
+        Discard statistics gathered by profiling this signal.  Statistics are kept even if
+        profiling is disabled and they reference the signal and its handlers, so you
+        should call this method when you don’t need them anymore.
+        """
+
+        if self in _profiles:
+            del _profiles[self]
 
 
     def _additional_description (self, formatter):
@@ -1331,22 +1899,33 @@ class CleanSignal (Signal):
 
 
     def collect_garbage (self):
-        if self._handlers is not None and self._get_emission_level () == 0:
+        handlers = self._handlers
+        if handlers is not None and self._get_emission_level () == 0:
             # NOTE: This is essentially inlined method of the superclass.  While calling
             #       that method would be more proper, inlining it gives significant speed
             #       improvement.  Since it makes no difference for derivatives, we
             #       sacrifice "do what is right" principle in this case.
 
-            self._handlers = [handler for handler in self._handlers
-                              if handler is not None and (not isinstance (handler, WeakBinding)
-                                                          or handler)]
+            if type (handlers) is list:
+                handlers = ([handler for handler in handlers
+                             if handler is not None and (not isinstance (handler, WeakBinding)
+                                                         or handler)]
+                            or None)
+            elif isinstance (handlers, WeakBinding) and not handlers:
+                handlers = None
 
-            if not self._handlers:
-                self._handlers = None
-                parent         = self.__parent ()
+            self._handlers = handlers
+
+            if handlers is None:
+                self._handlers      = None
+                self._handler_index = None
+                parent              = self.__parent ()
                 if parent is not None:
                     AbstractGCProtector.default.unprotect (self)
 
+            else:
+                self._rebuild_handler_index ()
+
 
     def _additional_description (self, formatter):
         parent = self.__parent ()
@@ -1362,10 +1941,3336 @@ _NONE_REFERENCE = DummyReference (None)
 
 
 
-#-- Internal variables -----------------------------------------------
+#-- Copy-on-write signal class ---------------------------------------
 
-# It is not guaranteed to be a singleton, although it probably always is.
-_EMPTY_TUPLE = ()
+# Implementation note: `_handlers' is either None or a non-empty tuple.  It is never
+# modified in place, instead any connection or disconnection replaces the tuple.
+
+class SnapshotSignal (Signal):
+
+    """
+    Subclass of C{L{Signal}} which stores its handlers in an immutable tuple.  Connecting
+    or disconnecting a handler replaces the tuple, so these operations are a little slower
+    than with plain signals, but emission is cheaper: it just walks the tuple as it was at
+    the time emission started.  This is beneficial if the signal is emitted much more
+    often than its handlers are changed.
+
+    Note that this changes semantics of modifying handler list during emission.  Handlers
+    connected during an emission are I{not} called by it, while handlers disconnected
+    during an emission I{are} still called by it, if they haven’t been yet.  Only the
+    subsequent emissions see the changes.  Blocking and unblocking handlers, as well as
+    stopping emission, still take effect immediately.
+
+    Handlers of garbage-collected objects are removed from the signal immediately, not
+    after the next emission as with C{Signal}.
+    """
+
+    __slots__ = ()
+
+
+    def do_connect (self, handler):
+        if self._handlers is not None:
+            self._handlers = self._handlers + (handler,)
+        else:
+            self._handlers = (handler,)
+
+
+    def disconnect (self, handler, *arguments, **keywords):
+        handlers = self._handlers
+        if handlers is None or not is_callable (handler):
+            return False
+
+        if arguments or keywords:
+            handler = Binding (handler, arguments, keywords)
+
+        # See `Signal.disconnect' for why we search from the end.
+        index = len (handlers) - 1
+        while index >= 0:
+            if handlers[index] != handler:
+                index -= 1
+            else:
+                self._handlers = (handlers[:index] + handlers[index + 1:]) or None
+
+                if (    self._blocked_handlers is not _EMPTY_TUPLE
+                    and handler not in handlers[:index]):
+                    self._blocked_handlers = _forget_blocked (self._blocked_handlers, handler)
+
+                return True
+
+        return False
+
+
+    def disconnect_all (self, handler, *arguments, **keywords):
+        handlers = self._handlers
+        if handlers is None or not is_callable (handler):
+            return False
+
+        if arguments or keywords:
+            handler = Binding (handler, arguments, keywords)
+
+        self._handlers = tuple ([_handler for _handler in handlers if _handler != handler])
+        any_removed    = (len (self._handlers) != len (handlers))
+
+        if not self._handlers:
+            self._handlers = None
+
+        if any_removed and self._blocked_handlers is not _EMPTY_TUPLE:
+            self._blocked_handlers = _forget_blocked (self._blocked_handlers, handler)
+
+        return any_removed
+
+
+    def _wrap_handler (self, handler, *arguments, **keywords):
+        return WeakBinding.wrap (handler,
+                                 arguments,
+                                 self.__handler_garbage_collected,
+                                 keywords)
+
+    def __handler_garbage_collected (self, object):
+        self.collect_garbage ()
+
+
+    def emit (self, *arguments, **keywords):
+        # NOTE: This is a leaner version of `Signal.emit': since the handler tuple is
+        #       never modified, there are neither disconnected handler placeholders, nor
+        #       need to collect garbage afterwards.  Native `Signal.emit' (if available)
+        #       handles tuples just as well and replaces this method at the end of module.
+
+        handlers    = self._handlers
+        accumulator = self._Signal__accumulator
+
+        if accumulator is not None:
+            value = accumulator.get_initial_value ()
+
+        if handlers is not None:
+            saved_emission_level         = self._Signal__emission_level
+            self._Signal__emission_level = abs (saved_emission_level) + 1
+
+            try:
+                for handler in handlers:
+                    if self._Signal__emission_level < 0:
+                        break
+
+                    blocked_handlers = self._blocked_handlers
+                    if blocked_handlers and _is_blocked (blocked_handlers, handler):
+                        continue
+
+                    # A handler can only be dead here if its object has been
+                    # garbage-collected during this very emission.
+                    if not handler and isinstance (handler, WeakBinding):
+                        continue
+
+                    if accumulator is None:
+                        try:
+                            handler (*arguments, **keywords)
+                        except:
+                            _report_handler_exception (self, sys.exc_info () [1], handler)
+                    else:
+                        try:
+                            handler_value = handler (*arguments, **keywords)
+                        except:
+                            _report_handler_exception (self, sys.exc_info () [1], handler)
+                        else:
+                            value = accumulator.accumulate_value (value, handler_value)
+                            if not accumulator.should_continue (value):
+                                break
+            finally:
+                self._Signal__emission_level = saved_emission_level
+
+        if accumulator is None:
+            return None
+        else:
+            return accumulator.post_process_value (value)
+
+
+    def collect_garbage (self):
+        # Unlike with the superclass, this is safe to do even during emission.
+        handlers = self._handlers
+
+        if handlers is not None:
+            self._handlers = (tuple ([handler for handler in handlers
+                                      if not isinstance (handler, WeakBinding) or handler])
+                              or None)
+
+
+
+#-- Priority signal class --------------------------------------------
+
+# Implementation note: `__priorities' is None if there are no handlers, else a tuple of
+# negated handler priorities, parallel to `_handlers'.  Priorities are negated so that the
+# tuple is in ascending order and position for a new handler can be found with `bisect'.
+
+class PrioritySignal (SnapshotSignal):
+
+    """
+    Subclass of C{L{SnapshotSignal}} which calls its handlers in order of their
+    priorities: handlers with higher priority are called first.  Handlers with equal
+    priorities are called in the order they were connected.  Priority is specified on
+    connection and can later be changed with C{L{set_priority}} method, without
+    reconnecting the handler.  Default priority is 0; any number, including negative, can
+    be used.
+
+    Handlers are kept sorted by priority, so emission is no different from that of
+    C{SnapshotSignal}.  In particular, it has the same semantics of modifying handler
+    list during emission, which differ from those of plain C{L{Signal}}: each emission
+    calls the handlers that were connected when it started, in the order of priorities
+    at that time.  Handlers connected during an emission are not called by it, even with
+    a higher priority than the current handler; handlers disconnected during an emission
+    are still called by it if they haven’t been yet; and changing priority of a handler
+    affects only subsequent emissions.  Blocking and unblocking handlers, as well as
+    stopping emission, take effect immediately.
+    """
+
+    __slots__ = ('__priorities',)
+
+
+    def __init__(self, accumulator = None):
+        """
+        Create a new C{PrioritySignal} with specified C{accumulator}.
+
+        @raises TypeError: if C{accumulator} is not C{None} and not an instance of
+                           C{L{AbstractAccumulator}}.
+        """
+
+        super (PrioritySignal, self).__init__(accumulator)
+        self.__priorities = None
+
+
+    def connect (self, handler, *arguments, **keywords):
+        """
+        Connect C{handler} with C{arguments} to the signal, same as
+        C{L{AbstractSignal.connect}} does.  Optional C{priority} keyword argument
+        specifies handler priority; it is I{not} passed to the handler.
+
+        @note:
+        Since C{priority} keyword is reserved, you cannot connect a handler with a keyword
+        argument of that name to a priority signal.
+        """
+
+        priority = keywords.pop ('priority', 0)
+        handler  = self._wrap_handler (handler, *arguments, **keywords)
+        self.do_connect (handler, priority)
+        if _object_connections:
+            _register_connection (self, handler, (handler,))
+
+    def connect_safe (self, handler, *arguments, **keywords):
+        """
+        Connect C{handler} with C{arguments} to the signal unless it is connected already,
+        same as C{L{AbstractSignal.connect_safe}} does.  Optional C{priority} keyword
+        argument is treated just as by C{L{connect}}.
+
+        @rtype:   C{bool}
+        @returns: C{True} if it has connected C{handler} with C{arguments}, C{False} if it
+                  had been connected already.
+        """
+
+        priority = keywords.pop ('priority', 0)
+
+        if not self.is_connected (handler, *arguments, **keywords):
+            handler = self._wrap_handler (handler, *arguments, **keywords)
+            self.do_connect (handler, priority)
+            if _object_connections:
+                _register_connection (self, handler, (handler,))
+            return True
+        else:
+            return False
+
+
+    def do_connect (self, handler, priority = 0):
+        handlers = self._handlers
+
+        if handlers is not None:
+            priorities = self.__priorities
+            index      = bisect.bisect_right (priorities, -priority)
+
+            self._handlers    = handlers  [:index] + (handler,)   + handlers  [index:]
+            self.__priorities = priorities[:index] + (-priority,) + priorities[index:]
+
+        else:
+            self._handlers    = (handler,)
+            self.__priorities = (-priority,)
+
+
+    def get_priority (self, handler, *arguments, **keywords):
+        """
+        Get priority of C{handler} with C{arguments}.  If it is connected several times,
+        priority of the connection to be called last is returned.
+
+        @rtype:   number or C{None}
+        @returns: Handler priority or C{None} if the handler is not connected.
+        """
+
+        index = self.__find_handler (handler, arguments, keywords)
+        if index >= 0:
+            return -self.__priorities[index]
+        else:
+            return None
+
+    def set_priority (self, priority, handler, *arguments, **keywords):
+        """
+        Change priority of C{handler} with C{arguments} to C{priority}.  The handler will
+        then be called after any other handler with the same priority.  If the handler is
+        connected several times, only priority of the connection to be called last is
+        changed, to be consistent with C{L{disconnect}}.  Blocking state of the handler is
+        not affected.
+
+        @rtype:   C{bool}
+        @returns: Whether C{handler} with C{arguments} is connected to the signal.
+        """
+
+        index = self.__find_handler (handler, arguments, keywords)
+        if index < 0:
+            return False
+
+        handlers   = self._handlers
+        priorities = self.__priorities
+
+        self._handlers    = handlers  [:index] + handlers  [index + 1:]
+        self.__priorities = priorities[:index] + priorities[index + 1:]
+
+        if not self._handlers:
+            self._handlers = None
+
+        self.do_connect (handlers[index], priority)
+        return True
+
+
+    def __find_handler (self, handler, arguments, keywords):
+        handlers = self._handlers
+        if handlers is None or not is_callable (handler):
+            return -1
+
+        if arguments or keywords:
+            handler = Binding (handler, arguments, keywords)
+
+        # See `Signal.disconnect' for why we search from the end.
+        index = len (handlers) - 1
+        while index >= 0 and handlers[index] != handler:
+            index -= 1
+
+        return index
+
+
+    def disconnect (self, handler, *arguments, **keywords):
+        handlers = self._handlers
+
+        if super (PrioritySignal, self).disconnect (handler, *arguments, **keywords):
+            self.__forget_priorities (handlers)
+            return True
+        else:
+            return False
+
+    def disconnect_all (self, handler, *arguments, **keywords):
+        handlers = self._handlers
+
+        if super (PrioritySignal, self).disconnect_all (handler, *arguments, **keywords):
+            self.__forget_priorities (handlers)
+            return True
+        else:
+            return False
+
+
+    def collect_garbage (self):
+        handlers = self._handlers
+        super (PrioritySignal, self).collect_garbage ()
+
+        if handlers is not None:
+            self.__forget_priorities (handlers)
+
+
+    def __forget_priorities (self, old_handlers):
+        # Superclass methods only ever remove handlers, so current handler tuple is a
+        # subsequence of `old_handlers'.  Of several identical handlers, the last ones are
+        # removed first, so matching greedily by identity finds the surviving handlers.
+
+        handlers = self._handlers
+
+        if handlers is None:
+            self.__priorities = None
+
+        elif len (handlers) != len (old_handlers):
+            priorities = []
+            index      = 0
+
+            for handler, priority in zip (old_handlers, self.__priorities):
+                if index < len (handlers) and handlers[index] is handler:
+                    priorities.append (priority)
+                    index += 1
+
+            self.__priorities = tuple (priorities)
+
+
+
+#-- Thread-safe signal class ----------------------------------------
+
+# Implementation note: emission level of `ThreadSafeSignal' is tracked per thread, in
+# `__emission_levels' dictionary keyed by thread identifiers.  A thread only ever touches
+# its own key and removes it when its outermost emission ends, so the dictionary needs no
+# locking and never has more entries than there are threads currently emitting.  Slot
+# `_Signal__emission_level' is unused and stays zero.
+
+class ThreadSafeSignal (SnapshotSignal):
+
+    """
+    Subclass of C{L{SnapshotSignal}} which can be used from several threads at once.
+    Emission takes no locks: it walks the immutable handler tuple as it was when emission
+    started.  Connecting, disconnecting, blocking and unblocking handlers are serialized
+    with a lock, so concurrent changes are never lost.
+
+    Emission level and stopped state are tracked separately for each thread, so
+    C{L{stop_emission}} only stops the emission in the calling thread, while
+    C{L{emission_level}} and C{L{emission_stopped}} also describe just the calling
+    thread’s emissions.
+
+    Note that thread-safety of the signal doesn’t extend to handlers and accumulator:
+    they are called in the emitting thread and must be thread-safe themselves, if the
+    signal is emitted from several threads.  All standard accumulators are.
+    """
+
+    __slots__ = ('__lock', '__emission_levels')
+
+
+    def __init__(self, accumulator = None):
+        """
+        Create a new C{ThreadSafeSignal} with specified C{accumulator}.
+
+        @raises TypeError: if C{accumulator} is not C{None} and not an instance of
+                           C{L{AbstractAccumulator}}.
+        """
+
+        super (ThreadSafeSignal, self).__init__(accumulator)
+
+        # Reentrant, because a handler can be garbage-collected, and thus removed, while
+        # the lock is held by the same thread.
+        self.__lock            = threading.RLock ()
+        self.__emission_levels = {}
+
+
+    def connect_safe (self, handler, *arguments, **keywords):
+        self.__lock.acquire ()
+        try:
+            return super (ThreadSafeSignal, self).connect_safe (handler, *arguments, **keywords)
+        finally:
+            self.__lock.release ()
+
+    def do_connect (self, handler):
+        self.__lock.acquire ()
+        try:
+            super (ThreadSafeSignal, self).do_connect (handler)
+        finally:
+            self.__lock.release ()
+
+    def do_connect_safe (self, handler):
+        self.__lock.acquire ()
+        try:
+            return super (ThreadSafeSignal, self).do_connect_safe (handler)
+        finally:
+            self.__lock.release ()
+
+
+    def disconnect (self, handler, *arguments, **keywords):
+        self.__lock.acquire ()
+        try:
+            return super (ThreadSafeSignal, self).disconnect (handler, *arguments, **keywords)
+        finally:
+            self.__lock.release ()
+
+    def disconnect_all (self, handler, *arguments, **keywords):
+        self.__lock.acquire ()
+        try:
+            return super (ThreadSafeSignal, self).disconnect_all (handler, *arguments, **keywords)
+        finally:
+            self.__lock.release ()
+
+
+    # Emission reads blocked handlers without the lock, so they are never modified in
+    # place: a modified copy replaces them instead.
+
+    def block (self, handler, *arguments, **keywords):
+        if not is_callable (handler):
+            return False
+
+        if arguments or keywords:
+            handler = Binding (handler, arguments, keywords)
+
+        self.__lock.acquire ()
+        try:
+            if not self.is_connected (handler):
+                return False
+
+            blocked_handlers = _copy_blocked (self._blocked_handlers)
+            _add_block (blocked_handlers, handler)
+
+            self._blocked_handlers = blocked_handlers
+            return True
+
+        finally:
+            self.__lock.release ()
+
+    def unblock (self, handler, *arguments, **keywords):
+        if not is_callable (handler):
+            return False
+
+        if arguments or keywords:
+            handler = Binding (handler, arguments, keywords)
+
+        self.__lock.acquire ()
+        try:
+            if self._blocked_handlers is _EMPTY_TUPLE:
+                return False
+
+            blocked_handlers = _copy_blocked (self._blocked_handlers)
+            if not _remove_block (blocked_handlers, handler):
+                return False
+
+            self._blocked_handlers = blocked_handlers or _EMPTY_TUPLE
+            return True
+
+        finally:
+            self.__lock.release ()
+
+
+    def emit (self, *arguments, **keywords):
+        # NOTE: This is `SnapshotSignal.emit', only with per-thread emission level.
+
+        handlers    = self._handlers
+        accumulator = self._Signal__accumulator
+
+        if accumulator is not None:
+            value = accumulator.get_initial_value ()
+
+        if handlers is not None:
+            emission_levels         = self.__emission_levels
+            thread                  = _get_thread_id ()
+            saved_emission_level    = emission_levels.get (thread, 0)
+            emission_levels[thread] = abs (saved_emission_level) + 1
+
+            try:
+                for handler in handlers:
+                    if emission_levels[thread] < 0:
+                        break
+
+                    blocked_handlers = self._blocked_handlers
+                    if blocked_handlers and _is_blocked (blocked_handlers, handler):
+                        continue
+
+                    if not handler and isinstance (handler, WeakBinding):
+                        continue
+
+                    if accumulator is None:
+                        try:
+                            handler (*arguments, **keywords)
+                        except:
+                            _report_handler_exception (self, sys.exc_info () [1], handler)
+                    else:
+                        try:
+                            handler_value = handler (*arguments, **keywords)
+                        except:
+                            _report_handler_exception (self, sys.exc_info () [1], handler)
+                        else:
+                            value = accumulator.accumulate_value (value, handler_value)
+                            if not accumulator.should_continue (value):
+                                break
+            finally:
+                if saved_emission_level == 0:
+                    del emission_levels[thread]
+                else:
+                    emission_levels[thread] = saved_emission_level
+
+        if accumulator is None:
+            return None
+        else:
+            return accumulator.post_process_value (value)
+
+
+    def emit_many (self, argument_sets):
+        emit = self.emit
+        return [emit (*arguments) for arguments in argument_sets]
+
+
+    def _get_emission_level (self):
+        return abs (self.__emission_levels.get (_get_thread_id (), 0))
+
+    def _is_emission_stopped (self):
+        return self.__emission_levels.get (_get_thread_id (), 0) < 0
+
+    def stop_emission (self):
+        emission_levels = self.__emission_levels
+        thread          = _get_thread_id ()
+        emission_level  = emission_levels.get (thread, 0)
+
+        if emission_level > 0:
+            emission_levels[thread] = -emission_level
+            return True
+        else:
+            return False
+
+
+    def collect_garbage (self):
+        self.__lock.acquire ()
+        try:
+            super (ThreadSafeSignal, self).collect_garbage ()
+        finally:
+            self.__lock.release ()
+
+
+
+#-- Asynchronous signal class ----------------------------------------
+
+# Implementation note: emission level of `AsyncSignal' is tracked per `asyncio' task, the
+# same way `ThreadSafeSignal' tracks it per thread: several emissions of one signal can be
+# suspended at the same time, each in its own task.
+
+class AsyncSignal (SnapshotSignal):
+
+    """
+    Subclass of C{L{SnapshotSignal}} for use with C{asyncio}.  Its C{L{emit}} method is a
+    coroutine: handlers are called as usual, but if a handler returns an awaitable (e.g.
+    it is a coroutine function), the result is awaited.  The values handlers return,
+    after awaiting, are passed to the accumulator in handler connection order, so all
+    accumulators work just like with other signals.
+
+    By default, awaitables are awaited one by one: a handler is not called until the
+    previous one is done.  If C{concurrency} is set when creating the signal, all handlers
+    are called first and the awaitables they return are then awaited concurrently, at most
+    C{concurrency} at a time (or without any limit if it is C{None}.)  In this mode
+    C{L{stop_emission}} has effect only if called before a handler returns, and
+    accumulator cannot prevent remaining handlers from being called, only their values
+    from being accumulated.
+
+    Emission level and stopped state are tracked separately for each C{asyncio} task.
+
+    @note:
+    This class can be instantiated only in Python 3.5 or newer.
+    """
+
+    __slots__ = ('__concurrency', '__emission_levels')
+
+
+    def __init__(self, accumulator = None, concurrency = 1):
+        """
+        Create a new C{AsyncSignal} with specified C{accumulator}.  If C{concurrency} is
+        1, handler results are awaited one after another; otherwise it limits how many of
+        them are awaited at once, with C{None} meaning no limit.
+
+        @raises TypeError:           if C{accumulator} is not C{None} and not an instance
+                                     of C{L{AbstractAccumulator}}.
+        @raises ValueError:          if C{concurrency} is neither C{None} nor a positive
+                                     integer.
+        @raises NotImplementedError: if Python is older than 3.5.
+        """
+
+        if 'asyncio' not in globals ():
+            raise NotImplementedError ('AsyncSignal requires Python 3.5 or later')
+
+        if concurrency is not None and not (isinstance (concurrency, int) and concurrency > 0):
+            raise ValueError ("'concurrency' must be None or a positive integer")
+
+        super (AsyncSignal, self).__init__(accumulator)
+
+        self.__concurrency     = concurrency
+        self.__emission_levels = {}
+
+
+    def _get_concurrency (self):
+        return self.__concurrency
+
+    concurrency = property (_get_concurrency,
+                            doc = ("""
+                                   Maximum number of handler results awaited at once, or
+                                   C{None} for no limit.  Read-only.
+
+                                   @type: int or None
+                                   """))
+
+    del _get_concurrency
+
+
+    if 'asyncio' in globals ():
+        # See `AbstractSignal' for explanations.
+
+        from notify._3_5 import signal as _3_5
+
+        emit                 = _3_5.emit
+        emit_many            = _3_5.emit_many
+
+        emit.__module__      = __module__
+        emit_many.__module__ = __module__
+
+        del _3_5
+
+
+    def _get_emission_level (self):
+        return abs (self.__emission_levels.get (_get_current_task (), 0))
+
+    def _is_emission_stopped (self):
+        return self.__emission_levels.get (_get_current_task (), 0) < 0
+
+    def stop_emission (self):
+        emission_levels = self.__emission_levels
+        task            = _get_current_task ()
+        emission_level  = emission_levels.get (task, 0)
+
+        if emission_level > 0:
+            emission_levels[task] = -emission_level
+            return True
+        else:
+            return False
+
+
+    def _additional_description (self, formatter):
+        if self.__concurrency == 1:
+            return super (AsyncSignal, self)._additional_description (formatter)
+
+        return (['concurrency: %s' % self.__concurrency]
+                + super (AsyncSignal, self)._additional_description (formatter))
+
+
+
+#-- Parallel signal class --------------------------------------------
+
+class ParallelSignal (SnapshotSignal):
+
+    """
+    Subclass of C{L{SnapshotSignal}} that calls its handlers in a thread pool instead of
+    one after another in the emitting thread.  This is useful if handlers spend most of
+    their time in code that releases the global interpreter lock, e.g. doing input and
+    output or number crunching in native extensions.
+
+    Emission submits all non-blocked handlers to the pool and then waits for them to
+    finish.  Values they return are passed to the accumulator in handler connection
+    order, as with any other signal; if the accumulator tells to stop, handlers that
+    haven’t started yet are cancelled and the rest are not waited for.  Exceptions raised
+    by handlers are reported through C{L{exception_handler}} in the emitting thread, also
+    in connection order.
+
+    By default, a C{concurrent.futures.ThreadPoolExecutor} with C{max_workers} threads is
+    created on first emission.  Alternatively, any executor (an object with
+    C{concurrent.futures} compatible C{submit} method) can be passed to the constructor.
+    If C{timeout} is set, emission waits at most that many seconds for all handlers in
+    total; handlers that don’t finish in time are reported as failed with the executor’s
+    timeout exception.
+
+    C{L{stop_emission}} can be called from handlers or other threads: handlers that
+    haven’t started yet are then cancelled and no more values are accumulated.  Note that
+    emission level is shared by all threads emitting the signal.
+
+    @note:
+    Unless an executor is specified, this class requires C{concurrent.futures} module,
+    which is standard since Python 3.2.
+    """
+
+    __slots__ = ('__executor', '__owns_executor', '__max_workers', '__timeout')
+
+
+    def __init__(self, accumulator = None, max_workers = None, timeout = None,
+                 executor = None):
+        """
+        Create a new C{ParallelSignal} with specified C{accumulator}.
+
+        @param max_workers: number of threads in the pool, or C{None} for the
+                            C{concurrent.futures} default; ignored if C{executor} is
+                            specified.
+        @type  max_workers: C{int} or C{None}
+
+        @param timeout:     maximum time in seconds an emission waits for handlers to
+                            finish, or C{None} to wait as long as needed.
+        @type  timeout:     C{float} or C{None}
+
+        @param executor:    executor to run handlers in, instead of creating a pool.
+
+        @raises TypeError:           if C{accumulator} is not C{None} and not an instance
+                                     of C{L{AbstractAccumulator}}.
+        @raises ValueError:          if C{max_workers} or C{timeout} is not positive.
+        @raises NotImplementedError: if C{executor} is not specified and
+                                     C{concurrent.futures} is not available.
+        """
+
+        if executor is None and 'concurrent' not in globals ():
+            raise NotImplementedError ("ParallelSignal requires 'concurrent.futures' "
+                                       "module or an explicit executor")
+
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError ("'max_workers' must be positive")
+        if timeout is not None and timeout <= 0:
+            raise ValueError ("'timeout' must be positive")
+
+        super (ParallelSignal, self).__init__(accumulator)
+
+        self.__executor      = executor
+        self.__owns_executor = (executor is None)
+        self.__max_workers   = max_workers
+        self.__timeout       = timeout
+
+
+    max_workers = property (lambda self: self.__max_workers,
+                            doc = ("""
+                            Number of threads in the pool the signal creates, or C{None}
+                            if the C{concurrent.futures} default is used.  Read-only.
+
+                            @type: int or None
+                            """))
+
+    timeout     = property (lambda self: self.__timeout,
+                            doc = ("""
+                            Maximum time in seconds an emission waits for its handlers,
+                            or C{None} if it waits as long as needed.  Read-only.
+
+                            @type: float or None
+                            """))
+
+
+    def emit (self, *arguments, **keywords):
+        handlers    = self._handlers
+        accumulator = self._Signal__accumulator
+
+        if accumulator is not None:
+            value = accumulator.get_initial_value ()
+
+        if handlers is not None:
+            saved_emission_level         = self._Signal__emission_level
+            self._Signal__emission_level = abs (saved_emission_level) + 1
+
+            try:
+                executor = self.__executor
+                if executor is None:
+                    if self.__max_workers is None:
+                        executor = concurrent.futures.ThreadPoolExecutor ()
+                    else:
+                        executor = concurrent.futures.ThreadPoolExecutor (self.__max_workers)
+
+                    self.__executor = executor
+
+                futures = []
+
+                for handler in handlers:
+                    blocked_handlers = self._blocked_handlers
+                    if blocked_handlers and _is_blocked (blocked_handlers, handler):
+                        continue
+
+                    if not handler and isinstance (handler, WeakBinding):
+                        continue
+
+                    futures.append ((handler,
+                                     executor.submit (handler, *arguments, **keywords)))
+
+                if self.__timeout is not None:
+                    deadline = _timer () + self.__timeout
+
+                for index in range (len (futures)):
+                    handler, future = futures[index]
+
+                    if self._Signal__emission_level < 0:
+                        _cancel_futures (futures[index:])
+                        break
+
+                    if self.__timeout is None:
+                        timeout = None
+                    else:
+                        timeout = max (deadline - _timer (), 0)
+
+                    try:
+                        handler_value = future.result (timeout)
+                    except:
+                        future.cancel ()
+                        _report_handler_exception (self, sys.exc_info () [1], handler)
+                    else:
+                        if accumulator is not None:
+                            value = accumulator.accumulate_value (value, handler_value)
+                            if not accumulator.should_continue (value):
+                                _cancel_futures (futures[index + 1:])
+                                break
+            finally:
+                self._Signal__emission_level = saved_emission_level
+
+        if accumulator is None:
+            return None
+        else:
+            return accumulator.post_process_value (value)
+
+
+    def emit_many (self, argument_sets):
+        emit = self.emit
+        return [emit (*arguments) for arguments in argument_sets]
+
+
+    def shutdown (self, wait = True):
+        """
+        Shut down the thread pool created by the signal, if any.  If C{wait} is true, this
+        method returns only after all handlers running in the pool finish.  A new pool
+        will be created if the signal is emitted again.  An executor specified on
+        construction is never shut down by this method: it belongs to the caller.
+        """
+
+        executor = self.__executor
+
+        if executor is not None and self.__owns_executor:
+            self.__executor = None
+            executor.shutdown (wait)
+
+
+    def _additional_description (self, formatter):
+        descriptions = []
+
+        if self.__max_workers is not None:
+            descriptions.append ('max workers: %d' % self.__max_workers)
+        if self.__timeout is not None:
+            descriptions.append ('timeout: %s' % self.__timeout)
+
+        return descriptions + super (ParallelSignal, self)._additional_description (formatter)
+
+
+
+#-- Deferred signal class --------------------------------------------
+
+# Implementation note: `__queue' is a list of `(arguments, keywords)' tuples, where
+# `keywords' is None if there are no keyword arguments.  `__queued_keys' is only used with
+# `DELIVER_UNIQUE' policy and is a dictionary of hashable queue entries, to find duplicate
+# emissions quickly.
+
+class DeferredSignal (Signal):
+
+    """
+    Subclass of C{L{Signal}} which queues emissions instead of invoking handlers right
+    away.  Queued emissions are delivered to handlers by C{L{flush}} method or, with
+    Python 2.5 and later, upon exiting a C{L{deferred}} context.  Emissions made by
+    handlers during flushing are queued again and are only delivered by the next flush.
+
+    Often most of emissions in a burst are wasted work, since handlers are only interested
+    in the final state.  Therefore, the signal can I{coalesce} queued emissions according
+    to its C{L{policy}}:
+
+      - C{L{DELIVER_ALL}}: deliver all emissions, in order;
+
+      - C{L{DELIVER_LAST}}: deliver only the last emission;
+
+      - C{L{DELIVER_UNIQUE}}: deliver each distinct emission (i.e. set of arguments) only
+        once, in order of first emission.
+
+    Since emission only queues, C{L{emit}} always returns C{None}; results of handler
+    invocations are instead returned by C{flush}.
+    """
+
+    DELIVER_ALL    = 'all'
+    DELIVER_LAST   = 'last'
+    DELIVER_UNIQUE = 'unique'
+
+    __slots__ = ('__policy', '__queue', '__queued_keys', '__deferral_level')
+
+
+    def __init__(self, accumulator = None, policy = DELIVER_ALL):
+        """
+        Create a new C{DeferredSignal} with specified C{accumulator} and coalescing
+        C{policy}.
+
+        @param  policy:      one of C{L{DELIVER_ALL}}, C{L{DELIVER_LAST}} or
+                             C{L{DELIVER_UNIQUE}}.
+
+        @raises TypeError:   if C{accumulator} is not C{None} and not an instance of
+                             C{L{AbstractAccumulator}}.
+        @raises ValueError:  if C{policy} is not valid.
+        """
+
+        if policy not in (DeferredSignal.DELIVER_ALL,
+                          DeferredSignal.DELIVER_LAST,
+                          DeferredSignal.DELIVER_UNIQUE):
+            raise ValueError ("unknown coalescing policy '%s'" % policy)
+
+        super (DeferredSignal, self).__init__(accumulator)
+
+        self.__policy         = policy
+        self.__queue          = []
+        self.__queued_keys    = None
+        self.__deferral_level = 0
+
+
+    policy = property (lambda self: self.__policy,
+                       doc = ("""
+                       Coalescing policy of the signal, one of C{L{DELIVER_ALL}},
+                       C{L{DELIVER_LAST}} or C{L{DELIVER_UNIQUE}}.  Policy cannot be
+                       changed, it can only be specified at signal creation time.
+
+                       @type: C{str}
+                       """))
+
+
+    def emit (self, *arguments, **keywords):
+        self.__enqueue (arguments, keywords or None)
+
+    def emit_many (self, argument_sets):
+        results = []
+
+        for arguments in argument_sets:
+            self.__enqueue (tuple (arguments), None)
+            results.append (None)
+
+        return results
+
+
+    def __enqueue (self, arguments, keywords):
+        policy = self.__policy
+
+        if policy == DeferredSignal.DELIVER_ALL:
+            self.__queue.append ((arguments, keywords))
+
+        elif policy == DeferredSignal.DELIVER_LAST:
+            self.__queue = [(arguments, keywords)]
+
+        else:
+            if keywords is not None:
+                items = list (keywords.items ())
+                items.sort ()
+                key   = (arguments, tuple (items))
+            else:
+                key = (arguments, None)
+
+            if self.__queued_keys is None:
+                self.__queued_keys = {}
+
+            try:
+                if key in self.__queued_keys:
+                    return
+
+                self.__queued_keys[key] = None
+
+            except TypeError:
+                # Some arguments are not hashable, resort to linear search.
+                if (arguments, keywords) in self.__queue:
+                    return
+
+            self.__queue.append ((arguments, keywords))
+
+
+    def has_pending_emissions (self):
+        """
+        Determine if there are any queued emissions, not yet delivered by C{L{flush}}.
+
+        @rtype: C{bool}
+        """
+
+        return bool (self.__queue)
+
+
+    def flush (self):
+        """
+        Deliver all queued emissions to handlers, subject to coalescing C{L{policy}}, and
+        return the list of values returned by the signal’s accumulator for each (the same
+        as C{L{Signal.emit}} would return, i.e. C{None} if there is no accumulator.)  If
+        there are no queued emissions, do nothing and return an empty list.
+
+        @rtype:   C{list}
+        """
+
+        queue = self.__queue
+        if not queue:
+            return []
+
+        self.__queue       = []
+        self.__queued_keys = None
+
+        for arguments, keywords in queue:
+            if keywords is not None:
+                break
+        else:
+            # No keyword arguments, so we can use the (faster) batched emission.
+            return super (DeferredSignal, self).emit_many ([arguments
+                                                            for arguments, keywords in queue])
+
+        emit = super (DeferredSignal, self).emit
+        return [emit (*arguments, **(keywords or {})) for arguments, keywords in queue]
+
+
+    if 'contextlib' in globals ():
+        # See `AbstractSignal' for explanations.
+
+        from notify._2_5 import signal as _2_5
+
+        deferred            = _2_5.deferred
+        deferred.__module__ = __module__
+
+        del _2_5
+
+
+    def _additional_description (self, formatter):
+        descriptions = ['policy: %s' % self.__policy]
+
+        if self.__queue:
+            descriptions.append ('%d pending emission(s)' % len (self.__queue))
+
+        return descriptions + super (DeferredSignal, self)._additional_description (formatter)
+
+
+
+#-- Breadth-first signal class ---------------------------------------
+
+# Implementation note: `_breadth_first_queues' maps thread identifiers to lists of queued
+# `(signal, arguments, keywords)' tuples.  A thread has a queue only while it performs
+# the outermost emission of a breadth-first signal.  Processed entries are replaced with
+# None and the list is compacted from time to time, so memory use is proportional to the
+# number of pending emissions, not to the total length of a cascade.
+
+class BreadthFirstSignal (Signal):
+
+    """
+    Subclass of C{L{Signal}} that never emits recursively.  When a handler, directly or
+    not, emits any C{BreadthFirstSignal} (this one or another) in the same thread, that
+    emission is queued instead and is performed by the outermost emission after it
+    finishes calling its own handlers.  Therefore, long cascades of emissions, e.g. a
+    chain of L{synchronized <base.AbstractValueObject.synchronize>} variables, don't lead
+    to deep recursion and C{RuntimeError} (or C{RecursionError}) is never raised because
+    of them.
+
+    Order of emissions is deterministic: queued emissions are performed one after
+    another in the order they were requested, i.e. the whole cascade is processed
+    breadth-first.  Each of them calls its handlers as C{L{Signal.emit}} does, including
+    possible interruption with C{L{stop_emission}}, which only stops that emission.
+
+    Since a queued emission is performed later, C{L{emit}} in this case returns C{None}
+    regardless of accumulator.  The outermost emission returns its own result, as usual.
+    If an exception is thrown out of any emission (see
+    C{L{exception_handler <AbstractSignal.exception_handler>}}), it propagates from the
+    outermost C{emit} call and any emissions still queued are discarded.
+
+    Signals of C{L{value objects <base.AbstractValueObject>}} can be made breadth-first
+    by overriding C{L{_create_signal <base.AbstractValueObject._create_signal>}} method.
+
+    Subclasses that need to act on every emission, queued or not, should override
+    C{L{_emit_now}} rather than C{L{emit}}: the latter only queues nested emissions.
+    """
+
+    __slots__ = ()
+
+
+    def emit (self, *arguments, **keywords):
+        thread = _get_thread_id ()
+        queue  = _breadth_first_queues.get (thread)
+
+        if queue is not None:
+            queue.append ((self._emit_now, arguments, keywords))
+            return None
+
+        queue = _breadth_first_queues[thread] = []
+
+        try:
+            result = self._emit_now (*arguments, **keywords)
+
+            index = 0
+            while index < len (queue):
+                emit_now, arguments, keywords = queue[index]
+                queue[index]                  = None
+                index                        += 1
+
+                emit_now (*arguments, **keywords)
+
+                if index >= _BREADTH_FIRST_COMPACTION_THRESHOLD:
+                    del queue[:index]
+                    index = 0
+
+        finally:
+            del _breadth_first_queues[thread]
+
+        return result
+
+    def _emit_now (self, *arguments, **keywords):
+        """
+        Emit the signal right away, i.e. call its handlers as C{L{Signal.emit}} does.
+        This is called by C{L{emit}} for the outermost emission and for each queued one.
+
+        @rtype: C{object}
+        """
+
+        return super (BreadthFirstSignal, self).emit (*arguments, **keywords)
+
+
+    def emit_many (self, argument_sets):
+        emit = self.emit
+        return [emit (*arguments) for arguments in argument_sets]
+
+
+
+#-- Compiling signal class -------------------------------------------
+
+# Implementation note: `__dispatcher' is either None or a generated function that emits
+# the signal, invoking all handlers in `_handlers' in turn.  `__token' is replaced by a
+# fresh object whenever the dispatcher becomes invalid or emission is stopped; a running
+# dispatcher checks it after each handler and, if it changes, leaves the rest of emission
+# to generic code.  Positions of handlers in `_handlers' don't change during
+# emission, so the generic code can resume exactly where the dispatcher has stopped.
+
+class CompilingSignal (Signal):
+
+    """
+    Subclass of C{L{Signal}} which generates and compiles a specialized function to invoke
+    its handlers, once the handler list has not changed during several emissions.  The
+    generated function calls all handlers in a row, without checks for disconnected,
+    blocked or garbage-collected handlers that C{Signal.emit} has to perform for each
+    handler.  Any change to the handler list, including blocking, unblocking and
+    garbage-collection of a handler’s object, invalidates the function.
+
+    This is mostly useful when native emission (see C{L{HAVE_FAST_EMISSION}}) is not
+    available, e.g. on PyPy or when the extension is not built.  Emission semantics are
+    exactly the same as for C{Signal}.  However, compilation does take time, so signals
+    whose handlers change frequently are better off being plain C{Signal} instances.
+    """
+
+    __slots__ = ('__dispatcher', '__token', '__num_stable_emissions')
+
+
+    def __init__(self, accumulator = None):
+        super (CompilingSignal, self).__init__(accumulator)
+
+        self.__dispatcher           = None
+        self.__token                = object ()
+        self.__num_stable_emissions = 0
+
+
+    def do_connect (self, handler):
+        super (CompilingSignal, self).do_connect (handler)
+        self.__invalidate ()
+
+
+    def disconnect (self, handler, *arguments, **keywords):
+        if super (CompilingSignal, self).disconnect (handler, *arguments, **keywords):
+            self.__invalidate ()
+            return True
+        else:
+            return False
+
+    def disconnect_all (self, handler, *arguments, **keywords):
+        if super (CompilingSignal, self).disconnect_all (handler, *arguments, **keywords):
+            self.__invalidate ()
+            return True
+        else:
+            return False
+
+
+    def block (self, handler, *arguments, **keywords):
+        if super (CompilingSignal, self).block (handler, *arguments, **keywords):
+            self.__invalidate ()
+            return True
+        else:
+            return False
+
+    def unblock (self, handler, *arguments, **keywords):
+        if super (CompilingSignal, self).unblock (handler, *arguments, **keywords):
+            self.__invalidate ()
+            return True
+        else:
+            return False
+
+
+    def _wrap_handler (self, handler, *arguments, **keywords):
+        return WeakBinding.wrap (handler,
+                                 arguments,
+                                 self.__handler_garbage_collected,
+                                 keywords)
+
+    def __handler_garbage_collected (self, object):
+        self.__invalidate ()
+
+
+    def __invalidate (self):
+        self.__dispatcher           = None
+        self.__token                = object ()
+        self.__num_stable_emissions = 0
+
+
+    def emit (self, *arguments, **keywords):
+        dispatcher = self.__dispatcher
+        if dispatcher is not None and not keywords:
+            return dispatcher (self, arguments)
+
+        result = super (CompilingSignal, self).emit (*arguments, **keywords)
+
+        self.__num_stable_emissions += 1
+        if self.__num_stable_emissions >= _COMPILATION_THRESHOLD:
+            self.__compile ()
+
+        return result
+
+
+    def stop_emission (self):
+        if super (CompilingSignal, self).stop_emission ():
+            # Make the running dispatcher, if any, notice.
+            self.__token = object ()
+            return True
+        else:
+            return False
+
+
+    def __emit_from (self, index, accumulator, arguments, keywords, value):
+        # This is the loop of `Signal.emit', only starting from given handler.
+        handlers = _as_handler_sequence (self._handlers)
+
+        while index < len (handlers):
+            handler  = handlers[index]
+            index   += 1
+
+            if handler is None:
+                continue
+
+            if self._Signal__emission_level < 0:
+                break
+
+            blocked_handlers = self._blocked_handlers
+            if blocked_handlers and _is_blocked (blocked_handlers, handler):
+                continue
+
+            if not handler and isinstance (handler, WeakBinding):
+                continue
+
+            if accumulator is None:
+                try:
+                    handler (*arguments, **keywords)
+                except:
+                    _report_handler_exception (self, sys.exc_info () [1], handler)
+            else:
+                try:
+                    handler_value = handler (*arguments, **keywords)
+                except:
+                    _report_handler_exception (self, sys.exc_info () [1], handler)
+                else:
+                    value = accumulator.accumulate_value (value, handler_value)
+                    if not accumulator.should_continue (value):
+                        break
+
+        return value
+
+
+    def __compile (self):
+        # The generated function is equivalent to `Signal.emit' with the handler loop
+        # unrolled.  Handler sequence is wrapped in a `while' loop only to be able to
+        # break out of it early.  Since passing even an empty keyword dictionary to
+        # handlers is measurably slower, the function is only used for emissions without
+        # keyword arguments.
+
+        self.__num_stable_emissions = 0
+
+        handlers = _as_handler_sequence (self._handlers)
+        if (not handlers
+            or len (handlers) > _MAX_COMPILED_HANDLERS
+            or self._blocked_handlers is not _EMPTY_TUPLE
+            or self._Signal__emission_level != 0):
+            return
+
+        accumulator = self._Signal__accumulator
+        namespace   = { 'sys':                      sys,
+                        'report_handler_exception': _report_handler_exception,
+                        'accumulator':              accumulator,
+                        'resume':                   CompilingSignal.__emit_from,
+                        'no_keywords':              {} }
+        source      = ['def dispatch (signal, arguments):',
+                       '    token                          = signal._CompilingSignal__token',
+                       '    saved_emission_level           = signal._Signal__emission_level',
+                       '    signal._Signal__emission_level = abs (saved_emission_level) + 1']
+
+        if accumulator is not None:
+            accumulation = _ACCUMULATIONS.get (type (accumulator), _GENERIC_ACCUMULATION)
+            if accumulation == _GENERIC_ACCUMULATION:
+                namespace['accumulate_value'] = accumulator.accumulate_value
+                namespace['should_continue']  = accumulator.should_continue
+                source.append ('    value = accumulator.get_initial_value ()')
+            elif accumulation == _VALUE_LIST_ACCUMULATION:
+                source.append ('    value = []')
+            else:
+                source.append ('    value = %r' % _INITIAL_VALUES[accumulation])
+        else:
+            source.append ('    value = None')
+
+        source.append ('    try:')
+        source.append ('        while 1:')
+
+        for index, handler in enumerate (handlers):
+            if handler is None or (not handler and isinstance (handler, WeakBinding)):
+                return
+
+            name            = 'handler_%d' % index
+            namespace[name] = handler
+
+            if accumulator is None:
+                source.append ('            try: %s (*arguments)' % name)
+            else:
+                source.append ('            try: handler_value = %s (*arguments)' % name)
+
+            source.append (('            except: report_handler_exception '
+                            '(signal, sys.exc_info () [1], %s)')
+                           % name)
+
+            if accumulator is not None:
+                source.append ('            else:')
+                source.append (_COMPILED_ACCUMULATIONS[accumulation])
+
+            source.append ('            if signal._CompilingSignal__token is not token:')
+            source.append ('                if signal._Signal__emission_level > 0:')
+            source.append (('                    value = resume (signal, %d, accumulator, '
+                            'arguments, no_keywords, value)')
+                           % (index + 1))
+            source.append ('                break')
+
+        source.append ('            break')
+        source.append ('    finally:')
+        source.append ('        signal._Signal__emission_level = saved_emission_level')
+        source.append ('        if (saved_emission_level == 0')
+        source.append ('            and signal._CompilingSignal__token is not token):')
+        source.append ('            signal.collect_garbage ()')
+
+        if accumulator is not None:
+            if accumulation == _GENERIC_ACCUMULATION:
+                source.append ('    return accumulator.post_process_value (value)')
+            else:
+                source.append ('    return value')
+
+        functions = {}
+        execute ('\n'.join (source), namespace, functions)
+
+        self.__dispatcher = functions['dispatch']
+
+
+    def collect_garbage (self):
+        handlers = _as_handler_sequence (self._handlers)
+        super (CompilingSignal, self).collect_garbage ()
+
+        if len (_as_handler_sequence (self._handlers)) != len (handlers):
+            self.__invalidate ()
+
+
+
+#-- Named signals ----------------------------------------------------
+
+# Implementation note: all state of the signals is kept in the factory, in dictionaries
+# keyed by signal name, and only for names that need it.  A signal without handlers costs
+# nothing at all.  Handler tuples follow `SnapshotSignal' conventions, blocked handler
+# dictionaries and emission levels --- those of `Signal'.  Dictionaries of blocked
+# handlers and emission levels are shared `_NO_FACTORY_STATE' until first needed, and
+# factories restricted to the same names share the dictionary of names.
+
+class SignalFactory (object):
+
+    """
+    Collection of named signals sharing one handler table.  Indexing the factory with a
+    name returns a lightweight signal object that supports everything C{L{AbstractSignal}}
+    does, but stores its handlers in the factory:
+
+        >>> factory = SignalFactory ()
+        ... factory['create'].connect (on_create)
+        ... factory['create'] (some, list, of, arguments)
+
+    Returned signals are created anew each time, but all signals for the same name are
+    equal and share all state.  It is fine to store one in a variable to avoid creating
+    it repeatedly.  Their semantics of changing handler list during emission is the same
+    as with C{L{SnapshotSignal}}.
+
+    This is useful for objects with many signals, most of which have no handlers at any
+    given time: instead of allocating a C{L{Signal}} for each name, a single factory
+    holds only those handlers that are actually connected.
+
+    A factory can optionally be restricted to a fixed set of signal names, in which case
+    indexing it with any other name raises C{KeyError}.
+    """
+
+    __slots__ = ('__names', '__accumulators', '__handlers', '__blocked_handlers',
+                 '__emission_levels', '__weakref__')
+
+
+    def __init__(self, names = None, accumulators = None):
+        """
+        Create a new C{SignalFactory}.
+
+        @param names:        allowed signal names, or C{None} to allow any name.
+        @param accumulators: optional dictionary of accumulators for signals, keyed by
+                             signal name.
+
+        @raises TypeError:   if any accumulator is not an instance of
+                             C{L{AbstractAccumulator}}.
+        @raises ValueError:  if there is an accumulator for a name that is not allowed.
+        """
+
+        super (SignalFactory, self).__init__()
+
+        if names is not None:
+            names = tuple (names)
+            names = _factory_name_sets.setdefault (names, frozenset (names))
+
+        if accumulators:
+            for name, accumulator in accumulators.items ():
+                if not isinstance (accumulator, AbstractSignal.AbstractAccumulator):
+                    raise TypeError ("accumulator for signal '%s' must be an instance of "
+                                     "AbstractSignal.AbstractAccumulator" % (name,))
+                if names is not None and name not in names:
+                    raise ValueError ("accumulator specified for unknown signal '%s'"
+                                      % (name,))
+
+            accumulators = dict (accumulators)
+        else:
+            accumulators = None
+
+        self.__names             = names
+        self.__accumulators      = accumulators
+        self.__handlers          = {}
+        self.__blocked_handlers  = _NO_FACTORY_STATE
+        self.__emission_levels   = _NO_FACTORY_STATE
+
+
+    def __getitem__(self, name):
+        """
+        Return signal with given C{name}.
+
+        @raises KeyError: if the factory is restricted to some names and C{name} is not
+                          one of them.
+        """
+
+        if self.__names is not None and name not in self.__names:
+            raise KeyError (name)
+
+        return _FactorySignal (self, name)
+
+
+    names = property (lambda self: (self.__names is not None
+                                    and tuple (self.__names)
+                                    or None),
+                      doc = ("""
+                      Tuple of names the factory is restricted to, in no particular
+                      order, or C{None} if there is no restriction.
+
+                      @type: tuple or None
+                      """))
+
+
+
+class _FactorySignal (AbstractSignal):
+
+    __slots__ = ('__factory', '__name')
+
+
+    def __init__(self, factory, name):
+        super (_FactorySignal, self).__init__()
+
+        self.__factory = factory
+        self.__name    = name
+
+
+    def __eq__(self, other):
+        return (isinstance (other, _FactorySignal)
+                and self.__factory is other.__factory
+                and self.__name    == other.__name)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash (self.__name) ^ id (self.__factory)
+
+
+    def has_handlers (self):
+        handlers = self.__factory._SignalFactory__handlers.get (self.__name)
+        if handlers is None:
+            return False
+
+        for handler in handlers:
+            if not isinstance (handler, WeakBinding) or handler:
+                return True
+
+        return False
+
+    def count_handlers (self):
+        handlers = self.__factory._SignalFactory__handlers.get (self.__name, _EMPTY_TUPLE)
+        return len ([handler for handler in handlers
+                     if not isinstance (handler, WeakBinding) or handler])
+
+
+    def is_connected (self, handler, *arguments, **keywords):
+        handlers = self.__factory._SignalFactory__handlers.get (self.__name)
+        if handlers is None or not is_callable (handler):
+            return False
+
+        if arguments or keywords:
+            handler = Binding (handler, arguments, keywords)
+
+        return handler in handlers
+
+    def is_blocked (self, handler, *arguments, **keywords):
+        blocked_handlers = self.__factory._SignalFactory__blocked_handlers.get (self.__name)
+        if blocked_handlers is None or not is_callable (handler):
+            return False
+
+        if arguments or keywords:
+            handler = Binding (handler, arguments, keywords)
+
+        return _is_blocked (blocked_handlers, handler)
+
+
+    def do_connect (self, handler):
+        all_handlers = self.__factory._SignalFactory__handlers
+        all_handlers[self.__name] = all_handlers.get (self.__name, _EMPTY_TUPLE) + (handler,)
+
+
+    def disconnect (self, handler, *arguments, **keywords):
+        all_handlers = self.__factory._SignalFactory__handlers
+        handlers     = all_handlers.get (self.__name)
+        if handlers is None or not is_callable (handler):
+            return False
+
+        if arguments or keywords:
+            handler = Binding (handler, arguments, keywords)
+
+        # See `Signal.disconnect' for why we search from the end.
+        index = len (handlers) - 1
+        while index >= 0:
+            if handlers[index] != handler:
+                index -= 1
+            else:
+                self.__set_handlers (handlers[:index] + handlers[index + 1:])
+                if handler not in handlers[:index]:
+                    self.__forget_blocked (handler)
+
+                return True
+
+        return False
+
+
+    def disconnect_all (self, handler, *arguments, **keywords):
+        handlers = self.__factory._SignalFactory__handlers.get (self.__name)
+        if handlers is None or not is_callable (handler):
+            return False
+
+        if arguments or keywords:
+            handler = Binding (handler, arguments, keywords)
+
+        remaining_handlers = tuple ([_handler for _handler in handlers if _handler != handler])
+        if len (remaining_handlers) == len (handlers):
+            return False
+
+        self.__set_handlers (remaining_handlers)
+        self.__forget_blocked (handler)
+
+        return True
+
+
+    def __set_handlers (self, handlers):
+        if handlers:
+            self.__factory._SignalFactory__handlers[self.__name] = handlers
+        else:
+            del self.__factory._SignalFactory__handlers[self.__name]
+
+    def __forget_blocked (self, handler):
+        all_blocked_handlers = self.__factory._SignalFactory__blocked_handlers
+        blocked_handlers     = all_blocked_handlers.get (self.__name)
+
+        if blocked_handlers is not None:
+            blocked_handlers = _forget_blocked (blocked_handlers, handler)
+            if blocked_handlers is not _EMPTY_TUPLE:
+                all_blocked_handlers[self.__name] = blocked_handlers
+            else:
+                del all_blocked_handlers[self.__name]
+
+
+    def _wrap_handler (self, handler, *arguments, **keywords):
+        return WeakBinding.wrap (handler,
+                                 arguments,
+                                 _create_factory_callback (self.__factory, self.__name),
+                                 keywords)
+
+
+    def block (self, handler, *arguments, **keywords):
+        if not is_callable (handler):
+            return False
+
+        if arguments or keywords:
+            handler = Binding (handler, arguments, keywords)
+
+        handlers = self.__factory._SignalFactory__handlers.get (self.__name)
+        if handlers is None or handler not in handlers:
+            return False
+
+        factory              = self.__factory
+        all_blocked_handlers = factory._SignalFactory__blocked_handlers
+        blocked_handlers     = all_blocked_handlers.get (self.__name)
+
+        if blocked_handlers is None:
+            if all_blocked_handlers is _NO_FACTORY_STATE:
+                all_blocked_handlers = factory._SignalFactory__blocked_handlers = {}
+
+            blocked_handlers = all_blocked_handlers[self.__name] = {}
+
+        try:
+            blocked_handlers[handler] = blocked_handlers.get (handler, 0) + 1
+        except TypeError:
+            blocked_handlers.setdefault (_UNHASHABLE_BLOCKED, []).append (handler)
+
+        return True
+
+
+    def unblock (self, handler, *arguments, **keywords):
+        all_blocked_handlers = self.__factory._SignalFactory__blocked_handlers
+        blocked_handlers     = all_blocked_handlers.get (self.__name)
+
+        if blocked_handlers is None or not is_callable (handler):
+            return False
+
+        if arguments or keywords:
+            handler = Binding (handler, arguments, keywords)
+
+        try:
+            num_blocks = blocked_handlers.get (handler, 0)
+        except TypeError:
+            unhashable_handlers = blocked_handlers.get (_UNHASHABLE_BLOCKED, _EMPTY_TUPLE)
+            if handler not in unhashable_handlers:
+                return False
+
+            unhashable_handlers.remove (handler)
+            if not unhashable_handlers:
+                del blocked_handlers[_UNHASHABLE_BLOCKED]
+        else:
+            if num_blocks == 0:
+                return False
+
+            if num_blocks > 1:
+                blocked_handlers[handler] = num_blocks - 1
+            else:
+                del blocked_handlers[handler]
+
+        if not blocked_handlers:
+            del all_blocked_handlers[self.__name]
+
+        return True
+
+
+    def emit (self, *arguments, **keywords):
+        # NOTE: This is `SnapshotSignal.emit' with state looked up in the factory.
+
+        factory     = self.__factory
+        name        = self.__name
+        handlers    = factory._SignalFactory__handlers.get (name)
+        accumulator = factory._SignalFactory__accumulators
+
+        if accumulator is not None:
+            accumulator = accumulator.get (name)
+            if accumulator is not None:
+                value = accumulator.get_initial_value ()
+
+        if handlers is not None:
+            all_blocked_handlers  = factory._SignalFactory__blocked_handlers
+            emission_levels       = factory._SignalFactory__emission_levels
+
+            if emission_levels is _NO_FACTORY_STATE:
+                emission_levels = factory._SignalFactory__emission_levels = {}
+
+            saved_emission_level  = emission_levels.get (name, 0)
+            emission_levels[name] = abs (saved_emission_level) + 1
+
+            try:
+                for handler in handlers:
+                    if emission_levels[name] < 0:
+                        break
+
+                    if all_blocked_handlers:
+                        blocked_handlers = all_blocked_handlers.get (name)
+                        if blocked_handlers and _is_blocked (blocked_handlers, handler):
+                            continue
+
+                    if not handler and isinstance (handler, WeakBinding):
+                        continue
+
+                    if accumulator is None:
+                        try:
+                            handler (*arguments, **keywords)
+                        except:
+                            _report_handler_exception (self, sys.exc_info () [1], handler)
+                    else:
+                        try:
+                            handler_value = handler (*arguments, **keywords)
+                        except:
+                            _report_handler_exception (self, sys.exc_info () [1], handler)
+                        else:
+                            value = accumulator.accumulate_value (value, handler_value)
+                            if not accumulator.should_continue (value):
+                                break
+            finally:
+                if saved_emission_level == 0:
+                    del emission_levels[name]
+                else:
+                    emission_levels[name] = saved_emission_level
+
+        if accumulator is None:
+            return None
+        else:
+            return accumulator.post_process_value (value)
+
+
+    def emit_many (self, argument_sets):
+        emit = self.emit
+        return [emit (*arguments) for arguments in argument_sets]
+
+
+    def _get_emission_level (self):
+        return abs (self.__factory._SignalFactory__emission_levels.get (self.__name, 0))
+
+    def _is_emission_stopped (self):
+        return self.__factory._SignalFactory__emission_levels.get (self.__name, 0) < 0
+
+    def stop_emission (self):
+        emission_levels = self.__factory._SignalFactory__emission_levels
+        emission_level  = emission_levels.get (self.__name, 0)
+
+        if emission_level > 0:
+            emission_levels[self.__name] = -emission_level
+            return True
+        else:
+            return False
+
+
+    def collect_garbage (self):
+        handlers = self.__factory._SignalFactory__handlers.get (self.__name)
+
+        if handlers is not None:
+            self.__set_handlers (tuple ([handler for handler in handlers
+                                         if not isinstance (handler, WeakBinding) or handler]))
+
+
+    def _additional_description (self, formatter):
+        return (['name: %s' % (self.__name,)]
+                + super (_FactorySignal, self)._additional_description (formatter))
+
+
+# Handlers are stored in the factory, so their callback must not refer to it strongly.
+# Else each factory with a method handler would be part of a reference cycle.
+def _create_factory_callback (factory, name):
+    # See `notify.bind._create_reference_callback' for why globals are looked up now.
+    factory_reference = weakref.ref (factory)
+    signal_class      = _FactorySignal
+
+    def handler_garbage_collected (object):
+        factory = factory_reference ()
+        if factory is not None:
+            signal_class (factory, name).collect_garbage ()
+
+    return handler_garbage_collected
+
+
+
+#-- Topic signals ----------------------------------------------------
+
+# Implementation note: subscription patterns are kept in a trie keyed by topic segments.
+# Each `_TopicNode' holds children by segment (including wildcards `*' and `#') and a
+# `Signal' for handlers of the pattern ending at the node, if there are any.  Emission
+# only walks the branches that can match the topic, so its cost depends on the number of
+# topic segments and matching patterns, not on the total number of subscriptions.
+
+class TopicSignal (object):
+
+    """
+    Hierarchical topic bus.  Handlers subscribe to I{patterns}, while emission is done for
+    concrete I{topics}.  Both consist of segments separated by dots (or another separator
+    specified on creation), e.g. C{'order.42.filled'}.  A pattern may contain wildcards in
+    place of whole segments: C{'*'} matches exactly one segment and C{'#'} matches any
+    number of segments, including zero:
+
+        >>> orders = TopicSignal ()
+        ... orders.connect ('order.*.filled', on_filled)
+        ... orders.connect ('order.#',        log_order_event)
+        ... orders.emit ('order.42.filled', quantity)
+
+    Here both handlers are called with C{'order.42.filled', quantity} arguments: handlers
+    always receive the emitted topic first, followed by the rest of emission arguments.
+
+    Handlers of each pattern are stored in a usual C{L{Signal}}, available as
+    C{topic_signal[pattern]}; it can be used to block handlers, for instance.  When
+    several patterns match a topic, their signals are emitted in a fixed order that
+    doesn't depend on order of connection: segment by segment, patterns with the literal
+    segment come first, then those with C{'*'} and finally those with C{'#'}; and of the
+    latter, those where C{'#'} matches more segments go first.  Within one pattern,
+    handlers are called in connection order, as usual.  Each pattern's handlers are called
+    only once, even if the pattern can match the topic in several ways.
+
+    Emitting a topic doesn't test it against every subscription: patterns are indexed by
+    their segments, and only those that can match are visited.
+    """
+
+    __slots__ = ('__separator', '__root', '__emission_level', '__current_signal')
+
+
+    def __init__(self, separator = '.'):
+        """
+        Create a new topic signal without subscriptions.
+
+        @param separator:   string that separates segments in topics and patterns.
+        @type  separator:   C{str}
+
+        @raises ValueError: if C{separator} is empty.
+        """
+
+        super (TopicSignal, self).__init__()
+
+        if not separator:
+            raise ValueError ('separator must be a non-empty string')
+
+        self.__separator      = separator
+        self.__root           = _TopicNode ()
+        self.__emission_level = 0
+        self.__current_signal = None
+
+
+    separator = property (lambda self: self.__separator,
+                          doc = ("""
+                          String that separates segments in topics and patterns.
+
+                          @type: str
+                          """))
+
+
+    def __getitem__(self, pattern):
+        """
+        Return the signal that holds handlers for C{pattern}, creating it if needed.  It
+        can be used as any other signal, and is emitted by this topic signal whenever
+        C{pattern} matches emitted topic.
+
+        Note that signals of patterns without handlers are forgotten by C{L{disconnect}},
+        C{L{disconnect_all}} and C{L{collect_garbage}}.  Don't store the returned signal
+        to connect handlers to it later: index the topic signal anew instead.
+
+        @rtype: C{L{Signal}}
+        """
+
+        node = self.__root
+        for segment in self.__split (pattern):
+            child = node.children.get (segment)
+            if child is None:
+                child = node.children[segment] = _TopicNode ()
+
+            node = child
+
+        if node.signal is None:
+            node.signal = Signal ()
+
+        return node.signal
+
+
+    def connect (self, pattern, handler, *arguments, **keywords):
+        """
+        Connect C{handler} to topics matching C{pattern}.  This is the same as
+        C{topic_signal[pattern].connect (handler, *arguments, **keywords)}.
+
+        @raises TypeError:  if C{handler} is not callable.
+        @raises ValueError: if C{pattern} has an empty segment.
+        """
+
+        signal  = self[pattern]
+        handler = signal._wrap_handler (handler, *arguments, **keywords)
+        signal.do_connect (handler)
+
+        # Recorded on the topic signal, so that `disconnect_object' prunes the pattern.
+        if _object_connections:
+            _register_connection (self, handler, (pattern, handler))
+
+    def connect_safe (self, pattern, handler, *arguments, **keywords):
+        """
+        Like C{L{connect}}, but do nothing if C{handler} is already connected to
+        C{pattern}.
+
+        @rtype:   bool
+        @returns: whether C{handler} has been connected.
+        """
+
+        if not self.is_connected (pattern, handler, *arguments, **keywords):
+            self.connect (pattern, handler, *arguments, **keywords)
+            return True
+        else:
+            return False
+
+
+    def disconnect (self, pattern, handler, *arguments, **keywords):
+        """
+        Disconnect C{handler} from C{pattern}.  As with C{L{AbstractSignal.disconnect}},
+        only one of several equal handlers is disconnected.
+
+        @rtype:   bool
+        @returns: whether C{handler} has been disconnected.
+        """
+
+        signal = self.__find_signal (pattern)
+        if signal is None:
+            return False
+
+        disconnected = signal.disconnect (handler, *arguments, **keywords)
+        if disconnected:
+            self.__prune_pattern (pattern)
+
+        return disconnected
+
+    def disconnect_all (self, pattern, handler, *arguments, **keywords):
+        """
+        Disconnect all handlers equal to C{handler} from C{pattern}.
+
+        @rtype:   bool
+        @returns: whether any handler has been disconnected.
+        """
+
+        signal = self.__find_signal (pattern)
+        if signal is None:
+            return False
+
+        disconnected = signal.disconnect_all (handler, *arguments, **keywords)
+        if disconnected:
+            self.__prune_pattern (pattern)
+
+        return disconnected
+
+
+    def is_connected (self, pattern, handler, *arguments, **keywords):
+        """
+        Determine if C{handler} is connected to C{pattern}.
+
+        @rtype: bool
+        """
+
+        signal = self.__find_signal (pattern)
+        return signal is not None and signal.is_connected (handler, *arguments, **keywords)
+
+
+    def has_handlers (self):
+        """
+        Determine if there are handlers connected to any pattern.
+
+        @rtype: bool
+        """
+
+        for signal in self.__iterate_signals (self.__root):
+            if signal.has_handlers ():
+                return True
+
+        return False
+
+
+    def patterns (self):
+        """
+        Return a list of patterns that have handlers connected, in no particular order.
+
+        @rtype: list
+        """
+
+        patterns = []
+        self.__collect_patterns (self.__root, [], patterns)
+
+        return patterns
+
+
+    def emit (self, topic, *arguments, **keywords):
+        """
+        Emit C{topic}, i.e. emit signals of all patterns matching it, passing C{topic}
+        followed by C{arguments} and C{keywords} to handlers.
+
+        @param topic:       concrete topic, i.e. one without wildcards.
+        @type  topic:       C{str}
+
+        @raises ValueError: if C{topic} has an empty segment or contains a wildcard.
+        """
+
+        segments = self.__split (topic)
+        for segment in segments:
+            if segment == '*' or segment == '#':
+                raise ValueError ("topic '%s' contains a wildcard" % (topic,))
+
+        signals = []
+        _match_topic (self.__root, segments, 0, signals, {})
+
+        if not signals:
+            return
+
+        saved_emission_level  = self.__emission_level
+        saved_current_signal  = self.__current_signal
+        self.__emission_level = abs (saved_emission_level) + 1
+
+        try:
+            for signal in signals:
+                self.__current_signal = signal
+                signal.emit (topic, *arguments, **keywords)
+
+                if self.__emission_level < 0:
+                    break
+
+        finally:
+            self.__emission_level = saved_emission_level
+            self.__current_signal = saved_current_signal
+
+
+    __call__ = emit
+
+
+    emission_level = property (lambda self: abs (self.__emission_level),
+                               doc = ("""
+                               Number of times C{L{emit}} is currently being called
+                               recursively.  It is zero if the topic signal is not being
+                               emitted.
+
+                               @type: int
+                               """))
+
+    def stop_emission (self):
+        """
+        Stop the current emission, i.e. don't call any more handlers of any pattern.
+
+        @rtype:   bool
+        @returns: whether emission has been stopped, i.e. whether the topic signal was
+                  being emitted.
+        """
+
+        if self.__emission_level > 0:
+            self.__emission_level = -self.__emission_level
+            self.__current_signal.stop_emission ()
+            return True
+        else:
+            return False
+
+    emission_stopped = property (lambda self: self.__emission_level < 0,
+                                 doc = ("""
+                                 Whether emission has been stopped with
+                                 C{L{stop_emission}}.
+
+                                 @type: bool
+                                 """))
+
+
+    def collect_garbage (self):
+        """
+        Remove garbage-collected handlers of all patterns and forget signals of patterns
+        that have no handlers left.  Disconnecting through C{L{disconnect}} and
+        C{L{disconnect_all}} forgets the signal automatically, but this might be useful
+        if handlers were disconnected from signals directly or if C{L{__getitem__}} was
+        used for patterns which never got handlers.
+        """
+
+        for signal in self.__iterate_signals (self.__root):
+            signal.collect_garbage ()
+
+        self.__prune_tree (self.__root)
+
+
+    def __split (self, topic):
+        segments = topic.split (self.__separator)
+        for segment in segments:
+            if not segment:
+                raise ValueError ("'%s' has an empty segment" % (topic,))
+
+        return segments
+
+    def __find_signal (self, pattern):
+        node = self.__root
+        for segment in self.__split (pattern):
+            node = node.children.get (segment)
+            if node is None:
+                return None
+
+        return node.signal
+
+    def __iterate_signals (self, node):
+        if node.signal is not None:
+            yield node.signal
+
+        for child in node.children.values ():
+            for signal in self.__iterate_signals (child):
+                yield signal
+
+    def __collect_patterns (self, node, segments, patterns):
+        if node.signal is not None and node.signal.has_handlers ():
+            patterns.append (self.__separator.join (segments))
+
+        for segment, child in node.children.items ():
+            self.__collect_patterns (child, segments + [segment], patterns)
+
+    def __prune_pattern (self, pattern):
+        # Remove nodes on the path to `pattern' that have neither handlers nor children.
+        # Pruning is cheap enough here, as only one path is considered.
+        path = [(None, self.__root)]
+        for segment in self.__split (pattern):
+            path.append ((segment, path[-1][1].children[segment]))
+
+        while len (path) > 1:
+            segment, node = path.pop ()
+            if node.signal is not None and node.signal._handlers is None:
+                node.signal = None
+
+            if node.signal is not None or node.children:
+                break
+
+            del path[-1][1].children[segment]
+
+    def __prune_tree (self, node):
+        # Return true if `node' is empty after pruning its children.
+        children = node.children
+        if children:
+            for segment, child in list (children.items ()):
+                if self.__prune_tree (child):
+                    del children[segment]
+
+        if node.signal is not None and node.signal._handlers is None:
+            node.signal = None
+
+        return node.signal is None and not children
+
+
+    def __repr__(self):
+        return '<%s.%s at 0x%x: %s>' % (self.__module__, self.__class__.__name__,
+                                        id (self), ', '.join (self.patterns ()) or 'no patterns')
+
+
+
+class _TopicNode (object):
+
+    __slots__ = ('children', 'signal')
+
+    def __init__(self):
+        self.children = {}
+        self.signal   = None
+
+
+def _match_topic (node, segments, index, signals, seen):
+    # Append to `signals' those of patterns under `node' that match `segments' starting at
+    # `index'.  `seen' prevents adding the same signal twice, as patterns with `#' can
+    # match in several ways.
+    if index == len (segments):
+        if node.signal is not None and id (node.signal) not in seen:
+            seen[id (node.signal)] = True
+            signals.append (node.signal)
+    else:
+        child = node.children.get (segments[index])
+        if child is not None:
+            _match_topic (child, segments, index + 1, signals, seen)
+
+        child = node.children.get ('*')
+        if child is not None:
+            _match_topic (child, segments, index + 1, signals, seen)
+
+    # Try `#' matching as many segments as possible first.
+    child = node.children.get ('#')
+    if child is not None:
+        for next_index in range (len (segments), index - 1, -1):
+            _match_topic (child, segments, next_index, signals, seen)
+
+
+
+#-- Queued delivery --------------------------------------------------
+
+class DeliveryQueue (object):
+
+    """
+    Queue of handler calls, used for connections made with
+    C{L{AbstractSignal.connect_queued}}.  Emitting threads (I{producers}) put calls into
+    the queue and they are later delivered in a I{consumer} thread that calls
+    C{L{deliver}}, typically from its event loop.  Alternatively, an I{executor}, such as
+    C{concurrent.futures.ThreadPoolExecutor}, can be specified for the queue: then calls
+    are delivered automatically by a task submitted to it.  In any case, calls are
+    delivered in order, one at a time.
+
+    A queue can be bounded, i.e. created with a maximum number of pending calls.  What
+    happens if a new call is made when the queue is full depends on its C{L{policy}}:
+
+      - C{L{BLOCK}}: wait until a call is delivered and so there is space in the queue.
+        Note that this will deadlock if the producer is the thread delivering calls;
+
+      - C{L{DROP_OLDEST}}: forget the oldest pending call to make space for the new;
+
+      - C{L{COALESCE}}: if a call of the same handler (connection) is pending, replace
+        its arguments with the new ones, leaving the call where it is in the queue.  This
+        is done even if the queue is not full, so that handlers only see the latest
+        state.  If there is no such call, wait as with C{BLOCK}.
+    """
+
+    BLOCK       = 'block'
+    DROP_OLDEST = 'drop-oldest'
+    COALESCE    = 'coalesce'
+
+    __slots__ = ('__max_size', '__policy', '__executor', '__calls', '__condition',
+                 '__delivery_scheduled')
+
+
+    def __init__(self, max_size = 0, policy = BLOCK, executor = None):
+        """
+        Create a new empty C{DeliveryQueue}.
+
+        @param  max_size: maximum number of pending calls or 0 for unbounded queue.
+        @type   max_size: C{int}
+
+        @param  policy:   what to do when a call is made and the queue is full.
+        @type   policy:   C{L{BLOCK}}, C{L{DROP_OLDEST}} or C{L{COALESCE}}
+
+        @param  executor: optional object with C{submit} method, such as
+                          C{concurrent.futures.Executor}, which will be used to deliver
+                          calls.
+
+        @raises ValueError: if C{max_size} is negative or C{policy} is not valid.
+        """
+
+        if max_size < 0:
+            raise ValueError ("'max_size' must not be negative")
+        if policy not in (DeliveryQueue.BLOCK, DeliveryQueue.DROP_OLDEST,
+                          DeliveryQueue.COALESCE):
+            raise ValueError ("unknown coalescing policy '%s'" % (policy,))
+
+        super (DeliveryQueue, self).__init__()
+
+        self.__max_size           = max_size
+        self.__policy             = policy
+        self.__executor           = executor
+        self.__calls              = []
+        self.__condition          = threading.Condition ()
+        self.__delivery_scheduled = False
+
+
+    max_size = property (lambda self: self.__max_size,
+                         doc = ("""
+                         Maximum number of pending calls or 0 if the queue is unbounded.
+
+                         @type: int
+                         """))
+
+    policy   = property (lambda self: self.__policy,
+                         doc = ("""
+                         What the queue does when a call is made while it is full, one of
+                         C{L{BLOCK}}, C{L{DROP_OLDEST}} and C{L{COALESCE}}.
+
+                         @type: str
+                         """))
+
+
+    def __len__(self):
+        return len (self.__calls)
+
+
+    def _put (self, binding, arguments, keywords):
+        # Each call is a list `[binding, arguments, keywords]', so that coalescing can
+        # replace its arguments in place.
+
+        condition = self.__condition
+        condition.acquire ()
+
+        try:
+            calls = self.__calls
+
+            if self.__policy == DeliveryQueue.COALESCE:
+                for call in calls:
+                    if call[0] is binding:
+                        call[1] = arguments
+                        call[2] = keywords
+                        return
+
+            if self.__max_size:
+                if self.__policy == DeliveryQueue.DROP_OLDEST:
+                    if len (calls) >= self.__max_size:
+                        del calls[0]
+                else:
+                    while len (calls) >= self.__max_size:
+                        condition.wait ()
+
+            calls.append ([binding, arguments, keywords])
+
+            schedule_delivery = (self.__executor is not None and not self.__delivery_scheduled)
+            if schedule_delivery:
+                self.__delivery_scheduled = True
+
+        finally:
+            condition.release ()
+
+        if schedule_delivery:
+            self.__executor.submit (self.__deliver_scheduled)
+
+
+    def deliver (self, max_calls = None):
+        """
+        Deliver pending calls, in order in which they were made, but at most C{max_calls}
+        if that is not C{None}.  Calls made while delivering are delivered too, unless the
+        limit is reached.  This method should be called from consumer thread.  Exceptions
+        raised by handlers are passed to C{L{AbstractSignal.exception_handler}}.
+
+        @rtype:   C{int}
+        @returns: Number of delivered calls.
+        """
+
+        num_delivered = 0
+
+        while max_calls is None or num_delivered < max_calls:
+            if not self.__deliver_one ():
+                break
+
+            num_delivered += 1
+
+        return num_delivered
+
+
+    def __deliver_scheduled (self):
+        # Delivery is scheduled at most once at a time, so that calls are still delivered
+        # in order and only one at a time, even if executor has several threads.
+        while self.__deliver_one (True):
+            pass
+
+
+    def __deliver_one (self, scheduled = False):
+        condition = self.__condition
+        condition.acquire ()
+
+        try:
+            if not self.__calls:
+                if scheduled:
+                    self.__delivery_scheduled = False
+
+                return False
+
+            binding, arguments, keywords = self.__calls.pop (0)
+
+            # Wake up a producer blocked on the full queue, if any.
+            condition.notify ()
+
+        finally:
+            condition.release ()
+
+        binding._deliver (arguments, keywords)
+        return True
+
+
+
+class _QueuedBinding (WeakBinding):
+
+    # A handler connected with `AbstractSignal.connect_queued'.  Since it is a weak
+    # binding, wrapping the handler and its arguments, it compares equal to the same
+    # handler connected normally and its death is detected by signals as usual.
+
+    __slots__ = ('__signal', '__queue')
+
+
+    def __init__(self, signal, queue, callable_object, arguments, keywords):
+        super (_QueuedBinding, self).__init__(callable_object, arguments,
+                                              self.__object_garbage_collected, keywords)
+
+        self.__signal = signal
+        self.__queue  = queue
+
+
+    def __call__(self, *arguments, **keywords):
+        self.__queue._put (self, arguments, keywords)
+
+
+    def _deliver (self, arguments, keywords):
+        try:
+            WeakBinding.__call__(self, *arguments, **keywords)
+        except:
+            _report_handler_exception (self.__signal, sys.exc_info () [1], self)
+
+
+    def __object_garbage_collected (self, reference):
+        self.__signal.collect_garbage ()
+
+
+
+#-- Internal variables -----------------------------------------------
+
+# It is not guaranteed to be a singleton, although it probably always is.
+_EMPTY_TUPLE = ()
+
+# Ways `Signal.emit' accumulates handler values.  Standard accumulators are recognized
+# by exact type, since subclasses might override any method.
+_GENERIC_ACCUMULATION     = 0
+_ANY_ACCEPTS_ACCUMULATION = 1
+_ALL_ACCEPT_ACCUMULATION  = 2
+_LAST_VALUE_ACCUMULATION  = 3
+_VALUE_LIST_ACCUMULATION  = 4
+
+_ACCUMULATIONS = { AbstractSignal.AnyAcceptsAccumulator: _ANY_ACCEPTS_ACCUMULATION,
+                   AbstractSignal.AllAcceptAccumulator:  _ALL_ACCEPT_ACCUMULATION,
+                   AbstractSignal.LastValueAccumulator:  _LAST_VALUE_ACCUMULATION,
+                   AbstractSignal.ValueListAccumulator:  _VALUE_LIST_ACCUMULATION }
+
+_INITIAL_VALUES = { _ANY_ACCEPTS_ACCUMULATION: False,
+                    _ALL_ACCEPT_ACCUMULATION:  True,
+                    _LAST_VALUE_ACCUMULATION:  None }
+
+# Code `CompilingSignal' generates after each successful handler call.
+_COMPILED_ACCUMULATIONS = {
+    _GENERIC_ACCUMULATION:     ('                value = accumulate_value (value, handler_value)\n'
+                                '                if not should_continue (value): break'),
+    _ANY_ACCEPTS_ACCUMULATION: ('                value = handler_value\n'
+                                '                if value: break'),
+    _ALL_ACCEPT_ACCUMULATION:  ('                value = handler_value\n'
+                                '                if not value: break'),
+    _LAST_VALUE_ACCUMULATION:   '                value = handler_value',
+    _VALUE_LIST_ACCUMULATION:   '                value.append (handler_value)' }
+
+# Key in `Signal._blocked_handlers' under which unhashable blocked handlers are listed.
+_UNHASHABLE_BLOCKED = object ()
+
+# Never modified: stands for an empty dictionary in `SignalFactory' until it is needed.
+_NO_FACTORY_STATE  = {}
+
+# Factories restricted to the same names share one set of them, for as long as any is
+# alive.
+_factory_name_sets = weakref.WeakValueDictionary ()
+
+# Minimal number of handlers for which `Signal._handler_index' is maintained.
+_HANDLER_INDEX_THRESHOLD = 32
+
+# `CompilingSignal' compiles its dispatcher after this many emissions with unchanged
+# handler list, but only if there are not too many handlers.
+_COMPILATION_THRESHOLD   = 10
+_MAX_COMPILED_HANDLERS   = 100
+
+_breadth_first_queues = {}
+
+# Processed entries are removed from a breadth-first emission queue once there are this
+# many of them.
+_BREADTH_FIRST_COMPACTION_THRESHOLD = 1024
+
+
+class _HandlerIndex (dict):
+
+    __slots__ = ('num_handlers',)
+
+    def __init__(self):
+        self.num_handlers = 0
+
+
+
+#-- Internal functions -----------------------------------------------
+
+def _is_blocked (blocked_handlers, handler):
+    try:
+        return handler in blocked_handlers
+    except TypeError:
+        # Either an unhashable handler or a weak binding, garbage-collected before it
+        # got a chance to compute its hash.
+        return handler in blocked_handlers.get (_UNHASHABLE_BLOCKED, _EMPTY_TUPLE)
+
+
+def _add_block (blocked_handlers, handler):
+    try:
+        blocked_handlers[handler] = blocked_handlers.get (handler, 0) + 1
+    except TypeError:
+        blocked_handlers.setdefault (_UNHASHABLE_BLOCKED, []).append (handler)
+
+
+def _remove_block (blocked_handlers, handler):
+    # Return false if `handler' is not blocked to begin with.
+    try:
+        num_blocks = blocked_handlers.get (handler, 0)
+    except TypeError:
+        unhashable_handlers = blocked_handlers.get (_UNHASHABLE_BLOCKED, _EMPTY_TUPLE)
+        if handler not in unhashable_handlers:
+            return False
+
+        unhashable_handlers.remove (handler)
+        if not unhashable_handlers:
+            del blocked_handlers[_UNHASHABLE_BLOCKED]
+    else:
+        if num_blocks == 0:
+            return False
+
+        if num_blocks > 1:
+            blocked_handlers[handler] = num_blocks - 1
+        else:
+            del blocked_handlers[handler]
+
+    return True
+
+
+def _copy_blocked (blocked_handlers):
+    # Return a copy of `Signal._blocked_handlers' (possibly `_EMPTY_TUPLE') that can be
+    # modified without affecting the original.
+    blocked_handlers    = dict (blocked_handlers)
+    unhashable_handlers = blocked_handlers.get (_UNHASHABLE_BLOCKED)
+
+    if unhashable_handlers is not None:
+        blocked_handlers[_UNHASHABLE_BLOCKED] = list (unhashable_handlers)
+
+    return blocked_handlers
+
+
+def _forget_blocked (blocked_handlers, handler):
+    # Completely unblock `handler' and return new value for `Signal._blocked_handlers'.
+    # The old value is not modified, see `ThreadSafeSignal.block'.
+    blocked_handlers = _copy_blocked (blocked_handlers)
+
+    try:
+        if handler in blocked_handlers:
+            del blocked_handlers[handler]
+    except TypeError:
+        unhashable_handlers = blocked_handlers.get (_UNHASHABLE_BLOCKED)
+        if unhashable_handlers is not None:
+            unhashable_handlers[:] = [_handler for _handler in unhashable_handlers
+                                      if _handler != handler]
+            if not unhashable_handlers:
+                del blocked_handlers[_UNHASHABLE_BLOCKED]
+
+    return blocked_handlers or _EMPTY_TUPLE
+
+
+def _cancel_futures (futures):
+    for handler, future in futures:
+        future.cancel ()
+
+
+def _as_handler_sequence (handlers):
+    # Return `Signal._handlers' as a sequence, whatever form it is in.
+    if handlers is None:
+        return _EMPTY_TUPLE
+    elif type (handlers) is list or type (handlers) is tuple:
+        return handlers
+    else:
+        return (handlers,)
+
+
+def _iterate_from_lone_handler (signal, handler):
+    # Iterate over lone `handler' and then over any handlers connected while it was being
+    # called.  See implementation notes in `Signal' for why this works.
+    yield handler
+
+    handlers = signal._handlers
+    if type (handlers) is list:
+        for handler in islice (handlers, 1, None):
+            yield handler
+
+
+def _get_current_task ():
+    # Outside of a running event loop there is no task, all such code shares key `None'.
+    try:
+        return _current_task ()
+    except RuntimeError:
+        return None
+
+
+
+#-- Collecting handler exceptions ------------------------------------
+
+# Implementation note: standard signals pass exceptions raised by handlers to
+# `_report_handler_exception', never to `AbstractSignal.exception_handler' directly.
+# Collections in progress are stacked per thread in `_exception_collections'; exceptions
+# that are not to be collected are passed on to `AbstractSignal.exception_handler'.
+
+class HandlerExceptions (Exception):
+
+    """
+    Exception raised by C{L{AbstractSignal.emit_collecting_exceptions}} when any signal
+    handler raises an exception.
+
+    @ivar signal:   the emitted signal.
+    @ivar failures: list of tuples of handler, exception it raised and traceback, in order
+                    the exceptions occured.
+    """
+
+    def __init__(self, signal, failures):
+        Exception.__init__(self,
+                           '%d signal handler(s) raised exceptions: %s'
+                           % (len (failures),
+                              '; '.join (['%s: %s' % (exception.__class__.__name__, exception)
+                                          for handler, exception, traceback in failures])))
+
+        self.signal   = signal
+        self.failures = failures
+
+
+
+def _start_collecting_exceptions (signal, failures):
+    _exception_collection_lock.acquire ()
+    try:
+        _exception_collections.setdefault (_get_thread_id (), []).append ((signal, failures))
+    finally:
+        _exception_collection_lock.release ()
+
+def _stop_collecting_exceptions ():
+    _exception_collection_lock.acquire ()
+    try:
+        thread      = _get_thread_id ()
+        collections = _exception_collections[thread]
+
+        del collections[-1]
+        if not collections:
+            del _exception_collections[thread]
+    finally:
+        _exception_collection_lock.release ()
+
+
+def _report_handler_exception (signal, exception, handler):
+    # Only the current thread ever changes its own stack of collections, so no locking is
+    # needed to read it.
+    if _exception_collections:
+        collections = _exception_collections.get (_get_thread_id ())
+
+        if (collections
+            and isinstance (exception, Exception)
+            and not isinstance (exception, (SystemExit, KeyboardInterrupt))):
+            index = len (collections) - 1
+            while index >= 0:
+                if collections[index][0] is signal:
+                    collections[index][1].append ((handler, exception, sys.exc_info () [2]))
+                    return None
+
+                index -= 1
+
+    # Looked up each time, since it can be reassigned any moment.
+    return AbstractSignal.exception_handler (signal, exception, handler)
+
+
+_exception_collections     = {}
+_exception_collection_lock = threading.Lock ()
+
+
+
+#-- Native emission --------------------------------------------------
+
+# The extension is optional.  If it is not available (not built, or not CPython at all),
+# pure Python `Signal.emit' defined above is used.  The Python implementation is kept
+# around anyway for comparison in benchmarks.
+
+_python_emit      = Signal.__dict__['emit']
+_python_emit_many = Signal.__dict__['emit_many']
+
+try:
+    from notify import _signal
+except ImportError:
+    _signal = None
+
+if _signal is not None:
+    Signal.emit         = _signal.emit
+    Signal.emit_many    = _signal.emit_many
+    SnapshotSignal.emit = _signal.emit
+    HAVE_FAST_EMISSION  = True
+else:
+    HAVE_FAST_EMISSION = False
+
+del _signal
+
+
+
+#-- Profiling --------------------------------------------------------
+
+class HandlerProfile (object):
+
+    """
+    Statistics of a signal handler, gathered while the signal is profiled.  See
+    C{L{Signal.enable_profiling}}.  All times are in seconds.
+
+    @ivar handler:        the profiled handler.
+    @ivar num_calls:      number of times the handler has been called.
+    @ivar num_exceptions: number of times the handler has raised an exception.
+    @ivar total_time:     total time spent in the handler.
+    @ivar max_time:       maximum time a single handler call has taken.
+    """
+
+    __slots__ = ('handler', 'num_calls', 'num_exceptions', 'total_time', 'max_time', '_order')
+
+
+    def __init__(self, handler, order):
+        self.handler        = handler
+        self.num_calls      = 0
+        self.num_exceptions = 0
+        self.total_time     = 0.0
+        self.max_time       = 0.0
+        self._order         = order
+
+
+    def _add_call (self, elapsed_time, raised):
+        self.num_calls  += 1
+        self.total_time += elapsed_time
+
+        if elapsed_time > self.max_time:
+            self.max_time = elapsed_time
+
+        if raised:
+            self.num_exceptions += 1
+
+
+    def __repr__(self):
+        return ('<%s.%s for %r: %d calls, %d exceptions, %.6f s total, %.6f s max>'
+                % (self.__module__, self.__class__.__name__, self.handler,
+                   self.num_calls, self.num_exceptions, self.total_time, self.max_time))
+
+
+
+def enable_profiling ():
+    """
+    Start profiling handlers of all signals.  Statistics for each signal are available
+    through its C{L{profile_stats <Signal.profile_stats>}} method; see also
+    C{L{Signal.enable_profiling}}.  While profiling is enabled, all emitted signals are
+    referenced from the statistics until C{L{Signal.clear_profile_stats}} is called.
+
+    This replaces emission methods of C{Signal} and standard subclasses, so while
+    profiling is enabled, all signals are emitted in Python.  Signals of classes with
+    their own emission loop, such as C{L{ThreadSafeSignal}}, C{L{ParallelSignal}} and
+    C{L{AsyncSignal}}, are not profiled.
+    """
+
+    global _profiling_all_signals
+
+    _profiling_all_signals = True
+    _update_emission_methods ()
+
+def disable_profiling ():
+    """
+    Stop profiling handlers of all signals, as started with C{L{enable_profiling}}.  This
+    doesn’t affect signals for which profiling has been enabled individually.
+    """
+
+    global _profiling_all_signals
+
+    _profiling_all_signals = False
+    _update_emission_methods ()
+
+
+def _update_emission_methods ():
+    # Install emission methods that profile all signals and/or record emissions, or
+    # reinstall original ones if neither is needed.  Emissions in progress in other threads
+    # finish with the methods they started with.
+    _instrumentation_lock.acquire ()
+    try:
+        instrumented = _profiling_all_signals or _tracing
+
+        if instrumented == (Signal in _original_emission_methods):
+            return
+
+        for _class, name, profiling_method in _INSTRUMENTED_EMISSION_METHODS:
+            if instrumented:
+                original_method = _class.__dict__[name]
+                _original_emission_methods.setdefault (_class, {}) [name] = original_method
+
+                if name == 'emit':
+                    dispatch = _create_dispatching_method (_class, original_method,
+                                                           profiling_method)
+                else:
+                    dispatch = _create_batch_dispatching_method (_class, original_method)
+
+                setattr (_class, name, dispatch)
+            else:
+                setattr (_class, name, _original_emission_methods[_class][name])
+
+        if not instrumented:
+            _original_emission_methods.clear ()
+            _traced_classes.clear ()
+
+    finally:
+        _instrumentation_lock.release ()
+
+
+def _create_dispatching_method (_class, original_method, profiling_method):
+    def dispatch (self, *arguments, **keywords):
+        if _tracing and _get_traced_class (self.__class__) is _class:
+            _trace.record (self, arguments, keywords)
+
+        if profiling_method is not None and _profiling_all_signals:
+            return profiling_method (self, *arguments, **keywords)
+        else:
+            return original_method (self, *arguments, **keywords)
+
+    return dispatch
+
+def _create_batch_dispatching_method (_class, original_method):
+    # When instrumented, emit the signal once per argument set, so that each emission is
+    # profiled and recorded.  Use `emit' of the same class, as subclasses may redefine it
+    # to do something else (e.g. `DeferredSignal'.)
+    def dispatch_many (self, argument_sets):
+        if _tracing or _profiling_all_signals:
+            emit = _class.__dict__['emit']
+            return [emit (self, *arguments) for arguments in argument_sets]
+        else:
+            return original_method (self, argument_sets)
+
+    return dispatch_many
+
+
+def _get_traced_class (_class):
+    # Emission methods may call instrumented methods of superclasses (e.g. `CompilingSignal'
+    # does), so record an emission only in the method of the most derived class.
+    traced_class = _traced_classes.get (_class)
+
+    if traced_class is None:
+        for traced_class in _class.__mro__:
+            if traced_class in _original_emission_methods:
+                break
+
+        _traced_classes[_class] = traced_class
+
+    return traced_class
+
+
+def _profiling_emit (self, *arguments, **keywords):
+    # This is the pure Python `Signal.emit', with handler calls timed.  It works for all
+    # standard signal classes, be their handlers stored in a list, a tuple or inline.
+
+    handlers    = self._handlers
+    accumulator = self._Signal__accumulator
+
+    if accumulator is not None:
+        value = accumulator.get_initial_value ()
+
+    if handlers is not None:
+        profiles = _profiles.get (self)
+        if profiles is None:
+            profiles = _profiles[self] = {}
+
+        lone_handler = (type (handlers) is not list and type (handlers) is not tuple)
+        if lone_handler:
+            handlers = _iterate_from_lone_handler (self, handlers)
+
+        saved_emission_level         = self._Signal__emission_level
+        self._Signal__emission_level = abs (saved_emission_level) + 1
+        might_have_garbage           = False
+
+        try:
+            for handler in handlers:
+                if handler is None:
+                    might_have_garbage = True
+                    continue
+
+                if self._Signal__emission_level < 0:
+                    might_have_garbage = True
+                    break
+
+                blocked_handlers = self._blocked_handlers
+                if blocked_handlers and _is_blocked (blocked_handlers, handler):
+                    continue
+
+                if not handler and isinstance (handler, WeakBinding):
+                    might_have_garbage = True
+                    continue
+
+                # Profiles are keyed by identity, so that even unhashable handlers can be
+                # profiled.  Since the profile references the handler, the key is unique.
+                profile = profiles.get (id (handler))
+                if profile is None:
+                    profile = profiles[id (handler)] = HandlerProfile (handler, len (profiles))
+
+                start_time = _timer ()
+
+                try:
+                    handler_value = handler (*arguments, **keywords)
+                except:
+                    profile._add_call (_timer () - start_time, True)
+                    _report_handler_exception (self, sys.exc_info () [1], handler)
+                else:
+                    profile._add_call (_timer () - start_time, False)
+
+                    if accumulator is not None:
+                        value = accumulator.accumulate_value (value, handler_value)
+                        if not accumulator.should_continue (value):
+                            might_have_garbage = True
+                            break
+        finally:
+            self._Signal__emission_level = saved_emission_level
+            if saved_emission_level == 0:
+                if might_have_garbage or (lone_handler and type (self._handlers) is list):
+                    self.collect_garbage ()
+
+    if accumulator is None:
+        return None
+    else:
+        return accumulator.post_process_value (value)
+
+
+class _ProfiledSignal (object):
+
+    # Mixed into classes created by `_get_profiled_class', before the signal class itself.
+    # A signal profiled individually has its class switched to such a class, so that it is
+    # the only one emitted through `_profiling_emit'.
+
+    __slots__ = ()
+
+
+    def emit (self, *arguments, **keywords):
+        if _tracing:
+            _trace.record (self, arguments, keywords)
+
+        return _profiling_emit (self, *arguments, **keywords)
+
+    def emit_many (self, argument_sets):
+        return [self.emit (*arguments) for arguments in argument_sets]
+
+
+def _get_profiled_class (cls):
+    profiled_class = _profiled_classes.get (cls)
+
+    if profiled_class is None:
+        for emitting_class in cls.__mro__:
+            if 'emit' in emitting_class.__dict__:
+                break
+
+        if emitting_class not in _PROFILABLE_EMITTING_CLASSES:
+            raise TypeError ("cannot profile signals of class '%s', it has its own emission "
+                             "loop" % cls.__name__)
+
+        profiled_class = type (cls.__name__, (_ProfiledSignal, cls),
+                               { '__slots__': (), '__module__': cls.__module__ })
+        _profiled_classes[cls] = profiled_class
+
+    return profiled_class
+
+
+# Emission methods that are replaced while all signals are profiled or emissions are
+# traced, with profiling implementations, if any.  `DeferredSignal' is absent since it delivers
+# emissions through `Signal' methods.  Other `emit_many' implementations call `emit'.
+_INSTRUMENTED_EMISSION_METHODS = ((Signal,           'emit',      _profiling_emit),
+                                  (Signal,           'emit_many', None),
+                                  (SnapshotSignal,   'emit',      _profiling_emit),
+                                  (ThreadSafeSignal, 'emit',      None),
+                                  (ParallelSignal,   'emit',      None),
+                                  (CompilingSignal,  'emit',      _profiling_emit))
+
+# Classes, emission methods of which `_profiling_emit' can stand in for.
+_PROFILABLE_EMITTING_CLASSES = { Signal: True, SnapshotSignal: True, CompilingSignal: True }
+
+_original_emission_methods = {}
+_traced_classes            = {}
+_instrumentation_lock      = threading.Lock ()
+
+_profiling_all_signals     = False
+_profiled_classes          = {}
+_profiles                  = {}
+
+_timer                     = getattr (time, 'perf_counter', time.time)
+
+
+
+#-- Tracing ----------------------------------------------------------
+
+class EmissionRecord (object):
+
+    """
+    Record of one signal emission, as returned by C{L{get_trace}}.  Emission arguments are
+    stored as they are and formatted only when needed, e.g. by C{str()} of the record.
+    Therefore, if arguments are mutable objects changed after emission, you will see their
+    current state, not that at the moment of emission.
+
+    @ivar signal_id:      C{id()} of the emitted signal.  Signals are not referenced by
+                          records, so that tracing doesn't keep them alive.
+    @ivar signal_class:   class of the emitted signal.
+    @ivar emission_level: emission level of the signal during this emission, i.e. 1 for
+                          non-recursive emissions.
+    @ivar num_handlers:   number of handlers at the moment of emission; this may include
+                          handlers disconnected during an ongoing outer emission.
+    @ivar time:           value of C{time.perf_counter()} at the moment of emission, or
+                          of C{time.time()} on Python versions without the former.  Only
+                          differences between such values are meaningful.
+    @ivar arguments:      tuple of emission arguments.
+    @ivar keywords:       dictionary of emission keyword arguments.
+    """
+
+    __slots__ = ('signal_id', 'signal_class', 'emission_level', 'num_handlers', 'time',
+                 'arguments', 'keywords')
+
+
+    def __init__(self, signal_id, signal_class, emission_level, num_handlers, time,
+                 arguments, keywords):
+        self.signal_id      = signal_id
+        self.signal_class   = signal_class
+        self.emission_level = emission_level
+        self.num_handlers   = num_handlers
+        self.time           = time
+        self.arguments      = arguments
+        self.keywords       = keywords
+
+
+    def format_arguments (self, max_length = 80):
+        """
+        Format emission arguments as they would appear in a call.  Representation of each
+        argument is shortened to C{max_length} characters.  Arguments that fail to
+        produce a representation don't cause an exception.
+
+        @rtype: str
+        """
+
+        formatted = [_format_traced_value (argument, max_length) for argument in self.arguments]
+
+        keywords = list (self.keywords.items ())
+        keywords.sort ()
+        for name, value in keywords:
+            formatted.append ('%s=%s' % (name, _format_traced_value (value, max_length)))
+
+        return ', '.join (formatted)
+
+
+    def __str__(self):
+        return ('%.6f  %s.%s at 0x%x  level %d  %d handlers  (%s)'
+                % (self.time, self.signal_class.__module__, self.signal_class.__name__,
+                   self.signal_id, self.emission_level, self.num_handlers,
+                   self.format_arguments ()))
+
+    def __repr__(self):
+        return '<%s.%s: %s>' % (self.__module__, self.__class__.__name__, str (self))
+
+
+
+def enable_tracing (size = 1000):
+    """
+    Start recording emissions of all signals into a ring buffer, which keeps only C{size}
+    most recent records.  Recording takes little time and arguments are not formatted
+    until the trace is inspected with C{L{get_trace}} or C{L{dump_trace}}; still, while
+    tracing is enabled, emission of all signals is slower.  Emission arguments are
+    referenced from the buffer until they are pushed out of it by newer records or the
+    trace is cleared.
+
+    Emissions of C{L{Signal}}, C{L{CleanSignal}}, C{L{SnapshotSignal}},
+    C{L{PrioritySignal}}, C{L{ThreadSafeSignal}}, C{L{ParallelSignal}},
+    C{L{DeferredSignal}} (when it delivers) and C{L{CompilingSignal}} are recorded.
+    Emission methods of custom subclasses are not affected.  Note that while tracing,
+    C{L{emit_many <Signal.emit_many>}} emits signals once for each argument set, so each
+    emission gets its own record.
+
+    If tracing has been enabled before with a different buffer size, the buffer is
+    recreated and previous records are lost.
+
+    @raises ValueError: if C{size} is not positive.
+    """
+
+    global _trace, _tracing
+
+    if size <= 0:
+        raise ValueError ('trace buffer size must be positive')
+
+    if _trace is None or len (_trace.records) != size:
+        _trace = _TraceBuffer (size)
+
+    _tracing = True
+    _update_emission_methods ()
+
+def disable_tracing ():
+    """
+    Stop recording emissions, as started with C{L{enable_tracing}}.  Recorded emissions
+    are retained until C{L{clear_trace}} is called.
+    """
+
+    global _tracing
+
+    _tracing = False
+    _update_emission_methods ()
+
+
+def get_trace ():
+    """
+    Get recorded emissions, oldest first.
+
+    @rtype: list of C{L{EmissionRecord}}
+    """
+
+    if _trace is None:
+        return []
+
+    records  = _trace.records
+    position = _trace.position
+    size     = len (records)
+
+    if position > size:
+        records = records[position % size:] + records[:position % size]
+    else:
+        records = records[:position]
+
+    return [EmissionRecord (*record) for record in records]
+
+def clear_trace ():
+    """
+    Discard recorded emissions.  Tracing itself is not disabled by this function.  If it
+    is not enabled, memory taken by the trace buffer is freed.
+    """
+
+    global _trace
+
+    if _tracing:
+        _trace.records[:] = [None] * len (_trace.records)
+        _trace.position   = 0
+    else:
+        _trace = None
+
+def dump_trace (file = None):
+    """
+    Write recorded emissions to C{file} (standard error stream by default), one per line,
+    oldest first.
+    """
+
+    if file is None:
+        file = sys.stderr
+
+    for record in get_trace ():
+        file.write ('%s\n' % record)
+
+
+
+# Implementation note: records are stored as plain tuples in a preallocated list, which
+# is overwritten in circles.  `position' is the total number of recorded emissions.  It
+# is not protected by a lock, so with several threads some records might occasionally be
+# lost; this is considered acceptable for a debugging tool.
+
+class _TraceBuffer (object):
+
+    __slots__ = ('records', 'position')
+
+    def __init__(self, size):
+        self.records  = [None] * size
+        self.position = 0
+
+    def record (self, signal, arguments, keywords):
+        position = self.position
+        records  = self.records
+
+        records[position % len (records)] = (id (signal), signal.__class__,
+                                             signal._get_emission_level () + 1,
+                                             len (_as_handler_sequence (signal._handlers)),
+                                             _timer (), arguments, keywords)
+        self.position = position + 1
+
+
+def _format_traced_value (value, max_length):
+    try:
+        representation = repr (value)
+    except Exception:
+        return '<%s object, repr() failed>' % type (value).__name__
+
+    if len (representation) > max_length:
+        representation = representation[:max_length - 3] + '...'
+
+    return representation
+
+
+_trace   = None
+_tracing = False
+
+
+
+#-- Disconnecting objects --------------------------------------------
+
+# Connections of method handlers are recorded per object, so that `disconnect_object'
+# doesn't need to look through all signals.  Only objects passed to `track_connections'
+# are recorded: connecting doesn't touch the registry at all while it is empty.  Entries
+# of `_object_connections' are keyed by object identifier and have the form [reference,
+# pruning limit, (signal, arguments)...], where arguments are passed to the signal's
+# `disconnect_all' and `is_connected' methods.  Records no longer connected are pruned
+# whenever their number doubles, and the whole entry goes away with the object.
+
+def track_connections (object):
+    """
+    Start recording connections of handlers bound to C{object}, so that
+    C{L{disconnect_object}} can later disconnect them.  These are the handlers that have
+    C{object} as their L{im_self <Binding.im_self>}, i.e. its methods, connected with or
+    without arguments.  Only connections made after this call are recorded.  Tracking
+    stops when C{object} is garbage-collected.
+
+    Connections of objects that are not tracked cost nothing extra.  For tracked objects,
+    each connection keeps its signal alive until the handler is disconnected or the object
+    is garbage-collected.
+
+    @raises TypeError: if C{object} cannot be weakly referenced.
+    """
+
+    key = id (object)
+
+    _object_connections_lock.acquire ()
+    try:
+        entry = _object_connections.get (key)
+
+        # See `notify.bind._get_shared_reference' about reused identifiers.
+        if entry is None or entry[0] () is not object:
+            entry    = [None, _MIN_CONNECTION_PRUNING_LIMIT]
+            entry[0] = weakref.ref (object, _create_object_callback (key, entry))
+
+            _object_connections[key] = entry
+
+    finally:
+        _object_connections_lock.release ()
+
+
+def disconnect_object (object):
+    """
+    Disconnect all handlers bound to C{object} from all signals they are connected to.
+    The object must be tracked with C{L{track_connections}} and only handlers connected
+    since are found.  The time taken depends only on the number of such connections, not
+    on the number of signals or their handlers.  The object remains tracked.
+
+    Only connections made with C{L{connect <AbstractSignal.connect>}} and friends of
+    standard signal classes and C{L{TopicSignal}} are found; handlers passed directly to
+    C{L{do_connect <AbstractSignal.do_connect>}} are not seen.  When a found handler is
+    disconnected, all handlers equal to it are disconnected from the same signal, as with
+    C{L{disconnect_all <AbstractSignal.disconnect_all>}}.
+
+    @rtype:   C{bool}
+    @returns: C{True} if at least one handler has been disconnected, C{False} otherwise.
+
+    @raises ValueError: if connections of C{object} are not tracked.
+    """
+
+    _object_connections_lock.acquire ()
+    try:
+        entry = _object_connections.get (id (object))
+        if entry is None or entry[0] () is not object:
+            raise ValueError ('connections of %r are not tracked' % (object,))
+
+        records    = entry[2:]
+        entry[2:]  = []
+        entry[1]   = _MIN_CONNECTION_PRUNING_LIMIT
+    finally:
+        _object_connections_lock.release ()
+
+    disconnected = False
+
+    for signal, arguments in records:
+        if signal.disconnect_all (*arguments):
+            disconnected = True
+
+    return disconnected
+
+
+def _register_connection (signal, handler, arguments):
+    # Record that `handler', already connected to `signal', is bound to an object, if
+    # that object is tracked.
+    if not isinstance (handler, WeakBinding):
+        return
+
+    object = handler._get_object ()
+    if object is None:
+        return
+
+    _object_connections_lock.acquire ()
+    try:
+        entry = _object_connections.get (id (object))
+        if entry is None or entry[0] () is not object:
+            return
+
+        if len (entry) - 2 >= entry[1]:
+            # Equal records are redundant, as `disconnect_all' disconnects all equal
+            # handlers anyway.  Records with unhashable handlers (e.g. with a list among
+            # arguments) are kept as they are: this must not raise, since the handler is
+            # connected already.
+            records            = {}
+            unhashable_records = []
+
+            for record in entry[2:]:
+                if record[0].is_connected (*record[1]):
+                    try:
+                        records[(id (record[0]), record[1])] = record
+                    except TypeError:
+                        unhashable_records.append (record)
+
+            entry[2:] = list (records.values ()) + unhashable_records
+            entry[1]  = max (_MIN_CONNECTION_PRUNING_LIMIT, 2 * (len (entry) - 2))
+
+        entry.append ((signal, arguments))
+
+    finally:
+        _object_connections_lock.release ()
+
+
+# Must not be nested in `track_connections', else the callback would keep the object
+# alive.
+def _create_object_callback (key, entry):
+    # See `notify.bind._create_reference_callback' for why globals are looked up now.
+    object_connections = _object_connections
+    lock               = _object_connections_lock
+
+    def object_garbage_collected (reference):
+        lock.acquire ()
+        try:
+            if object_connections.get (key) is entry:
+                del object_connections[key]
+        finally:
+            lock.release ()
+
+    return object_garbage_collected
+
+
+_MIN_CONNECTION_PRUNING_LIMIT = 8
+_object_connections           = {}
+_object_connections_lock      = threading.RLock ()
 
 
 
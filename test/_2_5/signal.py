@@ -30,7 +30,7 @@ from __future__    import with_statement
 
 from contextlib    import nested
 
-from notify.signal import Signal
+from notify.signal import Signal, DeferredSignal
 from test.__common import NotifyTestCase, NotifyTestObject, ignoring_exceptions
 
 
@@ -137,6 +137,37 @@ class SignalContextManagerTestCase (NotifyTestCase):
 
 
 
+    def test_deferred_1 (self):
+        test   = NotifyTestObject ()
+        signal = DeferredSignal ()
+
+        signal.connect (test.simple_handler)
+
+        with signal.deferred ():
+            signal.emit (1)
+
+            with signal.deferred ():
+                signal.emit (2)
+
+            test.assert_results ()
+
+        test.assert_results (1, 2)
+
+
+    def test_deferred_2 (self):
+        test   = NotifyTestObject ()
+        signal = DeferredSignal (policy = DeferredSignal.DELIVER_LAST)
+
+        signal.connect (test.simple_handler)
+
+        with nested (ignoring_exceptions (), signal.deferred ()):
+            signal.emit (1)
+            signal.emit (2)
+            raise Exception
+
+        test.assert_results (2)
+
+
 # Local variables:
 # mode: python
 # python-indent: 4
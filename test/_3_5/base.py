@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2007, 2008 Paul Pogonyshev.                          #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+import asyncio
+
+from notify.condition import Condition
+from notify.variable  import Variable
+from test.__common    import NotifyTestCase
+
+
+__all__ = ('BaseWaitForTestCase',)
+
+
+
+def _run (coroutine):
+    loop = asyncio.new_event_loop ()
+    try:
+        return loop.run_until_complete (coroutine)
+    finally:
+        loop.close ()
+
+
+
+class BaseWaitForTestCase (NotifyTestCase):
+
+    def test_already_satisfied (self):
+        variable = Variable (5)
+
+        async def wait ():
+            return await variable.wait_for (lambda value: value > 2)
+
+        self.assertEqual (_run (wait ()), 5)
+        self.assertFalse (variable.changed.has_handlers ())
+
+
+    def test_wait_for (self):
+        variable = Variable (0)
+
+        async def wait ():
+            future = variable.wait_for (lambda value: value > 2)
+            for value in range (5):
+                variable.value = value
+            return await future
+
+        self.assertEqual (_run (wait ()), 3)
+        self.assertFalse (variable.changed.has_handlers ())
+
+
+    def test_condition (self):
+        condition = Condition (False)
+
+        async def wait ():
+            future = condition.wait_for (bool)
+            condition.state = True
+            return await future
+
+        self.assertEqual (_run (wait ()), True)
+
+
+    def test_predicate_exception (self):
+        variable = Variable (0)
+
+        async def wait ():
+            future = variable.wait_for (lambda value: 1 / value > 0)
+            variable.value = 1
+            return await future
+
+        self.assertRaises (ZeroDivisionError, lambda: _run (wait ()))
+
+
+    def test_cancellation (self):
+        variable = Variable (0)
+
+        async def cancel ():
+            future = variable.wait_for (lambda value: value > 2)
+            future.cancel ()
+            await asyncio.sleep (0)
+
+        _run (cancel ())
+        self.assertFalse (variable.changed.has_handlers ())
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2007, 2008 Paul Pogonyshev.                          #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+import asyncio
+
+from notify.signal import AbstractSignal, Signal, AsyncSignal
+from test.__common import NotifyTestCase, NotifyTestObject
+
+
+__all__ = ('AsyncSignalTestCase', 'NextEmissionTestCase')
+
+
+
+def _run (coroutine):
+    loop = asyncio.new_event_loop ()
+    try:
+        return loop.run_until_complete (coroutine)
+    finally:
+        loop.close ()
+
+
+
+class AsyncSignalTestCase (NotifyTestCase):
+
+    def test_plain_handlers (self):
+        test   = NotifyTestObject ()
+        signal = AsyncSignal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (test.simple_handler_100)
+
+        self.assertEqual (_run (signal.emit (1)), None)
+        test.assert_results (1, 101)
+
+
+    def test_coroutine_handlers (self):
+        test   = NotifyTestObject ()
+        signal = AsyncSignal ()
+
+        async def handler (value):
+            await asyncio.sleep (0)
+            test.results.append (value)
+
+        signal.connect (handler)
+        signal.connect (test.simple_handler_100)
+
+        _run (signal.emit (1))
+        _run (signal (2))
+
+        test.assert_results (1, 101, 2, 102)
+
+
+    def test_accumulator (self):
+        signal = AsyncSignal (AsyncSignal.VALUE_LIST)
+
+        async def double (value):
+            await asyncio.sleep (0.01)
+            return 2 * value
+
+        signal.connect (double)
+        signal.connect (lambda value: value + 1)
+        signal.connect (double)
+
+        self.assertEqual (_run (signal.emit (3)), [6, 4, 6])
+
+
+    def test_any_accepts (self):
+        test   = NotifyTestObject ()
+        signal = AsyncSignal (AsyncSignal.ANY_ACCEPTS)
+
+        async def accept (value):
+            test.results.append (value)
+            return True
+
+        signal.connect (accept)
+        signal.connect (test.simple_handler_100)
+
+        self.assertEqual (_run (signal.emit (1)), True)
+        test.assert_results (1)
+
+
+    def test_concurrent_emission (self):
+        signal  = AsyncSignal (AsyncSignal.VALUE_LIST, concurrency = None)
+        events  = []
+
+        async def handler (delay, value):
+            events.append (('start', value))
+            await asyncio.sleep (delay)
+            events.append (('end', value))
+            return value
+
+        signal.connect (handler, 0.02)
+        signal.connect (lambda value: value + 10)
+        signal.connect (handler, 0.01)
+
+        self.assertEqual (_run (signal.emit (1)), [1, 11, 1])
+        self.assertEqual (events, [('start', 1), ('start', 1), ('end', 1), ('end', 1)])
+
+
+    def test_concurrency_limit (self):
+        signal  = AsyncSignal (concurrency = 2)
+        running = []
+        maximum = []
+
+        async def handler ():
+            running.append (None)
+            maximum.append (len (running))
+            await asyncio.sleep (0.01)
+            running.pop ()
+
+        for index in range (5):
+            signal.connect (handler)
+
+        _run (signal.emit ())
+
+        self.assertEqual (len (maximum), 5)
+        self.assertEqual (max (maximum), 2)
+
+
+    def test_stop_emission (self):
+        test   = NotifyTestObject ()
+        signal = AsyncSignal ()
+
+        async def stopper (value):
+            await asyncio.sleep (0)
+            test.results.append (signal.emission_level)
+            signal.stop_emission ()
+
+        signal.connect (stopper)
+        signal.connect (test.simple_handler)
+
+        _run (signal.emit (1))
+
+        test.assert_results (1)
+        self.assertEqual (signal.emission_level, 0)
+        self.assertEqual (signal.emission_stopped, False)
+
+
+    def test_blocking (self):
+        test   = NotifyTestObject ()
+        signal = AsyncSignal ()
+
+        signal.connect (test.simple_handler)
+        signal.block (test.simple_handler)
+
+        _run (signal.emit (1))
+        signal.unblock (test.simple_handler)
+        _run (signal.emit (2))
+
+        test.assert_results (2)
+
+
+    def test_exception_handling (self):
+        signal = AsyncSignal (AsyncSignal.VALUE_LIST, concurrency = None)
+        errors = []
+
+        async def failing (value):
+            raise ValueError (value)
+
+        def exception_handler (signal, exception, handler):
+            errors.append (exception.args)
+
+        signal.connect (failing)
+        signal.connect (lambda value: value)
+
+        original_handler = AbstractSignal.exception_handler
+        AbstractSignal.exception_handler = exception_handler
+
+        try:
+            self.assertEqual (_run (signal.emit (1)), [1])
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+        self.assertEqual (errors, [(1,)])
+
+
+    def test_emit_many (self):
+        signal = AsyncSignal (AsyncSignal.LAST_VALUE)
+        signal.connect (lambda value: value * value)
+
+        self.assertEqual (_run (signal.emit_many ([(1,), (2,), (3,)])), [1, 4, 9])
+
+
+    def test_invalid_concurrency (self):
+        self.assertRaises (ValueError, lambda: AsyncSignal (concurrency = 0))
+        self.assertRaises (ValueError, lambda: AsyncSignal (concurrency = 'all'))
+
+
+
+class NextEmissionTestCase (NotifyTestCase):
+
+    def test_next_emission (self):
+        signal = Signal ()
+
+        async def wait ():
+            future = signal.next_emission ()
+            signal.emit (1, 2)
+            signal.emit (3)
+            return await future
+
+        self.assertEqual (_run (wait ()), (1, 2))
+        self.assertFalse (signal.has_handlers ())
+
+
+    def test_cancellation (self):
+        signal = Signal ()
+
+        async def cancel ():
+            future = signal.next_emission ()
+            future.cancel ()
+            await asyncio.sleep (0)
+
+        _run (cancel ())
+        self.assertFalse (signal.has_handlers ())
+
+
+    def test_async_signal (self):
+        signal = AsyncSignal ()
+
+        async def wait ():
+            future = signal.next_emission ()
+            await signal.emit ('x')
+            return await future
+
+        self.assertEqual (_run (wait ()), ('x',))
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -121,6 +121,20 @@ class AllTestCase (NotifyTestCase):
         self.assert_is_class (AbstractSignal)
         self.assert_is_class (Signal)
         self.assert_is_class (CleanSignal)
+        self.assert_is_class (SnapshotSignal)
+        self.assert_is_class (PrioritySignal)
+        self.assert_is_class (ThreadSafeSignal)
+        self.assert_is_class (AsyncSignal)
+        self.assert_is_class (ParallelSignal)
+        self.assert_is_class (DeferredSignal)
+        self.assert_is_class (BreadthFirstSignal)
+        self.assert_is_class (CompilingSignal)
+        self.assert_is_class (SignalFactory)
+        self.assert_is_class (TopicSignal)
+        self.assert_is_class (DeliveryQueue)
+        self.assert_is_class (HandlerProfile)
+        self.assert_is_class (EmissionRecord)
+        self.assert_is_class (HandlerExceptions)
 
 
     def test_util (self):
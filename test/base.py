@@ -29,6 +29,7 @@ if __name__ == '__main__':
     sys.path.insert (0, os.path.join (sys.path[0], os.pardir))
 
 
+import sys
 import unittest
 
 from notify.base      import AbstractValueObject
@@ -261,6 +262,9 @@ import __future__
 if NotifyTestCase.note_skipped_tests ('with_statement' in __future__.all_feature_names):
     from test._2_5.base import BaseContextManagerTestCase, BaseChangesFrozenContextManagerTestCase
 
+if NotifyTestCase.note_skipped_tests (sys.version_info[:2] >= (3, 5)):
+    from test._3_5.base import BaseWaitForTestCase
+
 
 
 if __name__ == '__main__':
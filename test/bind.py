@@ -33,7 +33,7 @@ import sys
 import unittest
 
 from notify.bind   import Binding, WeakBinding, RaisingWeakBinding, \
-                          CannotWeakReferenceError, GarbageCollectedError
+                          CannotWeakReferenceError, GarbageCollectedError, HAVE_FAST_BINDINGS
 from test.__common import NotifyTestCase
 
 
@@ -66,6 +66,15 @@ DUMMY = Dummy ()
 
 
 
+class ArgumentsOverridingBinding (WeakBinding):
+
+    __slots__ = ()
+
+    def _get_arguments (self):
+        return ('overriden',)
+
+
+
 class BindingTestCase (NotifyTestCase):
 
     def test_creation (self):
@@ -327,6 +336,430 @@ class BindingWrapTestCase (NotifyTestCase):
 
 
 
+class SpecializedBindingTestCase (NotifyTestCase):
+
+    def create_specialized (self, _class, callable_object, arguments = (), keywords = None):
+        from notify.bind import _get_specialized_call, _get_specialized_class
+
+        call = _get_specialized_call (_class, callable_object, arguments, keywords)
+        if call is None:
+            return _class (callable_object, arguments, keywords = keywords)
+
+        specialized_class = _get_specialized_class (_class, call)
+
+        self.assert_(issubclass (specialized_class, _class))
+        self.assertEqual (specialized_class.__name__, _class.__name__)
+
+        return specialized_class (callable_object, arguments, keywords = keywords)
+
+
+    def test_invocation (self):
+        keywords = { 'a': 1 }
+
+        for _class in (Binding, WeakBinding, RaisingWeakBinding):
+            for callable_object in (DUMMY.identity_function, Dummy.static_identity,
+                                    DUMMY.keyword_dict_function, Dummy.static_keyword_dict):
+                if callable_object in (DUMMY.identity_function, Dummy.static_identity):
+                    shapes = (((), None), ((1,), None), ((1,), keywords), ((), keywords))
+                    calls  = (((), {}), ((2, 3), {}))
+                else:
+                    shapes = (((), None), ((), keywords))
+                    calls  = (((), {}), ((), { 'b': 2 }), ((), { 'a': 3 }))
+
+                for arguments, fixed_keywords in shapes:
+                    if fixed_keywords and callable_object in (DUMMY.identity_function,
+                                                              Dummy.static_identity):
+                        continue
+
+                    specialized = self.create_specialized (_class, callable_object,
+                                                           arguments, fixed_keywords)
+                    generic     = _class (callable_object, arguments,
+                                          keywords = fixed_keywords)
+
+                    self.assertEqual (specialized, generic)
+                    self.assertEqual (hash (specialized), hash (generic))
+
+                    for call_arguments, call_keywords in calls:
+                        self.assertEqual (specialized (*call_arguments, **call_keywords),
+                                          generic     (*call_arguments, **call_keywords))
+
+            # Fixed keywords must not be modified by calls.
+            self.assertEqual (keywords, { 'a': 1 })
+
+
+    def test_garbage_collection (self):
+        object    = Dummy ()
+        bindings  = (self.create_specialized (WeakBinding, object.identity_function),
+                     self.create_specialized (WeakBinding, object.identity_function, (1,)),
+                     self.create_specialized (WeakBinding, object.keyword_dict_function,
+                                              keywords = { 'a': 1 }))
+        raising   = self.create_specialized (RaisingWeakBinding, object.identity_function)
+
+        del object
+        self.collect_garbage ()
+
+        for binding in bindings:
+            self.assertEqual (binding (), None)
+
+        self.assertRaises (GarbageCollectedError, raising)
+
+
+    def test_wrap (self):
+        binding = WeakBinding.wrap (DUMMY.identity_function)
+
+        if HAVE_FAST_BINDINGS:
+            self.assert_(type (binding) is WeakBinding)
+        else:
+            self.assert_(type (binding) is not WeakBinding)
+            self.assert_(isinstance (binding, WeakBinding))
+
+        # Subclasses are never specialized.
+        self.assert_(type (ArgumentsOverridingBinding.wrap (DUMMY.identity_function))
+                     is ArgumentsOverridingBinding)
+
+
+    def test_wrap_without_extension (self):
+        from notify import bind
+
+        saved_specialize_bindings = bind._specialize_bindings
+        bind._specialize_bindings = True
+
+        try:
+            object   = Dummy ()
+            bindings = (Binding.wrap            (DUMMY.identity_function, (1,)),
+                        Binding.wrap            (Dummy.static_identity, (1,)),
+                        WeakBinding.wrap        (object.identity_function),
+                        WeakBinding.wrap        (object.keyword_dict_function,
+                                                 keywords = { 'a': 1 }),
+                        RaisingWeakBinding.wrap (object.identity_function, (1,)))
+        finally:
+            bind._specialize_bindings = saved_specialize_bindings
+
+        for binding, _class in zip (bindings, (Binding, Binding, WeakBinding, WeakBinding,
+                                               RaisingWeakBinding)):
+            self.assert_(type (binding) is not _class)
+            self.assert_(isinstance (binding, _class))
+            self.assertEqual (type (binding).__name__, _class.__name__)
+
+        self.assertEqual (bindings[0] (2), (1, 2))
+        self.assertEqual (bindings[1] (2), (1, 2))
+        self.assertEqual (bindings[2] (2), 2)
+        self.assertEqual (bindings[3] (b = 2), { 'a': 1, 'b': 2 })
+        self.assertEqual (bindings[4] (2), (1, 2))
+
+        del object
+        self.collect_garbage ()
+
+        self.assertEqual (bindings[2] (2), None)
+        self.assertRaises (GarbageCollectedError, bindings[4], 2)
+
+
+    def test_wrap_unbound_method_without_extension (self):
+        # This test won't work on Python 3000, since unbound methods are gone.
+        if sys.version_info[0] < 3:
+            from notify import bind
+
+            class A (object):
+                def method (self, *arguments, **keywords):
+                    return (self, arguments, keywords)
+
+            saved_specialize_bindings = bind._specialize_bindings
+            bind._specialize_bindings = True
+
+            try:
+                bindings = (WeakBinding.wrap        (A.method, (1,)),
+                            RaisingWeakBinding.wrap (A.method, (1,)),
+                            WeakBinding.wrap        (A.method, keywords = { 'a': 1 }))
+            finally:
+                bind._specialize_bindings = saved_specialize_bindings
+
+            # Methods are called without an object, not treated as garbage-collected.
+            self.assertEqual (bindings[0] (2), (None, (1, 2), {}))
+            self.assertEqual (bindings[1] (2), (None, (1, 2), {}))
+            self.assertEqual (bindings[2] (2), (None, (2,),   { 'a': 1 }))
+
+
+
+class SharedReferenceTestCase (NotifyTestCase):
+
+    def test_sharing (self):
+        object   = Dummy ()
+        binding1 = WeakBinding        (object.identity_function)
+        binding2 = RaisingWeakBinding (object.identity_function, (1,))
+        binding3 = WeakBinding        (Dummy ().identity_function)
+
+        self.assert_(binding1._object is binding2._object)
+        self.assert_(binding1._object is not binding3._object)
+
+
+    def test_garbage_collection (self):
+        from notify.bind import _shared_references
+
+        self.collect_garbage ()
+
+        num_references = len (_shared_references)
+        object         = Dummy ()
+        notified       = []
+        bindings       = [WeakBinding (object.identity_function, (k,),
+                                       lambda reference, k = k: notified.append (k))
+                          for k in range (3)]
+
+        self.assertEqual (len (_shared_references), num_references + 1)
+
+        # A binding that died before its object must not be notified.
+        del bindings[1]
+
+        del object
+        self.collect_garbage ()
+
+        notified.sort ()
+        self.assertEqual (notified, [0, 2])
+        self.assertEqual ([bool (binding) for binding in bindings], [False, False])
+        self.assertEqual ([binding () for binding in bindings], [None, None])
+        self.assertEqual (len (_shared_references), num_references)
+
+
+    def test_callback_exception (self):
+        object    = Dummy ()
+        notified  = []
+        reported  = []
+
+        def raising_callback (reference):
+            raise ValueError
+
+        bindings  = [WeakBinding (object.identity_function, (), raising_callback),
+                     WeakBinding (object.identity_function, (),
+                                  lambda reference: notified.append (reference)),
+                     WeakBinding (object.identity_function, (), raising_callback)]
+
+        original_excepthook = sys.excepthook
+        sys.excepthook      = lambda *exception_info: reported.append (exception_info[0])
+
+        try:
+            del object
+            self.collect_garbage ()
+        finally:
+            sys.excepthook = original_excepthook
+
+        self.assertEqual (len (notified), 1)
+        self.assertEqual (reported, [ValueError, ValueError])
+        self.assert_(not bindings[0] and not bindings[1] and not bindings[2])
+
+
+    def test_pruning (self):
+        from notify.bind import _shared_references
+
+        object = Dummy ()
+
+        callback = lambda reference: None
+
+        for k in range (1000):
+            WeakBinding (object.identity_function, (), callback)
+
+        binding = WeakBinding (object.identity_function, (), callback)
+
+        self.assert_(len (_shared_references[id (object)]) < 20)
+
+
+    def test_no_callback (self):
+        from notify.bind import _shared_references
+
+        num_references = len (_shared_references)
+        object         = Dummy ()
+        binding        = RaisingWeakBinding (object.identity_function, (1,))
+
+        self.assertEqual (len (_shared_references), num_references)
+        self.assertEqual (binding (2), (1, 2))
+        self.assert_(binding)
+
+        del object
+        self.collect_garbage ()
+
+        self.assert_(not binding)
+        self.assertRaises (GarbageCollectedError, binding)
+
+
+
+class BindingInternTestCase (NotifyTestCase):
+
+    def test_identity (self):
+        for _class in (Binding, WeakBinding, RaisingWeakBinding):
+            binding = _class.wrap (DUMMY.identity_function, (1,), intern = True)
+
+            self.assert_(isinstance (binding, _class))
+            self.assert_(_class.wrap (DUMMY.identity_function, (1,), intern = True) is binding)
+            self.assert_(_class.wrap (DUMMY.identity_function, (2,), intern = True)
+                         is not binding)
+
+            self.assertEqual (binding (2), (1, 2))
+
+        binding = WeakBinding.wrap (DUMMY.identity_function, intern = True)
+        self.assert_(WeakBinding.wrap (DUMMY.identity_function, intern = True) is binding)
+
+        # Weak bindings with different callbacks must not be shared.
+        self.assert_(WeakBinding.wrap (DUMMY.identity_function, callback = lambda: None,
+                                       intern = True)
+                     is not binding)
+
+
+    def test_equality (self):
+        for _class in (Binding, WeakBinding, RaisingWeakBinding):
+            self.assert_equal_thoroughly (_class.wrap (DUMMY.identity_function, (1,),
+                                                       intern = True),
+                                          _class (DUMMY.identity_function, (1,)))
+            self.assert_equal_thoroughly (_class (DUMMY.identity_function, (1,)),
+                                          _class.wrap (DUMMY.identity_function, (1,),
+                                                       intern = True))
+            self.assert_not_equal_thoroughly (_class.wrap (DUMMY.identity_function, (1,),
+                                                           intern = True),
+                                              _class.wrap (DUMMY.identity_function, (2,),
+                                                           intern = True))
+
+        self.assert_equal_thoroughly (WeakBinding.wrap (DUMMY.identity_function, intern = True),
+                                      DUMMY.identity_function)
+        self.assert_equal_thoroughly (Binding.wrap     (DUMMY.identity_function, (1,),
+                                                        intern = True),
+                                      WeakBinding.wrap (DUMMY.identity_function, (1,),
+                                                        intern = True))
+
+        # Not shared because of different callbacks, but still equal.
+        self.assert_equal_thoroughly (WeakBinding.wrap (DUMMY.identity_function, (1,),
+                                                        lambda reference: None,
+                                                        intern = True),
+                                      WeakBinding.wrap (DUMMY.identity_function, (1,),
+                                                        lambda reference: None,
+                                                        intern = True))
+
+
+    def test_class_name (self):
+        binding = WeakBinding.wrap (DUMMY.identity_function, (1,), intern = True)
+        self.assertEqual (type (binding).__name__, 'WeakBinding')
+
+
+    def test_unhashable_arguments (self):
+        binding = Binding.wrap (DUMMY.identity_function, ([],), intern = True)
+
+        self.assert_(binding is not Binding.wrap (DUMMY.identity_function, ([],), intern = True))
+        self.assertEqual (binding (1), ([], 1))
+
+
+    def test_garbage_collection (self):
+        from notify.bind import _interned_bindings
+
+        self.collect_garbage ()
+
+        object       = Dummy ()
+        num_interned = len (_interned_bindings)
+        binding      = WeakBinding.wrap (object.identity_function, intern = True)
+
+        self.assertEqual (len (_interned_bindings), num_interned + 1)
+
+        del object
+        self.collect_garbage ()
+
+        # The dead binding must never be returned for a new object, even if the new
+        # object happens to get the same identifier.
+        object = Dummy ()
+        self.assert_(WeakBinding.wrap (object.identity_function, intern = True) is not binding)
+        self.assertEqual (WeakBinding.wrap (object.identity_function, intern = True) (1), 1)
+
+        del binding
+        self.collect_garbage ()
+
+        self.assertEqual (len (_interned_bindings), num_interned)
+
+
+
+
+if NotifyTestCase.note_skipped_tests (HAVE_FAST_BINDINGS,
+                                      NotifyTestCase.REASON_INVALID_FOR_IMPLEMENTATION):
+
+    from notify.bind import _python_call, _python_weak_call, _python_eq, _python_ne, \
+                            _python_hash, _python_weak_hash
+
+
+    class FastBindingTestCase (NotifyTestCase):
+
+        def test_same_results (self):
+            keywords = { 'a': 1, 'b': 2 }
+
+            for binding in (Binding     (DUMMY.identity_function, (1, 2)),
+                            Binding     (Dummy.static_identity, ('x',)),
+                            WeakBinding (DUMMY.identity_function, (1, 2)),
+                            WeakBinding (Dummy.static_identity)):
+                if isinstance (binding, WeakBinding):
+                    python_call = _python_weak_call
+                else:
+                    python_call = _python_call
+
+                self.assertEqual (binding (),            python_call (binding))
+                self.assertEqual (binding (3),           python_call (binding, 3))
+                self.assertEqual (binding (*range (20)), python_call (binding, *range (20)))
+
+            for binding in (Binding     (DUMMY.keyword_dict_function, (), keywords),
+                            WeakBinding (DUMMY.keyword_dict_function, (), None, keywords)):
+                if isinstance (binding, WeakBinding):
+                    python_call = _python_weak_call
+                else:
+                    python_call = _python_call
+
+                self.assertEqual (binding (),              python_call (binding))
+                self.assertEqual (binding (b = 3, c = 4),  python_call (binding, b = 3, c = 4))
+
+                # Fixed keywords must not be modified by calls.
+                self.assertEqual (binding (), keywords)
+
+
+        def test_same_comparison (self):
+            dummy    = Dummy ()
+            bindings = (Binding            (DUMMY.identity_function),
+                        Binding            (DUMMY.identity_function, (1,)),
+                        Binding            (dummy.identity_function),
+                        Binding            (Dummy.static_identity),
+                        WeakBinding        (DUMMY.identity_function),
+                        WeakBinding        (Dummy.static_identity, keywords = { 'a': 1 }),
+                        RaisingWeakBinding (dummy.identity_function),
+                        ArgumentsOverridingBinding (DUMMY.identity_function))
+            others   = bindings + (DUMMY.identity_function, Dummy.static_identity, None, 1)
+
+            for binding in bindings:
+                for other in others:
+                    self.assertEqual (binding.__eq__(other), _python_eq (binding, other))
+                    self.assertEqual (binding.__ne__(other), _python_ne (binding, other))
+
+                if isinstance (binding, WeakBinding):
+                    self.assertEqual (hash (binding), _python_weak_hash (binding))
+                else:
+                    self.assertEqual (hash (binding), _python_hash (binding))
+
+
+        def test_overriden_accessors (self):
+            binding = ArgumentsOverridingBinding (DUMMY.identity_function, (1, 2))
+
+            self.assertEqual (binding (3), ('overriden', 3))
+            self.assertEqual (binding, ArgumentsOverridingBinding (DUMMY.identity_function))
+            self.assertNotEqual (binding, Binding (DUMMY.identity_function, (1, 2)))
+
+
+        def test_garbage_collection (self):
+            object   = Dummy ()
+            binding1 = WeakBinding        (object.identity_function)
+            binding2 = RaisingWeakBinding (object.identity_function)
+
+            _hash = hash (binding1)
+
+            del object
+            self.collect_garbage ()
+
+            self.assertEqual (binding1 (15), None)
+            self.assertRaises (GarbageCollectedError, binding2)
+
+            # Hash of `binding1' is cached, but it cannot be computed for `binding2' now.
+            self.assertEqual (hash (binding1), _hash)
+            self.assertRaises (TypeError, lambda: hash (binding2))
+
+
+
 if __name__ == '__main__':
     unittest.main ()
 
@@ -29,10 +29,29 @@ if __name__ == '__main__':
     sys.path.insert (0, os.path.join (sys.path[0], os.pardir))
 
 
+import gc
+import sys
+import threading
 import unittest
+import weakref
 
-from notify.signal import AbstractSignal, Signal
-from test.__common import NotifyTestCase, NotifyTestObject
+from notify.signal   import AbstractSignal, Signal, CleanSignal, SnapshotSignal, PrioritySignal, \
+                            ThreadSafeSignal, ParallelSignal, DeferredSignal, BreadthFirstSignal, \
+                            CompilingSignal, \
+                            SignalFactory, TopicSignal, DeliveryQueue, HandlerExceptions, \
+                            HAVE_FAST_EMISSION, \
+                            track_connections, disconnect_object, \
+                            enable_profiling, disable_profiling, \
+                            enable_tracing, disable_tracing, get_trace, clear_trace, dump_trace
+from notify.variable import Variable
+from notify          import signal as signal_module
+from test.__common   import NotifyTestCase, NotifyTestObject
+
+try:
+    import concurrent.futures
+    HAVE_CONCURRENT_FUTURES = True
+except ImportError:
+    HAVE_CONCURRENT_FUTURES = False
 
 
 
@@ -207,6 +226,58 @@ class SimpleSignalTestCase (NotifyTestCase):
         test.assert_results (1, 3)
 
 
+    def test_block_twice (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler)
+
+        self.assert_(signal.block (test.simple_handler))
+        self.assert_(signal.block (test.simple_handler))
+        signal.emit (1)
+
+        self.assert_(signal.unblock (test.simple_handler))
+        self.assert_(signal.is_blocked (test.simple_handler))
+        signal.emit (2)
+
+        self.assert_(signal.unblock (test.simple_handler))
+        self.assert_(not signal.is_blocked (test.simple_handler))
+        self.assert_(not signal.unblock (test.simple_handler))
+        signal.emit (3)
+
+        test.assert_results (3)
+
+
+    def test_block_unhashable (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler, [])
+        signal.connect (test.simple_handler_100)
+
+        signal.block (test.simple_handler, [])
+        signal.block (test.simple_handler_100)
+        signal.emit (1)
+
+        self.assert_(signal.is_blocked (test.simple_handler, []))
+
+        signal.unblock (test.simple_handler, [])
+        signal.emit (2)
+
+        self.assert_(not signal.is_blocked (test.simple_handler, []))
+
+        signal.block      (test.simple_handler, [])
+        signal.disconnect (test.simple_handler, [])
+        signal.unblock    (test.simple_handler_100)
+
+        self.assertEqual (signal._blocked_handlers, ())
+
+        signal.connect (test.simple_handler, [])
+        signal.emit (3)
+
+        test.assert_results (([], 2), 103, ([], 3))
+
+
     def test_emission_level_1 (self):
         signal = Signal (Signal.VALUE_LIST)
 
@@ -562,6 +633,38 @@ class AccumulatorSignalTestCase (NotifyTestCase):
         self.assertEqual (signal.emit (), [50, None, ()])
 
 
+    def test_accumulator_stops_emission (self):
+        test = NotifyTestObject ()
+
+        for accumulator, stopping_value in ((AbstractSignal.ANY_ACCEPTS, 'stop'),
+                                            (AbstractSignal.ALL_ACCEPT,  '')):
+            signal = Signal (accumulator)
+            signal.connect (lambda value: value)
+            signal.connect (test.simple_handler)
+
+            self.assertEqual (signal.emit (stopping_value), stopping_value)
+            self.assertEqual (signal.emission_level, 0)
+
+        test.assert_results ()
+
+
+    def test_derived_standard_accumulator (self):
+
+        # Standard accumulators are special-cased, but not their subclasses.
+        class TupleAccumulator (AbstractSignal.ValueListAccumulator):
+
+            def post_process_value (self, accumulated_value):
+                return tuple (accumulated_value)
+
+
+        signal = Signal (TupleAccumulator ())
+        self.assertEqual (signal.emit (), ())
+
+        signal.connect (lambda: 1)
+        signal.connect (lambda: 2)
+        self.assertEqual (signal.emit (), (1, 2))
+
+
     def test_custom_accumulator (self):
 
         class CustomAccumulator (AbstractSignal.AbstractAccumulator):
@@ -597,173 +700,2685 @@ class AccumulatorSignalTestCase (NotifyTestCase):
 
 
 
-# Note: we explicitly test protected field of `Signal' class, because there is nothing
-# public that indicates number of garbage-collected, but not yet removed handlers.  Yet we
-# want that a call to emit() does remove such handlers, so that list of signal handlers
-# doesn't grow over time if implicit disconnection is used.
+class ExceptionHandlingSignalTestCase (NotifyTestCase):
 
-class HandlerGarbageCollectionTestCase (NotifyTestCase):
+    def test_exception_handler (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
 
-    class HandlerObject (object):
+        def raising_handler (*arguments):
+            raise ValueError (arguments)
 
-        def __init__(self, test):
-            self.__test = test
+        def recording_exception_handler (signal, exception, handler):
+            test.results.append ((signal, exception.args, handler,
+                                  sys.exc_info () [1] is exception))
 
-        def simple_handler (self, *arguments):
-            self.__test.simple_handler (*arguments)
+        signal.connect (raising_handler)
+        signal.connect (test.simple_handler)
 
+        original_handler = AbstractSignal.exception_handler
 
-    def test_handler_garbage_collection_1 (self):
+        try:
+            AbstractSignal.exception_handler = recording_exception_handler
+            signal.emit (1)
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+        test.assert_results ((signal, ((1,),), raising_handler, True), 1)
+
+
+    def test_reraising_exception_handler (self):
         test   = NotifyTestObject ()
         signal = Signal ()
 
-        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
-        signal.connect (handler.simple_handler)
+        def raising_handler (*arguments):
+            raise ValueError (arguments)
 
-        self.assert_(signal._handlers is not None)
+        signal.connect (raising_handler)
+        signal.connect (test.simple_handler)
 
-        signal.emit (1)
+        original_handler = AbstractSignal.exception_handler
 
-        del handler
-        self.collect_garbage ()
+        try:
+            AbstractSignal.exception_handler = AbstractSignal.reraising_exception_handler
+            self.assertRaises (ValueError, lambda: signal.emit (1))
+        finally:
+            AbstractSignal.exception_handler = original_handler
 
-        self.assert_(signal._handlers is not None)
+        self.assertEqual    (signal.emission_level, 0)
+        test.assert_results ()
 
+        signal.disconnect (raising_handler)
         signal.emit (2)
 
-        self.assert_(signal._handlers is None)
-        test.assert_results (1)
+        test.assert_results (2)
 
 
-    def test_handler_garbage_collection_2 (self):
+    def test_handler_exception_with_accumulator (self):
+        signal = Signal (AbstractSignal.VALUE_LIST)
+
+        def raising_handler ():
+            raise ValueError
+
+        signal.connect (lambda: 1)
+        signal.connect (raising_handler)
+        signal.connect (lambda: 2)
+
+        original_handler = AbstractSignal.exception_handler
+
+        try:
+            AbstractSignal.exception_handler = AbstractSignal.ignoring_exception_handler
+            self.assertEqual (signal.emit (), [1, 2])
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+
+    def test_aggregating_exception_handler (self):
+        if sys.version_info[0] >= 3:
+            import io
+            stream = io.StringIO ()
+        else:
+            import StringIO
+            stream = StringIO.StringIO ()
+
         test   = NotifyTestObject ()
         signal = Signal ()
 
-        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+        def raising_handler (*arguments):
+            raise ValueError (arguments)
 
-        signal.connect (lambda *ignored: signal.stop_emission ())
-        signal.connect (handler.simple_handler)
+        def recording_excepthook (*exception_info):
+            test.results.append (exception_info[1].args)
 
-        self.assertEqual (len (signal._handlers), 2)
+        signal.connect (raising_handler)
 
-        signal.emit (1)
+        exception_handler = AbstractSignal.AggregatingExceptionHandler (1000, stream)
+        original_handler  = AbstractSignal.exception_handler
+        original_hook     = sys.excepthook
 
-        del handler
-        self.collect_garbage ()
+        try:
+            AbstractSignal.exception_handler = exception_handler
+            sys.excepthook                   = recording_excepthook
 
-        self.assertEqual (len (signal._handlers), 2)
+            signal.emit (1)
+            signal.emit (2)
+            signal.emit (3)
 
-        signal.emit (2)
+            self.assertEqual (exception_handler.get_occurrences (),
+                              [(raising_handler, ValueError, 3)])
 
-        # Even though emission is stopped by the first handler, signal must still notice
-        # that it should remove the second one.
-        self.assertEqual (len (signal._handlers), 1)
-        test.assert_results ()
+            exception_handler.flush ()
+            signal.emit (4)
+        finally:
+            AbstractSignal.exception_handler = original_handler
+            sys.excepthook                   = original_hook
 
+        self.assertEqual (exception_handler.interval, 1000)
+        self.assert_(stream.getvalue ().startswith ('Signal handler %r raised ValueError 2 more '
+                                                    'time(s)' % (raising_handler,)))
+        self.assertEqual (len (stream.getvalue ().splitlines ()), 1)
+        self.assertRaises (ValueError, AbstractSignal.AggregatingExceptionHandler, -1)
 
-    def test_handler_garbage_collection_3 (self):
+        test.assert_results (((1,),), ((4,),))
+
+
+    def test_aggregating_exception_handler_zero_interval (self):
         test   = NotifyTestObject ()
-        signal = Signal (AbstractSignal.ANY_ACCEPTS)
+        signal = Signal ()
 
-        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+        def raising_handler ():
+            raise ValueError
 
-        def accepting_handler (*arguments):
-            test.simple_handler_100 (*arguments)
-            return arguments[0]
+        def recording_excepthook (*exception_info):
+            test.results.append (exception_info[0])
 
-        signal.connect (accepting_handler)
-        signal.connect (handler.simple_handler)
+        signal.connect (raising_handler)
+        signal.connect (raising_handler)
 
-        self.assertEqual (len (signal._handlers), 2)
+        original_handler = AbstractSignal.exception_handler
+        original_hook    = sys.excepthook
 
-        signal.emit (1)
+        try:
+            AbstractSignal.exception_handler = AbstractSignal.AggregatingExceptionHandler (0)
+            sys.excepthook                   = recording_excepthook
 
-        del handler
-        self.collect_garbage ()
+            signal.emit ()
+        finally:
+            AbstractSignal.exception_handler = original_handler
+            sys.excepthook                   = original_hook
 
-        self.assertEqual (len (signal._handlers), 2)
+        test.assert_results (ValueError, ValueError)
 
-        signal.emit (2)
 
-        # This time emission is stopped by accumulator, but still the gc-collected handler
-        # must be removed.
-        self.assertEqual (len (signal._handlers), 1)
-        test.assert_results (101, 102)
+    def test_emit_collecting_exceptions (self):
+        test    = NotifyTestObject ()
+        signal1 = Signal (AbstractSignal.VALUE_LIST)
+        signal2 = Signal ()
 
+        def raising_handler_1 ():
+            raise ValueError (1)
 
+        def raising_handler_2 ():
+            raise TypeError (2)
 
-class ExoticSignalTestCase (NotifyTestCase):
+        def emitting_handler ():
+            signal2.emit ()
+            return 3
 
-    def test_disconnect_blocked_handler_1 (self):
+        def recording_exception_handler (signal, exception, handler):
+            test.results.append ((signal, exception.args))
+
+        signal1.connect (raising_handler_1)
+        signal1.connect (emitting_handler)
+        signal1.connect (raising_handler_2)
+        signal2.connect (raising_handler_2)
+
+        original_handler = AbstractSignal.exception_handler
+
+        try:
+            AbstractSignal.exception_handler = recording_exception_handler
+            exception_handler                = AbstractSignal.__dict__['exception_handler']
+
+            try:
+                signal1.emit_collecting_exceptions ()
+            except HandlerExceptions:
+                error = sys.exc_info () [1]
+            else:
+                self.fail ('HandlerExceptions not raised')
+
+            self.assert_(AbstractSignal.__dict__['exception_handler'] is exception_handler)
+
+            signal1.disconnect (raising_handler_1)
+            signal1.disconnect (raising_handler_2)
+            self.assertEqual (signal1.emit_collecting_exceptions (), [3])
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+        self.assert_(error.signal is signal1)
+        self.assertEqual ([(handler, exception.args)
+                           for handler, exception, traceback in error.failures],
+                          [(raising_handler_1, (1,)), (raising_handler_2, (2,))])
+        self.assertEqual (str (error),
+                          '2 signal handler(s) raised exceptions: ValueError: 1; TypeError: 2')
+
+        test.assert_results ((signal2, (2,)), (signal2, (2,)))
+
+
+    def test_emit_collecting_exceptions_other_thread (self):
+        test    = NotifyTestObject ()
+        signal1 = Signal ()
+        signal2 = Signal ()
+
+        def raising_handler ():
+            raise ValueError (1)
+
+        def recording_exception_handler (signal, exception, handler):
+            test.results.append ((signal, exception.args))
+
+        def emitting_handler ():
+            # Reassigning exception handler during collection is fine.
+            AbstractSignal.exception_handler = recording_exception_handler
+
+            thread = threading.Thread (target = signal2.emit)
+            thread.start ()
+            thread.join ()
+
+        signal1.connect (emitting_handler)
+        signal1.connect (raising_handler)
+        signal2.connect (raising_handler)
+
+        original_handler = AbstractSignal.exception_handler
+
+        try:
+            self.assertRaises (HandlerExceptions, signal1.emit_collecting_exceptions)
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+        # Exceptions raised in another thread must not be collected.
+        test.assert_results ((signal2, (1,)))
+
+
+
+if NotifyTestCase.note_skipped_tests (HAVE_FAST_EMISSION,
+                                      NotifyTestCase.REASON_INVALID_FOR_IMPLEMENTATION):
+
+    from notify.signal import _python_emit, _python_emit_many
+
+    class FastEmissionTestCase (NotifyTestCase):
+
+        def test_same_results (self):
+            signal = Signal (AbstractSignal.VALUE_LIST)
+
+            signal.connect (lambda *arguments: arguments)
+            signal.connect (lambda *arguments: len (arguments))
+            signal.connect (lambda *arguments, **keywords: keywords)
+
+            self.assertEqual (signal.emit (1, 2, x = 3), _python_emit (signal, 1, 2, x = 3))
+
+
+        def test_stop_emission (self):
+            test   = NotifyTestObject ()
+            signal = Signal (AbstractSignal.LAST_VALUE)
+
+            def stopping_handler (*arguments):
+                signal.stop_emission ()
+                return 'stopped'
+
+            signal.connect (test.simple_handler)
+            signal.connect (stopping_handler)
+            signal.connect (test.simple_handler)
+
+            self.assertEqual (signal.emit (1),               'stopped')
+            self.assertEqual (_python_emit (signal, 2),      'stopped')
+            self.assertEqual (signal.emission_level,         0)
+
+            test.assert_results (1, 2)
+
+
+        def test_same_results_many (self):
+            signal = Signal (AbstractSignal.VALUE_LIST)
+
+            signal.connect (lambda *arguments: arguments)
+            signal.connect (lambda *arguments: len (arguments))
+            signal.connect (lambda *arguments: signal.stop_emission ())
+            signal.connect (lambda *arguments: 'not reached')
+
+            argument_sets = [(), (1,), [1, 2]]
+            self.assertEqual (signal.emit_many (argument_sets),
+                              _python_emit_many (signal, argument_sets))
+
+
+
+class EmitManySignalTestCase (NotifyTestCase):
+
+    def test_emit_many (self):
         test   = NotifyTestObject ()
         signal = Signal ()
 
         signal.connect (test.simple_handler)
-        signal.emit (1)
+        signal.connect (test.simple_handler_100)
 
-        signal.block (test.simple_handler)
-        signal.emit (2)
+        self.assertEqual (signal.emit_many ([(1,), (2,), ()]), [None, None, None])
+        test.assert_results (1, 101, 2, 102, ())
+
+
+    def test_emit_many_without_handlers (self):
+        self.assertEqual (Signal ().emit_many ([(1,), (2,)]), [None, None])
+        self.assertEqual (Signal (AbstractSignal.VALUE_LIST).emit_many (iter ([(1,)])), [[]])
+
+
+    def test_emit_many_with_accumulator (self):
+        signal = Signal (AbstractSignal.ANY_ACCEPTS)
+
+        signal.connect (lambda x: x > 10)
+        signal.connect (lambda x: x < 0)
+
+        self.assertEqual (signal.emit_many ([(5,), (15,), (-5,)]), [False, True, True])
 
-        signal.disconnect (test.simple_handler)
-        signal.emit (3)
+
+    def test_emit_many_blocked (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
 
         signal.connect (test.simple_handler)
-        signal.emit (4)
+        signal.connect (test.simple_handler_100)
+        signal.block   (test.simple_handler)
 
-        test.assert_results (1, 4)
+        signal.emit_many ([(1,), (2,)])
+        test.assert_results (101, 102)
 
 
-    def test_disconnect_blocked_handler_2 (self):
+    def test_emit_many_stop_emission (self):
         test   = NotifyTestObject ()
         signal = Signal ()
 
+        def stopping_handler (x):
+            if x == 2:
+                signal.stop_emission ()
+
+        signal.connect (stopping_handler)
         signal.connect (test.simple_handler)
+
+        signal.emit_many ([(1,), (2,), (3,)])
+
+        self.assertEqual (signal.emission_level, 0)
+        test.assert_results (1, 3)
+
+
+    def test_emit_many_generic (self):
+        signal = SnapshotSignal (AbstractSignal.LAST_VALUE)
+
+        signal.connect (lambda *arguments: len (arguments))
+
+        self.assertEqual (signal.emit_many ([(), (1, 2)]), [0, 2])
+        self.assertEqual (AbstractSignal.emit_many (signal, [(1,)]), [1])
+
+
+
+class LoneHandlerSignalTestCase (NotifyTestCase):
+
+    class FalseHandler (object):
+
+        def __init__(self, test):
+            self.test = test
+
+        def __call__(self, *arguments):
+            self.test.simple_handler (*arguments)
+
+        def __len__(self):
+            return 0
+
+
+    def test_lone_handler_storage (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
         signal.connect (test.simple_handler)
+        self.assert_(type (signal._handlers) is not list)
+        self.assert_(signal.is_connected (test.simple_handler))
+        self.assertEqual (signal.count_handlers (), 1)
+
+        signal.connect (test.simple_handler_100)
+        self.assertEqual (signal._handlers, [test.simple_handler, test.simple_handler_100])
+
         signal.emit (1)
+        test.assert_results (1, 101)
 
-        signal.block (test.simple_handler)
-        signal.emit (2)
 
-        signal.disconnect (test.simple_handler)
-        signal.emit (3)
+    def test_disconnect_lone_handler (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
 
         signal.connect (test.simple_handler)
-        signal.emit (4)
 
-        signal.unblock (test.simple_handler)
-        signal.emit (5)
+        self.assert_(not signal.disconnect (test.simple_handler_100))
+        self.assert_(signal.disconnect (test.simple_handler))
+        self.assert_(signal._handlers is None)
 
-        test.assert_results (1, 1, 5, 5)
+        signal.emit (1)
+        test.assert_results ()
 
 
-    def test_disconnect_blocked_handler_3 (self):
+    def test_block_lone_handler (self):
         test   = NotifyTestObject ()
         signal = Signal ()
 
         signal.connect (test.simple_handler)
-        signal.connect (test.simple_handler)
+        signal.block   (test.simple_handler)
         signal.emit (1)
 
-        signal.block (test.simple_handler)
+        signal.unblock (test.simple_handler)
         signal.emit (2)
 
-        signal.disconnect_all (test.simple_handler)
-        signal.emit (3)
+        self.assertEqual (signal.emit_many ([(3,)]), [None])
+        test.assert_results (2, 3)
 
-        signal.connect (test.simple_handler)
-        signal.emit (4)
 
-        signal.unblock (test.simple_handler)
-        signal.emit (5)
+    def test_false_lone_handler (self):
+        test    = NotifyTestObject ()
+        signal  = CleanSignal ()
+        handler = LoneHandlerSignalTestCase.FalseHandler (test)
 
-        test.assert_results (1, 1, 4, 5)
+        signal.connect (handler)
+        signal.emit (1)
+        signal.collect_garbage ()
 
+        self.assert_(signal._handlers is handler)
 
+        signal.emit (2)
+        test.assert_results (1, 2)
 
-import __future__
 
-if NotifyTestCase.note_skipped_tests ('with_statement' in __future__.all_feature_names):
-    from test._2_5.signal import SignalContextManagerTestCase
+    def test_connect_during_lone_emission (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        def connecting_handler (x):
+            test.simple_handler (x)
+            signal.connect (test.simple_handler_100)
+
+        signal.connect (connecting_handler)
+        signal.emit (1)
+
+        self.assertEqual (signal._handlers, [connecting_handler, test.simple_handler_100])
+        test.assert_results (1, 101)
+
+
+    def test_disconnect_during_lone_emission (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        def replacing_handler (x):
+            test.simple_handler (x)
+            signal.disconnect (replacing_handler)
+            signal.connect (test.simple_handler_100)
+
+        signal.connect (replacing_handler)
+        signal.emit (1)
+
+        self.assert_(signal._handlers == [test.simple_handler_100])
+
+        signal.emit (2)
+        test.assert_results (1, 101, 102)
+
+
+
+class DeferredSignalTestCase (NotifyTestCase):
+
+    def test_flush (self):
+        test   = NotifyTestObject ()
+        signal = DeferredSignal ()
+
+        signal.connect (test.simple_handler)
+
+        signal.emit (1)
+        signal.emit (2)
+        signal.emit_many ([(3,)])
+
+        test.assert_results ()
+        self.assert_(signal.has_pending_emissions ())
+
+        self.assertEqual (signal.flush (), [None, None, None])
+        self.assert_(not signal.has_pending_emissions ())
+        self.assertEqual (signal.flush (), [])
+
+        test.assert_results (1, 2, 3)
+
+
+    def test_flush_with_keywords (self):
+        signal = DeferredSignal (AbstractSignal.LAST_VALUE)
+
+        signal.connect (lambda *arguments, **keywords: (arguments, keywords))
+
+        signal.emit (1)
+        signal.emit (2, x = 3)
+
+        self.assertEqual (signal.flush (), [((1,), {}), ((2,), { 'x': 3 })])
+
+
+    def test_deliver_last (self):
+        test   = NotifyTestObject ()
+        signal = DeferredSignal (policy = DeferredSignal.DELIVER_LAST)
+
+        signal.connect (test.simple_handler)
+
+        signal.emit (1)
+        signal.emit (2)
+        signal.emit (3)
+        signal.flush ()
+
+        test.assert_results (3)
+
+
+    def test_deliver_unique (self):
+        test   = NotifyTestObject ()
+        signal = DeferredSignal (policy = DeferredSignal.DELIVER_UNIQUE)
+
+        signal.connect (test.simple_keywords_handler)
+
+        signal.emit (1)
+        signal.emit ([])
+        signal.emit (2)
+        signal.emit (1)
+        signal.emit ([])
+        signal.emit (1, x = 2)
+        signal.emit (1, x = 2)
+        signal.flush ()
+
+        signal.emit (1)
+        signal.flush ()
+
+        test.assert_results ((1, {}), ([], {}), (2, {}), (1, { 'x': 2 }), (1, {}))
+
+
+    def test_emission_in_flush (self):
+        test   = NotifyTestObject ()
+        signal = DeferredSignal ()
+
+        def reemitting_handler (value):
+            test.simple_handler (value)
+            if value < 3:
+                signal.emit (value + 1)
+
+        signal.connect (reemitting_handler)
+
+        signal.emit (1)
+        signal.flush ()
+
+        test.assert_results (1)
+
+        signal.flush ()
+        signal.flush ()
+
+        test.assert_results (1, 2, 3)
+        self.assert_(not signal.has_pending_emissions ())
+
+
+    def test_invalid_policy (self):
+        self.assertRaises (ValueError, lambda: DeferredSignal (policy = 'first'))
+
+
+
+class BreadthFirstSignalTestCase (NotifyTestCase):
+
+    class BreadthFirstVariable (Variable):
+
+        def _create_signal (self):
+            signal = BreadthFirstSignal ()
+            return signal, signal
+
+
+    def test_order (self):
+        test    = NotifyTestObject ()
+        signal1 = BreadthFirstSignal ()
+        signal2 = BreadthFirstSignal ()
+
+        def emitting_handler (x):
+            if x < 2:
+                signal2.emit (x + 10)
+                signal1.emit (x + 1)
+
+        signal1.connect (test.simple_handler)
+        signal1.connect (emitting_handler)
+        signal1.connect (test.simple_handler_100)
+        signal2.connect (test.simple_handler)
+
+        signal1.emit (0)
+
+        test.assert_results (0, 100, 10, 1, 101, 11, 2, 102)
+
+
+    def test_return_values (self):
+        test   = NotifyTestObject ()
+        signal = BreadthFirstSignal (AbstractSignal.VALUE_LIST)
+
+        def emitting_handler (x):
+            if x == 0:
+                test.results.append (signal.emit (1))
+
+            return x
+
+        signal.connect (emitting_handler)
+
+        self.assertEqual (signal.emit (0), [0])
+        self.assertEqual (signal.emit_many ([(2,), (3,)]), [[2], [3]])
+        test.assert_results (None)
+
+
+    def test_long_chain (self):
+        test    = NotifyTestObject ()
+        signals = [BreadthFirstSignal () for k in range (sys.getrecursionlimit () * 2)]
+
+        def emitting_handler (signal, x):
+            signal.emit (x)
+
+        for k in range (len (signals) - 1):
+            signals[k].connect (emitting_handler, signals[k + 1])
+
+        signals[-1].connect (test.simple_handler)
+        signals[0].emit ('done')
+
+        test.assert_results ('done')
+
+
+    def test_synchronized_variables (self):
+        variables = [self.BreadthFirstVariable () for k in range (sys.getrecursionlimit () * 2)]
+
+        for k in range (len (variables) - 1):
+            variables[k + 1].synchronize (variables[k])
+
+        variables[0].value = 1
+        self.assertEqual (variables[-1].value, 1)
+
+        variables[-1].value = 2
+        self.assertEqual (variables[0].value, 2)
+
+
+    def test_emit_now_override (self):
+        test = NotifyTestObject ()
+
+        class CountingSignal (BreadthFirstSignal):
+
+            __slots__ = ()
+
+            def _emit_now (self, *arguments):
+                test.results.append (('emission',) + arguments)
+                return super (CountingSignal, self)._emit_now (*arguments)
+
+        signal = CountingSignal ()
+
+        def emitting_handler (x):
+            if x < 2:
+                signal.emit (x + 1)
+
+        signal.connect (emitting_handler)
+        signal.emit (0)
+
+        test.assert_results (('emission', 0), ('emission', 1), ('emission', 2))
+
+
+    def test_exception_discards_queue (self):
+        test   = NotifyTestObject ()
+        signal = BreadthFirstSignal ()
+
+        def raising_handler (x):
+            if x == 0:
+                signal.emit (1)
+                raise ValueError
+
+        signal.connect (raising_handler)
+        signal.connect (test.simple_handler)
+
+        original_handler = AbstractSignal.exception_handler
+
+        try:
+            AbstractSignal.exception_handler = AbstractSignal.reraising_exception_handler
+            self.assertRaises (ValueError, signal.emit, 0)
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+        signal.emit (2)
+        test.assert_results (2)
+
+
+
+# Note: we explicitly test protected field of `Signal' class, because there is nothing
+# public that indicates number of garbage-collected, but not yet removed handlers.  Yet we
+# want that a call to emit() does remove such handlers, so that list of signal handlers
+# doesn't grow over time if implicit disconnection is used.
+
+class HandlerGarbageCollectionTestCase (NotifyTestCase):
+
+    class HandlerObject (object):
+
+        def __init__(self, test):
+            self.__test = test
+
+        def simple_handler (self, *arguments):
+            self.__test.simple_handler (*arguments)
+
+
+    def test_handler_garbage_collection_1 (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+        signal.connect (handler.simple_handler)
+
+        self.assert_(signal._handlers is not None)
+
+        signal.emit (1)
+
+        del handler
+        self.collect_garbage ()
+
+        self.assert_(signal._handlers is not None)
+
+        signal.emit (2)
+
+        self.assert_(signal._handlers is None)
+        test.assert_results (1)
+
+
+    def test_handler_garbage_collection_2 (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        signal.connect (lambda *ignored: signal.stop_emission ())
+        signal.connect (handler.simple_handler)
+
+        self.assertEqual (len (signal._handlers), 2)
+
+        signal.emit (1)
+
+        del handler
+        self.collect_garbage ()
+
+        self.assertEqual (len (signal._handlers), 2)
+
+        signal.emit (2)
+
+        # Even though emission is stopped by the first handler, signal must still notice
+        # that it should remove the second one.
+        self.assertEqual (len (signal._handlers), 1)
+        test.assert_results ()
+
+
+    def test_handler_garbage_collection_3 (self):
+        test   = NotifyTestObject ()
+        signal = Signal (AbstractSignal.ANY_ACCEPTS)
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        def accepting_handler (*arguments):
+            test.simple_handler_100 (*arguments)
+            return arguments[0]
+
+        signal.connect (accepting_handler)
+        signal.connect (handler.simple_handler)
+
+        self.assertEqual (len (signal._handlers), 2)
+
+        signal.emit (1)
+
+        del handler
+        self.collect_garbage ()
+
+        self.assertEqual (len (signal._handlers), 2)
+
+        signal.emit (2)
+
+        # This time emission is stopped by accumulator, but still the gc-collected handler
+        # must be removed.
+        self.assertEqual (len (signal._handlers), 1)
+        test.assert_results (101, 102)
+
+
+
+class SignalFactoryTestCase (NotifyTestCase):
+
+    def test_connect_and_emit (self):
+        test    = NotifyTestObject ()
+        factory = SignalFactory ()
+
+        factory['create'].connect (test.simple_handler)
+        factory['create'].connect (test.simple_handler, 'x')
+        factory['delete'].connect (test.simple_handler_100)
+
+        factory['create'] (1)
+        factory['delete'].emit (2)
+        factory['modify'].emit (3)
+
+        self.assert_(factory['create'].has_handlers ())
+        self.assert_(not factory['modify'].has_handlers ())
+        self.assertEqual (factory['create'].count_handlers (), 2)
+
+        test.assert_results (1, ('x', 1), 102)
+
+
+    def test_equality (self):
+        factory = SignalFactory ()
+
+        self.assert_equal_thoroughly     (factory['a'], factory['a'])
+        self.assert_not_equal_thoroughly (factory['a'], factory['b'])
+        self.assert_not_equal_thoroughly (factory['a'], SignalFactory () ['a'])
+
+
+    def test_disconnect (self):
+        test    = NotifyTestObject ()
+        factory = SignalFactory ()
+        signal  = factory['signal']
+
+        signal.connect (test.simple_handler)
+        signal.connect (test.simple_handler, 'x')
+        signal.connect (test.simple_handler)
+
+        self.assert_(factory['signal'].is_connected (test.simple_handler, 'x'))
+        self.assert_(signal.disconnect (test.simple_handler, 'x'))
+        self.assert_(not signal.is_connected (test.simple_handler, 'x'))
+
+        signal.emit (1)
+
+        self.assert_(signal.disconnect_all (test.simple_handler))
+        self.assert_(not signal.disconnect (test.simple_handler))
+
+        signal.emit (2)
+
+        self.assertEqual (factory._SignalFactory__handlers, {})
+        test.assert_results (1, 1)
+
+
+    def test_block (self):
+        test    = NotifyTestObject ()
+        factory = SignalFactory ()
+        signal  = factory['signal']
+
+        signal.connect (test.simple_handler)
+        factory['other'].connect (test.simple_handler)
+
+        self.assert_(not signal.block (test.simple_handler, 'x'))
+        self.assert_(signal.block (test.simple_handler))
+        self.assert_(factory['signal'].is_blocked (test.simple_handler))
+        self.assert_(not factory['other'].is_blocked (test.simple_handler))
+
+        signal.emit (1)
+        factory['other'].emit (2)
+
+        self.assert_(signal.unblock (test.simple_handler))
+        self.assert_(not signal.unblock (test.simple_handler))
+
+        signal.emit (3)
+
+        self.assertEqual (factory._SignalFactory__blocked_handlers, {})
+        test.assert_results (2, 3)
+
+
+    def test_accumulators (self):
+        factory = SignalFactory (accumulators = { 'values': AbstractSignal.VALUE_LIST })
+
+        factory['values'].connect (lambda: 1)
+        factory['values'].connect (lambda: 2)
+        factory['plain'] .connect (lambda: 3)
+
+        self.assertEqual (factory['values'].emit (),               [1, 2])
+        self.assertEqual (factory['values'].emit_many ([(), ()]), [[1, 2], [1, 2]])
+        self.assertEqual (factory['plain'] .emit (),               None)
+
+
+    def test_stop_emission (self):
+        test    = NotifyTestObject ()
+        factory = SignalFactory ()
+
+        def stop (*arguments):
+            test.results.append ((factory['a'].emission_level, factory['b'].emission_level))
+            factory['a'].stop_emission ()
+
+        factory['a'].connect (stop)
+        factory['a'].connect (test.simple_handler)
+
+        factory['a'].emit (1)
+
+        self.assert_(not factory['a'].emission_stopped)
+        test.assert_results ((1, 0))
+
+
+    def test_names (self):
+        factory = SignalFactory (names = ('create', 'delete'))
+
+        names = list (factory.names)
+        names.sort ()
+
+        self.assertEqual (names, ['create', 'delete'])
+        self.assertEqual (SignalFactory ().names, None)
+
+        factory['create']
+        self.assertRaises (KeyError, lambda: factory['modify'])
+
+        self.assertRaises (ValueError, SignalFactory, ('a',), { 'b': AbstractSignal.LAST_VALUE })
+        self.assertRaises (TypeError,  SignalFactory, None, { 'b': None })
+
+
+    def test_handler_garbage_collection (self):
+        test    = NotifyTestObject ()
+        factory = SignalFactory ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+        factory['signal'].connect (handler.simple_handler)
+
+        factory['signal'].emit (1)
+
+        del handler
+        self.collect_garbage ()
+
+        self.assert_(not factory['signal'].has_handlers ())
+        self.assertEqual (factory._SignalFactory__handlers, {})
+
+        test.assert_results (1)
+
+
+    def test_no_reference_cycles (self):
+        test      = NotifyTestObject ()
+        factory   = SignalFactory ()
+        reference = weakref.ref (factory)
+
+        factory['signal'].connect (test.simple_handler)
+
+        # Reference counting alone must be enough to free the factory.
+        gc.disable ()
+        try:
+            del factory
+            self.assert_(reference () is None)
+        finally:
+            gc.enable ()
+
+
+    def test_name_sets (self):
+        from notify.signal import _factory_name_sets
+
+        factory1 = SignalFactory (names = ('dynamic-1', 'dynamic-2'))
+        factory2 = SignalFactory (names = ('dynamic-1', 'dynamic-2'))
+
+        self.assert_(factory1._SignalFactory__names is factory2._SignalFactory__names)
+        self.assert_(('dynamic-1', 'dynamic-2') in _factory_name_sets)
+
+        del factory1, factory2
+        self.collect_garbage ()
+
+        self.assert_(('dynamic-1', 'dynamic-2') not in _factory_name_sets)
+
+
+
+class TopicSignalTestCase (NotifyTestCase):
+
+    def test_exact_topic (self):
+        test   = NotifyTestObject ()
+        topics = TopicSignal ()
+
+        topics.connect ('order.1.filled', test.simple_handler)
+
+        topics.emit ('order.1.filled', 10)
+        topics.emit ('order.2.filled', 20)
+        topics.emit ('order.1', 30)
+
+        test.assert_results (('order.1.filled', 10))
+
+
+    def test_wildcards (self):
+        test   = NotifyTestObject ()
+        topics = TopicSignal ()
+
+        topics.connect ('order.*.filled', test.simple_handler, '*')
+        topics.connect ('order.#',        test.simple_handler, '#')
+        topics.connect ('#.filled',       test.simple_handler, '#f')
+
+        topics.emit ('order.1.filled')
+        topics.emit ('order.1.cancelled')
+        topics.emit ('order')
+        topics.emit ('trade.filled')
+        topics.emit ('order.1.2.filled')
+
+        test.assert_results (('*', 'order.1.filled'),
+                             ('#', 'order.1.filled'),
+                             ('#f', 'order.1.filled'),
+                             ('#', 'order.1.cancelled'),
+                             ('#', 'order'),
+                             ('#f', 'trade.filled'),
+                             ('#', 'order.1.2.filled'),
+                             ('#f', 'order.1.2.filled'))
+
+
+    def test_matching_order (self):
+        test   = NotifyTestObject ()
+        topics = TopicSignal ()
+
+        topics.connect ('#',     test.simple_handler, 3)
+        topics.connect ('a.*',   test.simple_handler, 2)
+        topics.connect ('#.#',   test.simple_handler, 4)
+        topics.connect ('a.b',   test.simple_handler, 1)
+        topics.connect ('a.b',   test.simple_handler, 1.5)
+
+        topics.emit ('a.b')
+
+        test.assert_results ((1, 'a.b'), (1.5, 'a.b'), (2, 'a.b'), (3, 'a.b'), (4, 'a.b'))
+
+
+    def test_separator (self):
+        test   = NotifyTestObject ()
+        topics = TopicSignal ('/')
+
+        topics.connect ('a/*', test.simple_handler)
+        topics.emit ('a/b')
+        topics.emit ('a.b')
+
+        self.assertEqual (topics.separator, '/')
+        self.assertRaises (ValueError, lambda: TopicSignal (''))
+        test.assert_results ('a/b')
+
+
+    def test_invalid_topics (self):
+        topics = TopicSignal ()
+
+        self.assertRaises (ValueError, lambda: topics.connect ('a..b', lambda *arguments: None))
+        self.assertRaises (ValueError, lambda: topics.emit ('a.*'))
+        self.assertRaises (ValueError, lambda: topics.emit ('a.#'))
+        self.assertRaises (ValueError, lambda: topics.emit (''))
+
+
+    def test_disconnect (self):
+        test   = NotifyTestObject ()
+        topics = TopicSignal ()
+
+        topics.connect ('a.*', test.simple_handler)
+        topics.connect ('a.*', test.simple_handler)
+        topics.connect ('a.#', test.simple_handler_100, 0)
+
+        self.assert_(topics.is_connected ('a.*', test.simple_handler))
+        self.assert_(not topics.is_connected ('a.b', test.simple_handler))
+        self.assert_(not topics.disconnect ('b', test.simple_handler))
+
+        self.assert_(topics.disconnect ('a.*', test.simple_handler))
+        self.assert_(topics.is_connected ('a.*', test.simple_handler))
+        self.assert_(topics.disconnect_all ('a.*', test.simple_handler))
+        self.assert_(not topics.is_connected ('a.*', test.simple_handler))
+
+        self.assertEqual (topics.patterns (), ['a.#'])
+
+        self.assert_(topics.disconnect ('a.#', test.simple_handler_100, 0))
+        self.assert_(not topics.has_handlers ())
+        self.assertEqual (topics.patterns (), [])
+
+
+    def test_pattern_signal (self):
+        test   = NotifyTestObject ()
+        topics = TopicSignal ()
+
+        topics.connect ('a.*', test.simple_handler)
+        topics['a.*'].block (test.simple_handler)
+        topics.emit ('a.b', 1)
+
+        topics['a.*'].unblock (test.simple_handler)
+        topics.emit ('a.b', 2)
+
+        self.assert_(topics.connect_safe ('x', test.simple_handler))
+        self.assert_(not topics.connect_safe ('x', test.simple_handler))
+
+        test.assert_results (('a.b', 2))
+
+
+    def test_stop_emission (self):
+        test   = NotifyTestObject ()
+        topics = TopicSignal ()
+
+        def stopping_handler (topic):
+            self.assertEqual (topics.emission_level, 1)
+            self.assert_(topics.stop_emission ())
+            self.assert_(topics.emission_stopped)
+
+        topics.connect ('a', stopping_handler)
+        topics.connect ('a', test.simple_handler)
+        topics.connect ('#', test.simple_handler)
+
+        topics.emit ('a')
+
+        self.assert_(not topics.stop_emission ())
+        self.assertEqual (topics.emission_level, 0)
+        test.assert_results ()
+
+
+    def test_collect_garbage (self):
+        topics = TopicSignal ()
+
+        topics['a.b.c']
+        topics['a.*']
+        self.assert_(not topics.has_handlers ())
+
+        topics.collect_garbage ()
+        self.assertEqual (topics._TopicSignal__root.children, {})
+
+
+
+class SnapshotSignalTestCase (NotifyTestCase):
+
+    def test_connect_and_disconnect (self):
+        test   = NotifyTestObject ()
+        signal = SnapshotSignal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (test.simple_handler, 'x')
+        signal.emit (1)
+
+        self.assert_(signal.disconnect (test.simple_handler))
+        signal.emit (2)
+
+        self.assert_(signal.disconnect_all (test.simple_handler, 'x'))
+        signal.emit (3)
+
+        self.assert_(signal._handlers is None)
+        test.assert_results (1, ('x', 1), ('x', 2))
+
+
+    def test_block (self):
+        test   = NotifyTestObject ()
+        signal = SnapshotSignal ()
+
+        signal.connect (test.simple_handler)
+        signal.block   (test.simple_handler)
+        signal.emit    (1)
+
+        signal.unblock (test.simple_handler)
+        signal.emit    (2)
+
+        test.assert_results (2)
+
+
+    def test_connect_during_emission (self):
+        test   = NotifyTestObject ()
+        signal = SnapshotSignal ()
+
+        signal.connect (lambda *ignored: signal.connect (test.simple_handler))
+        signal.emit (1)
+        signal.emit (2)
+
+        # Handler connected during the first emission is not called by it.
+        test.assert_results (2)
+
+
+    def test_disconnect_during_emission (self):
+        test   = NotifyTestObject ()
+        signal = SnapshotSignal ()
+
+        signal.connect (lambda *ignored: signal.disconnect (test.simple_handler))
+        signal.connect (test.simple_handler)
+        signal.emit (1)
+        signal.emit (2)
+
+        # Handler disconnected during the first emission is still called by it.
+        test.assert_results (1)
+        self.assertEqual (len (signal._handlers), 1)
+
+
+    def test_accumulator (self):
+        signal = SnapshotSignal (AbstractSignal.VALUE_LIST)
+
+        signal.connect (lambda x: x)
+        signal.connect (lambda x: x * 2)
+
+        self.assertEqual (signal.emit (5), [5, 10])
+
+
+    def test_handler_garbage_collection (self):
+        test   = NotifyTestObject ()
+        signal = SnapshotSignal ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+        signal.connect (handler.simple_handler)
+
+        signal.emit (1)
+
+        del handler
+        self.collect_garbage ()
+
+        # Unlike with `Signal', the handler is removed without waiting for emission.
+        self.assert_(signal._handlers is None)
+        test.assert_results (1)
+
+
+
+class PrioritySignalTestCase (NotifyTestCase):
+
+    def test_connect (self):
+        test   = NotifyTestObject ()
+        signal = PrioritySignal ()
+
+        signal.connect (test.simple_handler, 'a')
+        signal.connect (test.simple_handler, 'b', priority = 10)
+        signal.connect (test.simple_handler, 'c', priority = -5)
+        signal.connect (test.simple_handler, 'd')
+        signal.connect (test.simple_handler, 'e', priority = 10)
+
+        signal.emit ()
+
+        test.assert_results ('b', 'e', 'a', 'd', 'c')
+
+
+    def test_connect_safe (self):
+        test   = NotifyTestObject ()
+        signal = PrioritySignal ()
+
+        self.assert_(    signal.connect_safe (test.simple_handler, 'a'))
+        self.assert_(    signal.connect_safe (test.simple_handler, 'b', priority = 1))
+        self.assert_(not signal.connect_safe (test.simple_handler, 'a', priority = 2))
+
+        signal.emit ()
+
+        test.assert_results ('b', 'a')
+
+
+    def test_modify_during_emission (self):
+        test   = NotifyTestObject ()
+        signal = PrioritySignal ()
+
+        def modifying_handler (value):
+            if value == 1:
+                signal.connect      (test.simple_handler, 'new', priority = 20)
+                signal.disconnect   (test.simple_handler, 'low')
+                signal.set_priority (30, test.simple_handler, 'middle')
+                signal.block        (test.simple_handler, 'blocked')
+
+        signal.connect (test.simple_handler, 'high',    priority = 10)
+        signal.connect (modifying_handler,              priority = 5)
+        signal.connect (test.simple_handler, 'middle')
+        signal.connect (test.simple_handler, 'blocked')
+        signal.connect (test.simple_handler, 'low',     priority = -10)
+
+        # Like with `SnapshotSignal', only blocking affects the current emission.
+        signal.emit (1)
+        self.assertEqual (test.results, [('high', 1), ('middle', 1), ('low', 1)])
+
+        test.results = []
+        signal.emit (2)
+        test.assert_results (('middle', 2), ('new', 2), ('high', 2))
+
+
+    def test_connect_with_keywords (self):
+        test   = NotifyTestObject ()
+        signal = PrioritySignal ()
+
+        signal.connect (test.simple_keywords_handler, x = 1)
+        signal.connect (test.simple_keywords_handler, y = 2, priority = 1)
+
+        signal.emit ()
+
+        test.assert_results ({ 'y': 2 }, { 'x': 1 })
+
+
+    def test_disconnect (self):
+        test   = NotifyTestObject ()
+        signal = PrioritySignal ()
+
+        signal.connect (test.simple_handler, 'a', priority = 1)
+        signal.connect (test.simple_handler, 'b', priority = 2)
+        signal.connect (test.simple_handler, 'a', priority = 3)
+        signal.connect (test.simple_handler, 'c')
+
+        # The last of equal handlers, i.e. the one with lower priority, is disconnected.
+        self.assert_(signal.disconnect (test.simple_handler, 'a'))
+        self.assertEqual (signal.get_priority (test.simple_handler, 'a'), 3)
+
+        signal.connect (test.simple_handler, 'd', priority = 2)
+        signal.emit ()
+
+        self.assert_(signal.disconnect_all (test.simple_handler, 'b'))
+        signal.connect (test.simple_handler, 'e', priority = 1)
+        signal.emit ()
+
+        test.assert_results ('a', 'b', 'd', 'c',
+                             'a', 'd', 'e', 'c')
+
+
+    def test_set_priority (self):
+        test   = NotifyTestObject ()
+        signal = PrioritySignal ()
+
+        signal.connect (test.simple_handler, 'a')
+        signal.connect (test.simple_handler, 'b')
+        signal.connect (test.simple_handler, 'c')
+
+        signal.block (test.simple_handler, 'c')
+
+        self.assert_(signal.set_priority (1, test.simple_handler, 'b'))
+        self.assert_(signal.set_priority (1, test.simple_handler, 'c'))
+        self.assert_(not signal.set_priority (1, test.simple_handler, 'd'))
+
+        self.assertEqual (signal.get_priority (test.simple_handler, 'a'), 0)
+        self.assertEqual (signal.get_priority (test.simple_handler, 'c'), 1)
+        self.assertEqual (signal.get_priority (test.simple_handler, 'd'), None)
+
+        signal.emit ()
+
+        signal.unblock (test.simple_handler, 'c')
+        signal.set_priority (2, test.simple_handler, 'a')
+        signal.emit ()
+
+        test.assert_results ('b', 'a',
+                             'a', 'b', 'c')
+
+
+    def test_handler_garbage_collection (self):
+        test   = NotifyTestObject ()
+        signal = PrioritySignal ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        signal.connect (test.simple_handler, 'a', priority = 1)
+        signal.connect (handler.simple_handler, 'b', priority = 2)
+        signal.connect (test.simple_handler, 'c')
+
+        del handler
+        self.collect_garbage ()
+
+        self.assertEqual (len (signal._handlers), 2)
+
+        signal.connect (test.simple_handler, 'd', priority = 1)
+        signal.emit ()
+
+        test.assert_results ('a', 'd', 'c')
+
+
+
+# Note: the index is only maintained for signals with many handlers, so these tests
+# connect more than enough of them.  We also check protected field `_handler_index' to
+# make sure the index is really used.
+
+class IndexedSignalTestCase (NotifyTestCase):
+
+    NUM_HANDLERS = 50
+
+
+    def test_connect_and_disconnect (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        for k in range (self.NUM_HANDLERS):
+            signal.connect (test.simple_handler, k)
+
+        self.assert_(signal._handler_index is not None)
+        self.assert_(signal.is_connected (test.simple_handler, 10))
+        self.assert_(not signal.is_connected (test.simple_handler, self.NUM_HANDLERS))
+        self.assert_(not signal.connect_safe (test.simple_handler, 10))
+
+        for k in range (self.NUM_HANDLERS):
+            if k != 10:
+                self.assert_(signal.disconnect (test.simple_handler, k))
+
+        self.assert_(not signal.disconnect (test.simple_handler, 0))
+        self.assertEqual (len (signal._handlers), 1)
+
+        signal.emit ()
+
+        self.assert_(signal.disconnect (test.simple_handler, 10))
+        self.assert_(signal._handlers is None)
+        self.assert_(signal._handler_index is None)
+
+        test.assert_results (10)
+
+
+    def test_disconnect_last_equal (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler, 'a')
+        for k in range (self.NUM_HANDLERS):
+            signal.connect (test.simple_handler_100, k)
+        signal.connect (test.simple_handler, 'a')
+
+        self.assert_(signal.block      (test.simple_handler, 'a'))
+        self.assert_(signal.disconnect (test.simple_handler, 'a'))
+        self.assert_(signal.is_blocked (test.simple_handler, 'a'))
+
+        self.assert_(signal.disconnect_all (test.simple_handler_100, 5))
+        self.assert_(signal.unblock        (test.simple_handler, 'a'))
+
+        signal.connect (test.simple_handler, 'b')
+        for k in range (self.NUM_HANDLERS):
+            self.assertEqual (signal.disconnect (test.simple_handler_100, k), k != 5)
+
+        signal.emit (1)
+
+        test.assert_results (('a', 1), ('b', 1))
+
+
+    def test_disconnect_during_emission (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        def disconnecting_handler (*ignored):
+            for k in range (self.NUM_HANDLERS):
+                if k != 3:
+                    signal.disconnect (test.simple_handler, k)
+
+        signal.connect (disconnecting_handler)
+        for k in range (self.NUM_HANDLERS):
+            signal.connect (test.simple_handler, k)
+
+        signal.emit (3)
+        signal.emit (4)
+
+        self.assertEqual (len (signal._handlers), 2)
+        test.assert_results ((3, 3), (3, 4))
+
+
+    def test_unhashable_handler (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        for k in range (self.NUM_HANDLERS):
+            signal.connect (test.simple_handler, k)
+
+        signal.disconnect (test.simple_handler, 0)
+        signal.connect    (test.simple_handler, [])
+
+        self.assert_(signal._handler_index is None)
+        self.assertEqual (len (signal._handlers), self.NUM_HANDLERS)
+
+        self.assert_(signal.is_connected (test.simple_handler, 1))
+        self.assert_(signal.disconnect   (test.simple_handler, []))
+
+
+    def test_handler_garbage_collection (self):
+        test   = NotifyTestObject ()
+        signal = CleanSignal ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        for k in range (self.NUM_HANDLERS):
+            signal.connect (test.simple_handler, k)
+        signal.connect (handler.simple_handler)
+
+        del handler
+        self.collect_garbage ()
+
+        self.assertEqual (signal._handler_index.num_handlers, self.NUM_HANDLERS)
+        self.assert_(signal.disconnect (test.simple_handler, self.NUM_HANDLERS - 1))
+
+
+
+# Note: we check protected field of `CompilingSignal' to verify that the dispatcher is
+# really compiled or invalidated.
+
+class CompilingSignalTestCase (NotifyTestCase):
+
+    NUM_EMISSIONS = 20
+
+
+    def test_compilation (self):
+        test   = NotifyTestObject ()
+        signal = CompilingSignal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (test.simple_handler_100)
+
+        for k in range (self.NUM_EMISSIONS):
+            signal.emit (k)
+
+        self.assert_(signal._CompilingSignal__dispatcher is not None)
+
+        test.results = []
+        signal.emit (1)
+        signal.emit (2)
+
+        test.assert_results (1, 101, 2, 102)
+
+
+    def test_invalidation (self):
+        test   = NotifyTestObject ()
+        signal = self.__create_compiled_signal (test)
+
+        signal.connect (test.simple_handler_200)
+        self.assert_(signal._CompilingSignal__dispatcher is None)
+
+        signal = self.__create_compiled_signal (test)
+
+        signal.block (test.simple_handler)
+        self.assert_(signal._CompilingSignal__dispatcher is None)
+
+        signal.emit (1)
+        test.assert_results (101)
+
+
+    def test_disconnect_in_emission (self):
+        test   = NotifyTestObject ()
+        signal = CompilingSignal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (lambda value: value == 1 and signal.disconnect (test.simple_handler_100))
+        signal.connect (test.simple_handler_100)
+        signal.connect (test.simple_handler_200)
+
+        for k in range (self.NUM_EMISSIONS):
+            signal.emit (k + 2)
+
+        self.assert_(signal._CompilingSignal__dispatcher is not None)
+
+        test.results = []
+        signal.emit (1)
+        signal.emit (2)
+
+        self.assertEqual (len (signal._handlers), 3)
+        test.assert_results (1, 201, 2, 202)
+
+
+    def test_stop_emission (self):
+        test   = NotifyTestObject ()
+        signal = CompilingSignal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (lambda value: value == 1 and signal.stop_emission ())
+        signal.connect (test.simple_handler_100)
+
+        for k in range (self.NUM_EMISSIONS):
+            signal.emit (k + 2)
+
+        test.results = []
+        signal.emit (1)
+        signal.emit (2)
+
+        self.assertEqual (signal.emission_level, 0)
+        test.assert_results (1, 2, 102)
+
+
+    def test_accumulator (self):
+        signal = CompilingSignal (AbstractSignal.ANY_ACCEPTS)
+
+        signal.connect (lambda value: value > 10)
+        signal.connect (lambda value: 1 // value == 2)
+        signal.connect (lambda value: value < 0)
+
+        original_exception_handler = AbstractSignal.exception_handler
+
+        try:
+            AbstractSignal.exception_handler = AbstractSignal.ignoring_exception_handler
+
+            for k in range (self.NUM_EMISSIONS):
+                self.assertEqual (signal.emit (k + 1), k + 1 > 10)
+
+            self.assert_(signal._CompilingSignal__dispatcher is not None)
+
+            self.assertEqual (signal.emit (0),  False)
+            self.assertEqual (signal.emit (20), True)
+            self.assertEqual (signal.emit (-1), True)
+        finally:
+            AbstractSignal.exception_handler = original_exception_handler
+
+
+    def test_value_list_accumulator (self):
+        signal = CompilingSignal (AbstractSignal.VALUE_LIST)
+
+        signal.connect (lambda value: value)
+        signal.connect (lambda value: -value)
+
+        for k in range (self.NUM_EMISSIONS):
+            self.assertEqual (signal.emit (k), [k, -k])
+
+        self.assert_(signal._CompilingSignal__dispatcher is not None)
+        self.assertEqual (signal.emit (5), [5, -5])
+
+
+    def test_all_accept_accumulator (self):
+        test   = NotifyTestObject ()
+        signal = CompilingSignal (AbstractSignal.ALL_ACCEPT)
+
+        signal.connect (lambda value: value)
+        signal.connect (test.simple_handler)
+
+        for k in range (self.NUM_EMISSIONS):
+            signal.emit (k + 1)
+
+        self.assert_(signal._CompilingSignal__dispatcher is not None)
+
+        test.results = []
+        self.assertEqual (signal.emit (0), 0)
+        self.assertEqual (signal.emit (3), None)
+        test.assert_results (3)
+
+
+    def test_handler_garbage_collection (self):
+        test   = NotifyTestObject ()
+        signal = CompilingSignal ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        signal.connect (handler.simple_handler)
+        signal.connect (test.simple_handler_100)
+
+        for k in range (self.NUM_EMISSIONS):
+            signal.emit (k)
+
+        self.assert_(signal._CompilingSignal__dispatcher is not None)
+
+        del handler
+        self.collect_garbage ()
+
+        self.assert_(signal._CompilingSignal__dispatcher is None)
+
+        test.results = []
+        signal.emit (1)
+
+        self.assertEqual (len (signal._handlers), 1)
+        test.assert_results (101)
+
+
+    def __create_compiled_signal (self, test):
+        signal = CompilingSignal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (test.simple_handler_100)
+
+        for k in range (self.NUM_EMISSIONS):
+            signal.emit (k)
+
+        self.assert_(signal._CompilingSignal__dispatcher is not None)
+
+        test.results = []
+        return signal
+
+
+
+class ThreadSafeSignalTestCase (NotifyTestCase):
+
+    NUM_THREADS = 4
+
+
+    def run_in_threads (self, function):
+        threads = [threading.Thread (target = function, args = (k,))
+                   for k in range (self.NUM_THREADS)]
+
+        for thread in threads:
+            thread.start ()
+        for thread in threads:
+            thread.join ()
+
+
+    def test_connect_and_emit (self):
+        test   = NotifyTestObject ()
+        signal = ThreadSafeSignal (AbstractSignal.VALUE_LIST)
+
+        signal.connect (lambda value: value)
+        signal.connect (test.simple_handler)
+        signal.block   (test.simple_handler)
+
+        self.assertEqual (signal.emit (1),               [1])
+        self.assertEqual (signal.emit_many ([(2,), (3,)]), [[2], [3]])
+
+        signal.unblock    (test.simple_handler)
+        signal.disconnect (test.simple_handler)
+        signal.connect    (test.simple_handler)
+        signal.emit       (4)
+
+        test.assert_results (4)
+
+
+    def test_blocking_copies (self):
+        test   = NotifyTestObject ()
+        signal = ThreadSafeSignal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (test.simple_handler, [])
+        signal.block   (test.simple_handler)
+        signal.block   (test.simple_handler, [])
+
+        # Emission may be using the old value at the same time, so it must stay intact.
+        blocked_handlers = signal._blocked_handlers
+        contents         = {}
+
+        for key, value in blocked_handlers.items ():
+            if type (value) is list:
+                value = list (value)
+
+            contents[key] = value
+
+        signal.block      (test.simple_handler)
+        signal.unblock    (test.simple_handler, [])
+        signal.disconnect (test.simple_handler)
+
+        self.assertEqual (blocked_handlers, contents)
+        self.assert_(signal._blocked_handlers is not blocked_handlers)
+
+        signal.emit (1)
+        test.assert_results (([], 1))
+
+
+    def test_concurrent_connection (self):
+        test   = NotifyTestObject ()
+        signal = ThreadSafeSignal ()
+
+        def connect_handlers (thread_index):
+            for k in range (100):
+                signal.connect (test.simple_handler, thread_index, k)
+
+        self.run_in_threads (connect_handlers)
+        self.assertEqual (signal.count_handlers (), 100 * self.NUM_THREADS)
+
+        def disconnect_handlers (thread_index):
+            for k in range (100):
+                signal.disconnect (test.simple_handler, thread_index, k)
+
+        self.run_in_threads (disconnect_handlers)
+        self.assert_(signal._handlers is None)
+
+
+    def test_concurrent_emission (self):
+        test   = NotifyTestObject ()
+        signal = ThreadSafeSignal ()
+
+        signal.connect (test.simple_handler)
+
+        def emit (thread_index):
+            for k in range (100):
+                signal.emit (thread_index)
+
+        self.run_in_threads (emit)
+
+        test.results.sort ()
+        self.assertEqual (test.results,
+                          [k for k in range (self.NUM_THREADS) for repeat in range (100)])
+
+
+    def test_emission_level_per_thread (self):
+        test   = NotifyTestObject ()
+        signal = ThreadSafeSignal ()
+
+        def handler (value):
+            test.results.append ((value, signal.emission_level))
+            if value == 'main':
+                self.run_in_threads (lambda thread_index: signal.emit ('thread'))
+
+        signal.connect (handler)
+        signal.emit ('main')
+
+        self.assertEqual (signal.emission_level, 0)
+        test.assert_results (*([('main', 1)] + [('thread', 1)] * self.NUM_THREADS))
+
+
+    def test_stop_emission (self):
+        test   = NotifyTestObject ()
+        signal = ThreadSafeSignal ()
+        stops  = []
+
+        def handler (value):
+            if value == 'main':
+                self.run_in_threads (lambda thread_index: stops.append (signal.stop_emission ()))
+                self.assert_(not signal.emission_stopped)
+                signal.stop_emission ()
+                self.assert_(signal.emission_stopped)
+
+        signal.connect (handler)
+        signal.connect (test.simple_handler)
+        signal.emit ('main')
+        signal.emit ('other')
+
+        # Other threads are not in emission, so they cannot stop it.
+        self.assertEqual (stops, [False] * self.NUM_THREADS)
+        self.assert_(not signal.emission_stopped)
+        test.assert_results ('other')
+
+
+
+class QueuedConnectionTestCase (NotifyTestCase):
+
+    def test_deliver (self):
+        test   = NotifyTestObject ()
+        signal = Signal (AbstractSignal.VALUE_LIST)
+        queue  = DeliveryQueue ()
+
+        signal.connect_queued (queue, test.simple_handler)
+        signal.connect_queued (queue, test.simple_handler, 'x')
+
+        self.assertEqual (signal.emit (1), [None, None])
+        signal.emit (2)
+
+        test.assert_results ()
+        self.assertEqual (len (queue), 4)
+
+        self.assertEqual (queue.deliver (3), 3)
+        self.assertEqual (queue.deliver (),  1)
+        self.assertEqual (queue.deliver (),  0)
+
+        test.assert_results (1, ('x', 1), 2, ('x', 2))
+
+
+    def test_connection (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+        queue  = DeliveryQueue ()
+
+        signal.connect_queued (queue, test.simple_handler, 'x')
+        self.assert_(signal.is_connected (test.simple_handler, 'x'))
+
+        signal.block (test.simple_handler, 'x')
+        signal.emit (1)
+
+        signal.unblock (test.simple_handler, 'x')
+        signal.emit (2)
+
+        self.assert_(signal.disconnect (test.simple_handler, 'x'))
+        signal.emit (3)
+
+        queue.deliver ()
+
+        self.assert_(signal._handlers is None)
+        test.assert_results (('x', 2))
+
+
+    def test_invalid_arguments (self):
+        self.assertRaises (TypeError,  Signal ().connect_queued, None, lambda: None)
+        self.assertRaises (ValueError, DeliveryQueue, -1)
+        self.assertRaises (ValueError, DeliveryQueue, 1, 'ignore')
+
+
+    def test_drop_oldest (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+        queue  = DeliveryQueue (2, DeliveryQueue.DROP_OLDEST)
+
+        signal.connect_queued (queue, test.simple_handler)
+
+        for k in range (5):
+            signal.emit (k)
+
+        queue.deliver ()
+
+        test.assert_results (3, 4)
+
+
+    def test_coalesce (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+        queue  = DeliveryQueue (policy = DeliveryQueue.COALESCE)
+
+        signal.connect_queued (queue, test.simple_handler)
+        signal.connect_queued (queue, test.simple_handler_100)
+
+        for k in range (5):
+            signal.emit (k)
+
+        self.assertEqual (len (queue), 2)
+        queue.deliver ()
+
+        test.assert_results (4, 104)
+
+
+    def test_block (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+        queue  = DeliveryQueue (1, DeliveryQueue.BLOCK)
+
+        signal.connect_queued (queue, test.simple_handler)
+
+        def produce ():
+            for k in range (10):
+                signal.emit (k)
+
+        producer = threading.Thread (target = produce)
+        producer.start ()
+
+        num_delivered = 0
+        while num_delivered < 10:
+            self.assert_(len (queue) <= 1)
+            num_delivered += queue.deliver ()
+
+        producer.join ()
+
+        test.assert_results (*range (10))
+
+
+    def test_executor (self):
+
+        class Executor (object):
+
+            def __init__(self):
+                self.tasks = []
+
+            def submit (self, function):
+                self.tasks.append (function)
+
+
+        test     = NotifyTestObject ()
+        signal   = Signal ()
+        executor = Executor ()
+        queue    = DeliveryQueue (executor = executor)
+
+        signal.connect_queued (queue, test.simple_handler)
+        signal.emit (1)
+        signal.emit (2)
+
+        # Delivery is scheduled only once.
+        self.assertEqual (len (executor.tasks), 1)
+
+        executor.tasks.pop () ()
+        signal.emit (3)
+
+        self.assertEqual (len (executor.tasks), 1)
+        executor.tasks.pop () ()
+
+        test.assert_results (1, 2, 3)
+
+
+    def test_exception_handler (self):
+        signal     = Signal ()
+        queue      = DeliveryQueue ()
+        exceptions = []
+
+        def raising_handler (*arguments):
+            raise Exception
+
+        signal.connect_queued (queue, raising_handler)
+        signal.emit ()
+
+        original_exception_handler = AbstractSignal.exception_handler
+
+        try:
+            AbstractSignal.exception_handler = \
+                lambda signal, exception, handler: exceptions.append ((signal, handler))
+
+            queue.deliver ()
+        finally:
+            AbstractSignal.exception_handler = original_exception_handler
+
+        self.assertEqual (exceptions, [(signal, raising_handler)])
+
+
+    def test_handler_garbage_collection (self):
+        test   = NotifyTestObject ()
+        signal = CleanSignal ()
+        queue  = DeliveryQueue ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+        signal.connect_queued (queue, handler.simple_handler)
+
+        signal.emit (1)
+
+        del handler
+        self.collect_garbage ()
+
+        # The handler is removed right away, even though there is a pending call.
+        self.assert_(signal._handlers is None)
+        self.assertEqual (queue.deliver (), 1)
+
+        test.assert_results ()
+
+
+
+class ParallelSignalTestCase (NotifyTestCase):
+
+    # Stand-in for `concurrent.futures.ThreadPoolExecutor', not available before Python
+    # 3.2: runs each task in a new thread.  If `lazy', tasks are instead run only when
+    # their result is requested, to make cancellation deterministic.
+    class Executor (object):
+
+        def __init__(self, lazy = False):
+            self.lazy  = lazy
+            self.tasks = []
+
+        def submit (self, function, *arguments, **keywords):
+            future = ParallelSignalTestCase.Future (function, arguments, keywords)
+            self.tasks.append (future)
+
+            if not self.lazy:
+                future.started = True
+                future.thread  = threading.Thread (target = future.run)
+                future.thread.start ()
+
+            return future
+
+
+    class Future (object):
+
+        def __init__(self, function, arguments, keywords):
+            self.call      = (function, arguments, keywords)
+            self.thread    = None
+            self.finished  = threading.Event ()
+            self.started   = False
+            self.cancelled = False
+            self.value     = None
+            self.exception = None
+
+        def run (self):
+            function, arguments, keywords = self.call
+            try:
+                self.value = function (*arguments, **keywords)
+            except:
+                self.exception = sys.exc_info () [1]
+
+            self.finished.set ()
+
+        def result (self, timeout = None):
+            if not self.started:
+                self.started = True
+                self.run ()
+
+            self.finished.wait (timeout)
+            if not self.finished.isSet ():
+                raise RuntimeError ('timed out')
+
+            # The thread may still reference the handler, which would confuse garbage
+            # counting at the end of tests.
+            if self.thread is not None:
+                self.thread.join ()
+
+            if self.exception is not None:
+                raise self.exception
+
+            return self.value
+
+        def cancel (self):
+            self.cancelled = True
+
+
+    def test_emission (self):
+        test   = NotifyTestObject ()
+        signal = ParallelSignal (AbstractSignal.VALUE_LIST, executor = self.Executor ())
+
+        signal.connect (lambda value: value * 2)
+        signal.connect (test.simple_handler)
+        signal.connect (lambda value: value * 3)
+
+        self.assertEqual (signal.emit (1), [2, None, 3])
+        self.assertEqual (signal.emit_many ([(2,), (3,)]), [[4, None, 6], [6, None, 9]])
+
+        signal.block (test.simple_handler)
+        self.assertEqual (signal.emit (4), [8, 12])
+
+        test.assert_results (1, 2, 3)
+
+
+    def test_parallelism (self):
+        signal  = ParallelSignal (AbstractSignal.VALUE_LIST, executor = self.Executor ())
+        events  = (threading.Event (), threading.Event ())
+
+        # Each handler waits for the other to start, so emission only succeeds if they run
+        # at the same time.
+        def handler (index):
+            events[index].set ()
+            events[1 - index].wait (5)
+            return events[1 - index].isSet ()
+
+        signal.connect (handler, 0)
+        signal.connect (handler, 1)
+
+        self.assertEqual (signal.emit (), [True, True])
+
+
+    def test_accumulator_cancels_remaining (self):
+        executor = self.Executor (lazy = True)
+        signal   = ParallelSignal (AbstractSignal.ANY_ACCEPTS, executor = executor)
+
+        signal.connect (lambda: False)
+        signal.connect (lambda: True)
+        signal.connect (lambda: False)
+
+        self.assertEqual (signal.emit (), True)
+        self.assertEqual ([future.cancelled for future in executor.tasks],
+                          [False, False, True])
+
+
+    def test_exception_handler (self):
+        test   = NotifyTestObject ()
+        signal = ParallelSignal (AbstractSignal.VALUE_LIST, executor = self.Executor ())
+
+        def raising_handler (*arguments):
+            raise ValueError (arguments)
+
+        def recording_exception_handler (signal, exception, handler):
+            test.results.append ((exception.args, handler))
+
+        signal.connect (raising_handler)
+        signal.connect (lambda value: value)
+
+        original_handler = AbstractSignal.exception_handler
+
+        try:
+            AbstractSignal.exception_handler = recording_exception_handler
+            self.assertEqual (signal.emit (1), [1])
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+        test.assert_results ((((1,),), raising_handler))
+
+
+    def test_timeout (self):
+        test     = NotifyTestObject ()
+        executor = self.Executor ()
+        signal   = ParallelSignal (AbstractSignal.VALUE_LIST, timeout = 0.05,
+                                   executor = executor)
+        release  = threading.Event ()
+
+        def recording_exception_handler (signal, exception, handler):
+            test.results.append (exception.args)
+
+        signal.connect (release.wait, 5)
+        signal.connect (lambda: 1)
+
+        original_handler = AbstractSignal.exception_handler
+
+        try:
+            AbstractSignal.exception_handler = recording_exception_handler
+            self.assertEqual (signal.emit (), [1])
+        finally:
+            AbstractSignal.exception_handler = original_handler
+            release.set ()
+
+            # Don't leave a running handler behind for the next test.
+            for future in executor.tasks:
+                future.finished.wait ()
+
+        test.assert_results (('timed out',))
+
+
+    if NotifyTestCase.note_skipped_tests (HAVE_CONCURRENT_FUTURES):
+
+        def test_thread_pool (self):
+            signal = ParallelSignal (AbstractSignal.VALUE_LIST, max_workers = 2)
+
+            signal.connect (lambda value: value)
+            signal.connect (lambda value: -value)
+
+            try:
+                self.assertEqual (signal.emit (1), [1, -1])
+                signal.shutdown ()
+                self.assertEqual (signal.emit (2), [2, -2])
+            finally:
+                signal.shutdown ()
+
+
+    def test_invalid_arguments (self):
+        executor = self.Executor ()
+
+        self.assertRaises (ValueError, ParallelSignal, max_workers = 0, executor = executor)
+        self.assertRaises (ValueError, ParallelSignal, timeout = -1, executor = executor)
+
+
+
+class ProfilingSignalTestCase (NotifyTestCase):
+
+    def test_profile_stats (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        def raising_handler (*arguments):
+            raise Exception
+
+        signal.connect (test.simple_handler)
+        signal.connect (raising_handler)
+
+        original_exception_handler = AbstractSignal.exception_handler
+
+        try:
+            AbstractSignal.exception_handler = AbstractSignal.ignoring_exception_handler
+
+            signal.emit (1)
+
+            signal.enable_profiling ()
+            signal.emit (2)
+            signal.emit (3)
+            signal.emit_many ([(4,)])
+            signal.disable_profiling ()
+
+            signal.emit (5)
+
+            stats = signal.profile_stats ()
+            self.assertEqual ([profile.handler for profile in stats],
+                              [test.simple_handler, raising_handler])
+
+            self.assertEqual ([profile.num_calls      for profile in stats], [3, 3])
+            self.assertEqual ([profile.num_exceptions for profile in stats], [0, 3])
+
+            for profile in stats:
+                self.assert_(0 <= profile.max_time <= profile.total_time)
+
+        finally:
+            AbstractSignal.exception_handler = original_exception_handler
+            signal.clear_profile_stats ()
+
+        self.assertEqual (signal.profile_stats (), [])
+        test.assert_results (1, 2, 3, 4, 5)
+
+
+    def test_repeated_handlers (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        def handler (*arguments):
+            pass
+
+        signal.connect (handler)
+        signal.connect (handler)
+        signal.connect (test.simple_handler)
+        signal.connect (test.simple_handler)
+
+        try:
+            signal.enable_profiling ()
+            signal.emit (1)
+            signal.disable_profiling ()
+
+            # The function is the same object both times, bindings of the method are not.
+            stats = signal.profile_stats ()
+            self.assertEqual ([profile.num_calls for profile in stats], [2, 1, 1])
+
+        finally:
+            signal.clear_profile_stats ()
+
+        test.assert_results (1, 1)
+
+
+    def test_emission_methods_restored (self):
+        emit      = Signal.__dict__['emit']
+        emit_many = Signal.__dict__['emit_many']
+        signal    = Signal ()
+
+        signal.enable_profiling ()
+        self.assert_(type (signal) is not Signal)
+        self.assert_(isinstance (signal, Signal))
+        self.assert_(Signal.__dict__['emit'] is emit)
+
+        signal.disable_profiling ()
+        self.assert_(type (signal) is Signal)
+
+        enable_profiling ()
+        self.assert_(Signal.__dict__['emit'] is not emit)
+
+        disable_profiling ()
+        self.assert_(Signal.__dict__['emit']      is emit)
+        self.assert_(Signal.__dict__['emit_many'] is emit_many)
+
+
+    def test_unsupported_class (self):
+        signal = ThreadSafeSignal ()
+
+        self.assertRaises (TypeError, signal.enable_profiling)
+        self.assert_(type (signal) is ThreadSafeSignal)
+
+
+    def test_other_signals_not_profiled (self):
+        test    = NotifyTestObject ()
+        signal1 = Signal ()
+        signal2 = SnapshotSignal ()
+
+        signal1.connect (test.simple_handler)
+        signal2.connect (test.simple_handler)
+
+        signal1.enable_profiling ()
+
+        try:
+            signal1.emit (1)
+            signal2.emit (2)
+        finally:
+            signal1.disable_profiling ()
+            signal1.clear_profile_stats ()
+
+        self.assertEqual (signal2.profile_stats (), [])
+        test.assert_results (1, 2)
+
+
+    def test_subclasses (self):
+        test    = NotifyTestObject ()
+        signals = [CleanSignal (), PrioritySignal (), CompilingSignal ()]
+
+        for signal in signals:
+            signal.connect (test.simple_handler)
+            signal.enable_profiling ()
+
+        try:
+            for signal in signals:
+                signal.emit (1)
+                self.assertEqual ([profile.num_calls for profile in signal.profile_stats ()],
+                                  [1])
+        finally:
+            for signal in signals:
+                signal.disable_profiling ()
+                signal.clear_profile_stats ()
+
+        self.assertEqual ([type (signal) for signal in signals],
+                          [CleanSignal, PrioritySignal, CompilingSignal])
+        test.assert_results (1, 1, 1)
+
+
+    def test_emission_semantics (self):
+        test   = NotifyTestObject ()
+        signal = Signal (AbstractSignal.VALUE_LIST)
+
+        signal.connect (lambda value: value)
+        signal.connect (lambda value: signal.disconnect (test.simple_handler))
+        signal.connect (test.simple_handler)
+        signal.connect (lambda value: signal.stop_emission ())
+        signal.connect (test.simple_handler_100)
+
+        signal.enable_profiling ()
+
+        try:
+            self.assertEqual (signal.emit (1), [1, True, True])
+            self.assertEqual (signal.emit (2), [2, False, True])
+        finally:
+            signal.disable_profiling ()
+            signal.clear_profile_stats ()
+
+        self.assertEqual (len (signal._handlers), 4)
+        test.assert_results ()
+
+
+    def test_global_profiling (self):
+        test    = NotifyTestObject ()
+        signals = [Signal (), CleanSignal (), SnapshotSignal (), PrioritySignal (),
+                   DeferredSignal (), CompilingSignal ()]
+
+        for signal in signals:
+            signal.connect (test.simple_handler)
+
+        enable_profiling ()
+
+        try:
+            for signal in signals:
+                signal.emit (1)
+
+            signals[4].flush ()
+        finally:
+            disable_profiling ()
+
+        for signal in signals:
+            self.assertEqual ([profile.num_calls for profile in signal.profile_stats ()], [1])
+            signal.clear_profile_stats ()
+
+        test.assert_results (1, 1, 1, 1, 1, 1)
+
+
+
+class TracingSignalTestCase (NotifyTestCase):
+
+    def test_trace (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        def recursive_handler (x, **keywords):
+            if x < 2:
+                signal.emit (x + 1, key = 'value')
+
+        signal.connect (recursive_handler)
+        signal.connect (test.simple_keywords_handler)
+
+        enable_tracing ()
+
+        try:
+            signal.emit (1)
+            signal.emit_many ([(5,)])
+            disable_tracing ()
+            signal.emit (10)
+
+            trace = get_trace ()
+        finally:
+            disable_tracing ()
+            clear_trace ()
+
+        self.assertEqual ([record.arguments for record in trace], [(1,), (2,), (5,)])
+        self.assertEqual ([record.keywords for record in trace], [{}, { 'key': 'value' }, {}])
+        self.assertEqual ([record.emission_level for record in trace], [1, 2, 1])
+        self.assertEqual ([record.num_handlers for record in trace], [2, 2, 2])
+
+        for record in trace:
+            self.assertEqual (record.signal_id,    id (signal))
+            self.assert_     (record.signal_class is Signal)
+
+        self.assert_(trace[0].time <= trace[1].time <= trace[2].time)
+        self.assertEqual (get_trace (), [])
+
+
+    def test_ring_buffer (self):
+        signal = SnapshotSignal ()
+
+        enable_tracing (3)
+
+        try:
+            for k in range (5):
+                signal.emit (k)
+
+            trace = get_trace ()
+        finally:
+            disable_tracing ()
+            clear_trace ()
+
+        self.assertEqual ([record.arguments for record in trace], [(2,), (3,), (4,)])
+
+
+    def test_format_arguments (self):
+        class Unrepresentable (object):
+            def __repr__(self):
+                raise Exception
+
+        signal = Signal ()
+
+        enable_tracing ()
+
+        try:
+            signal.emit (1, 'a' * 100, Unrepresentable (), x = None)
+            trace = get_trace ()
+        finally:
+            disable_tracing ()
+            clear_trace ()
+
+        self.assertEqual (trace[0].format_arguments (10),
+                          "1, 'aaaaaa..., <Unrepresentable object, repr() failed>, x=None")
+        self.assert_('level 1  0 handlers  (1, ' in str (trace[0]))
+
+
+    def test_dump_trace (self):
+        import io
+        if sys.version_info[0] >= 3:
+            stream = io.StringIO ()
+        else:
+            import StringIO
+            stream = StringIO.StringIO ()
+
+        signal = CompilingSignal ()
+
+        enable_tracing ()
+
+        try:
+            signal.emit ('x')
+            signal.emit ('y')
+            dump_trace (stream)
+        finally:
+            disable_tracing ()
+            clear_trace ()
+
+        lines = stream.getvalue ().splitlines ()
+        self.assertEqual (len (lines), 2)
+        self.assert_(lines[0].endswith ("('x')"))
+        self.assert_(lines[1].endswith ("('y')"))
+
+
+    def test_with_profiling (self):
+        emit   = Signal.__dict__['emit']
+        signal = Signal ()
+
+        signal.connect (lambda: None)
+
+        enable_tracing ()
+        signal.enable_profiling ()
+
+        try:
+            disable_tracing ()
+            signal.emit ()
+
+            self.assertEqual ([profile.num_calls for profile in signal.profile_stats ()], [1])
+        finally:
+            signal.disable_profiling ()
+            signal.clear_profile_stats ()
+            clear_trace ()
+
+        self.assert_(Signal.__dict__['emit'] is emit)
+        self.assertRaises (ValueError, enable_tracing, 0)
+
+
+
+class DisconnectObjectTestCase (NotifyTestCase):
+
+    def test_disconnect_object (self):
+        test     = NotifyTestObject ()
+        other    = NotifyTestObject ()
+        signal1  = Signal ()
+        signal2  = CleanSignal ()
+        signal3  = PrioritySignal ()
+        factory  = SignalFactory ()
+        topics   = TopicSignal ()
+        queue    = DeliveryQueue ()
+
+        track_connections (test)
+        track_connections (other)
+
+        signal1.connect (test.simple_handler)
+        signal1.connect (test.simple_handler_100)
+        signal1.connect (other.simple_handler)
+        signal2.connect (test.simple_handler, 'x')
+        signal2.connect_safe (test.simple_handler_200)
+        signal2.connect (other.simple_handler_100)
+        signal3.connect (test.simple_handler, priority = 1)
+        factory['create'].connect (test.simple_handler)
+        topics.connect ('order.*', test.simple_handler)
+        signal1.connect_queued (queue, test.simple_handler)
+
+        self.assert_(disconnect_object (test))
+
+        signal1.emit (1)
+        signal2.emit (2)
+        signal3.emit (3)
+        factory['create'].emit (4)
+        topics.emit ('order.1', 5)
+
+        self.assertEqual (len (queue), 0)
+        self.assertEqual (topics.patterns (), [])
+        test.assert_results ()
+        other.assert_results (1, 102)
+
+        self.assert_(not disconnect_object (test))
+
+
+    def test_not_tracked (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler)
+
+        self.assertRaises (ValueError, disconnect_object, test)
+        self.assertRaises (TypeError,  track_connections, 1)
+
+        # Only connections made after starting tracking are found.
+        track_connections (test)
+        self.assert_(not disconnect_object (test))
+
+        signal.emit (1)
+        test.assert_results (1)
+
+
+    def test_equal_handlers (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        track_connections (test)
+
+        signal.connect (test.simple_handler)
+        signal.connect (test.simple_handler)
+        signal.block   (test.simple_handler)
+
+        self.assert_(disconnect_object (test))
+
+        signal.connect (test.simple_handler)
+        signal.emit (1)
+
+        test.assert_results (1)
+
+
+    def test_later_connections (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        track_connections (test)
+
+        signal.connect (test.simple_handler)
+        disconnect_object (test)
+
+        signal.connect (test.simple_handler_100)
+        self.assert_(disconnect_object (test))
+
+        signal.emit (1)
+        test.assert_results ()
+
+
+    def test_garbage_collected_object (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        track_connections (test)
+
+        signal.connect (test.simple_handler)
+        self.assert_(id (test) in signal_module._object_connections)
+
+        del test
+        self.collect_garbage ()
+
+        self.assert_(not signal.has_handlers ())
+        self.assert_(not signal_module._object_connections)
+
+
+    def test_pruning (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        track_connections (test)
+
+        for k in range (100):
+            signal.connect (test.simple_handler)
+            signal.disconnect (test.simple_handler)
+
+        for k in range (100):
+            signal.connect (test.simple_handler)
+
+        self.assert_(len (signal_module._object_connections[id (test)]) - 2 <= 16)
+
+        self.assert_(disconnect_object (test))
+
+
+    def test_unhashable_handlers (self):
+        test    = NotifyTestObject ()
+        signals = [Signal () for k in range (signal_module._MIN_CONNECTION_PRUNING_LIMIT * 3)]
+
+        track_connections (test)
+
+        for k in range (len (signals)):
+            signals[k].connect (test.simple_handler, [k])
+
+        self.assert_(disconnect_object (test))
+
+        for signal in signals:
+            self.assert_(not signal.has_handlers ())
+
+
+
+class ExoticSignalTestCase (NotifyTestCase):
+
+    def test_disconnect_blocked_handler_1 (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler)
+        signal.emit (1)
+
+        signal.block (test.simple_handler)
+        signal.emit (2)
+
+        signal.disconnect (test.simple_handler)
+        signal.emit (3)
+
+        signal.connect (test.simple_handler)
+        signal.emit (4)
+
+        test.assert_results (1, 4)
+
+
+    def test_disconnect_blocked_handler_2 (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (test.simple_handler)
+        signal.emit (1)
+
+        signal.block (test.simple_handler)
+        signal.emit (2)
+
+        signal.disconnect (test.simple_handler)
+        signal.emit (3)
+
+        signal.connect (test.simple_handler)
+        signal.emit (4)
+
+        signal.unblock (test.simple_handler)
+        signal.emit (5)
+
+        test.assert_results (1, 1, 5, 5)
+
+
+    def test_disconnect_blocked_handler_3 (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (test.simple_handler)
+        signal.emit (1)
+
+        signal.block (test.simple_handler)
+        signal.emit (2)
+
+        signal.disconnect_all (test.simple_handler)
+        signal.emit (3)
+
+        signal.connect (test.simple_handler)
+        signal.emit (4)
+
+        signal.unblock (test.simple_handler)
+        signal.emit (5)
+
+        test.assert_results (1, 1, 4, 5)
+
+
+
+import __future__
+
+if NotifyTestCase.note_skipped_tests ('with_statement' in __future__.all_feature_names):
+    from test._2_5.signal import SignalContextManagerTestCase
+
+if NotifyTestCase.note_skipped_tests (sys.version_info[:2] >= (3, 5)):
+    from test._3_5.signal import AsyncSignalTestCase, NextEmissionTestCase
 
 
 